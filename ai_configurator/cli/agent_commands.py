@@ -4,6 +4,7 @@ from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 
+from ai_configurator.core.agent_manager import q_cli_agents_dir
 from ai_configurator.services.agent_service import AgentService
 from ai_configurator.services.wizard_service import WizardService
 
@@ -26,7 +27,7 @@ def agent():
 def list():
     """List all agents."""
     service = get_agent_service()
-    agents = service.list_agents()
+    agents = service.list_agent_summaries()
     
     if not agents:
         console.print("[yellow]No agents found.[/yellow]")
@@ -42,13 +43,59 @@ def list():
         table.add_row(
             agent.name,
             agent.tool_type.value,
-            str(len(agent.config.resources)),
+            str(agent.resource_count),
             agent.health_status.value
         )
     
     console.print(table)
 
 
+@agent.command()
+@click.argument('paths', nargs=-1)
+@click.option('--server', 'servers', multiple=True, help='MCP server name (repeatable)')
+@click.option('--export', 'export_affected', is_flag=True, help='Re-export affected Q CLI agents')
+def impact(paths: tuple, servers: tuple, export_affected: bool):
+    """Show agents affected by library files or MCP servers.
+    
+    PATHS are library-relative files or directories, e.g. roles/dev.md or roles/.
+    """
+    if not paths and not servers:
+        raise click.UsageError("Give at least one PATH or --server.")
+    
+    service = get_agent_service()
+    agents = service.find_dependent_agents(paths, servers)
+    
+    if not agents:
+        console.print("[yellow]No agents depend on the given files or servers.[/yellow]")
+        return
+    
+    table = Table(title=f"Affected Agents ({len(agents)})")
+    table.add_column("Name", style="cyan")
+    table.add_column("Tool", style="green")
+    table.add_column("Resources", style="blue")
+    table.add_column("Servers", style="blue")
+    table.add_column("Status", style="magenta")
+    
+    for agent in agents:
+        table.add_row(
+            agent.name,
+            agent.tool_type.value,
+            str(agent.resource_count),
+            str(agent.server_count),
+            agent.health_status.value
+        )
+    
+    console.print(table)
+    
+    if export_affected:
+        exported = 0
+        for summary in agents:
+            loaded = service.load_agent(summary.name, summary.tool_type)
+            if loaded and service.export_to_q_cli(loaded):
+                exported += 1
+        console.print(f"[green]✓[/green] Re-exported {exported} Q CLI agent(s)")
+
+
 @agent.command()
 @click.argument('name')
 def show(name: str):
@@ -106,10 +153,37 @@ def delete(name: str, force: bool):
 
 
 @agent.command()
-@click.argument('name')
-def export(name: str):
-    """Export agent to target tool."""
+@click.argument('name', required=False)
+@click.option('--all', 'export_all', is_flag=True, help='Export every Q CLI agent')
+@click.option('--workers', type=int, default=None, help='Parallel export workers')
+def export(name: str, export_all: bool, workers: int):
+    """Export agent(s) to Q CLI.
+    
+    Files whose content is unchanged are left alone, so Q CLI does not reload them.
+    """
+    if bool(name) == export_all:
+        raise click.UsageError("Give an agent NAME or --all.")
+    
     service = get_agent_service()
-    result = service.export_agent(name)
-    console.print(f"[green]✓[/green] Exported agent: {name}")
-    console.print(f"Location: {result}")
+    report = service.export_agents_to_q_cli(None if export_all else [name], max_workers=workers)
+    
+    if report.missing:
+        console.print(f"[red]Q CLI agent not found: {', '.join(report.missing)}[/red]")
+        raise click.Abort()
+    
+    if name:
+        if report.failed:
+            console.print(f"[red]✗[/red] Failed to export agent: {name}")
+            raise click.Abort()
+        state = "Exported" if report.written else "Up to date"
+        console.print(f"[green]✓[/green] {state}: {name}")
+        console.print(f"Location: {q_cli_agents_dir() / f'{name}.json'}")
+        return
+    
+    console.print(f"[green]✓[/green] Exported {len(report.written)} agent(s), "
+                  f"{len(report.unchanged)} unchanged, {len(report.failed)} failed")
+    console.print(f"Location: {q_cli_agents_dir()}")
+    for failed in report.failed:
+        console.print(f"  [red]✗[/red] {failed}")
+    if report.failed:
+        raise click.Abort()
@@ -11,6 +11,12 @@ from rich.panel import Panel
 
 from ..services.cached_library_service import CachedLibraryService
 from ..core.config import ConfigProxy
+from ..core.production_config import get_production_config
+
+
+def _get_cache_service(console: Console) -> CachedLibraryService:
+    """Create a cache service sized from the production cache settings."""
+    return CachedLibraryService(console=console, cache_config=get_production_config().cache)
 
 
 @click.group(name="cache")
@@ -25,7 +31,7 @@ def stats():
     console = Console()
     config = ConfigProxy()
     
-    cache_service = CachedLibraryService(console=console)
+    cache_service = _get_cache_service(console)
     stats = cache_service.get_cache_stats()
     
     # Create stats table
@@ -33,16 +39,21 @@ def stats():
     table.add_column("Metric", style="cyan")
     table.add_column("Value", style="white")
     
-    table.add_row("Memory Cache Size", f"{stats['memory_cache_size']}/{stats['max_memory_cache_size']}")
+    table.add_row("Memory Cache Entries", str(stats['memory_cache_size']))
+    table.add_row("Memory Cache Usage", f"{stats['memory_cache_bytes'] / (1024 * 1024):.1f}/"
+                  f"{stats['max_memory_cache_bytes'] / (1024 * 1024):.0f} MB")
+    table.add_row("Memory Cache Hits", str(stats['memory_cache_hits']))
+    table.add_row("Memory Cache Misses", str(stats['memory_cache_misses']))
+    table.add_row("Memory Cache Evictions", str(stats['memory_cache_evictions']))
     table.add_row("Directory Cache Size", str(stats['directory_cache_size']))
     table.add_row("Cache TTL (hours)", str(stats['cache_ttl_hours']))
     table.add_row("Lazy Load Threshold (KB)", str(stats['lazy_load_threshold_kb']))
     
-    # LRU cache info
+    # Content hash memo info
     lru_info = stats['lru_cache_info']
-    table.add_row("LRU Cache Hits", str(lru_info['hits']))
-    table.add_row("LRU Cache Misses", str(lru_info['misses']))
-    table.add_row("LRU Cache Size", f"{lru_info['currsize']}/{lru_info['maxsize']}")
+    table.add_row("Hash Cache Hits", str(lru_info['hits']))
+    table.add_row("Hash Cache Misses", str(lru_info['misses']))
+    table.add_row("Hash Cache Size", f"{lru_info['currsize']}/{lru_info['maxsize']}")
     
     console.print(table)
 
@@ -53,7 +64,7 @@ def clear():
     console = Console()
     
     if click.confirm("Are you sure you want to clear all caches?"):
-        cache_service = CachedLibraryService(console=console)
+        cache_service = _get_cache_service(console)
         cache_service.clear_cache()
     else:
         console.print("Cache clear cancelled")
@@ -64,7 +75,7 @@ def optimize():
     """Optimize cache by removing expired entries."""
     console = Console()
     
-    cache_service = CachedLibraryService(console=console)
+    cache_service = _get_cache_service(console)
     cache_service.optimize_cache()
 
 
@@ -86,23 +97,23 @@ def preload():
         if remote_path.exists():
             library_paths.append(remote_path)
     
-    cache_service = CachedLibraryService(console=console)
+    cache_service = _get_cache_service(console)
     cache_service.preload_library(library_paths)
 
 
 @cache_group.command()
-@click.option("--size", "-s", type=int, help="Maximum memory cache size")
+@click.option("--size", "-s", type=int, help="Maximum memory cache size in MB")
 @click.option("--ttl", "-t", type=int, help="Cache TTL in hours")
 @click.option("--threshold", "-th", type=int, help="Lazy load threshold in KB")
 def configure(size: int, ttl: int, threshold: int):
     """Configure cache settings."""
     console = Console()
     
-    cache_service = CachedLibraryService(console=console)
+    cache_service = _get_cache_service(console)
     
     if size:
-        cache_service.max_memory_cache_size = size
-        console.print(f"✅ Memory cache size set to {size}")
+        cache_service.set_memory_budget(size * 1024 * 1024)
+        console.print(f"✅ Memory cache size set to {size} MB")
     
     if ttl:
         cache_service.cache_ttl_hours = ttl
@@ -138,7 +149,7 @@ def benchmark():
     
     # Test without cache
     console.print("\n📊 [bold]Test 1: Cold cache (no caching)[/bold]")
-    cache_service = CachedLibraryService(console=console)
+    cache_service = _get_cache_service(console)
     cache_service.clear_cache()
     
     import time
@@ -176,8 +187,8 @@ def benchmark():
     
     # Show cache stats
     stats = cache_service.get_cache_stats()
-    console.print(f"\n💾 Cache efficiency: {stats['lru_cache_info']['hits']} hits, "
-                 f"{stats['lru_cache_info']['misses']} misses")
+    console.print(f"\n💾 Cache efficiency: {stats['memory_cache_hits']} hits, "
+                 f"{stats['memory_cache_misses']} misses, {stats['memory_cache_evictions']} evictions")
 
 
 def register_cache_commands(cli):
@@ -1,10 +1,12 @@
 """Library management CLI commands."""
+import fnmatch
 import click
 from pathlib import Path
 from rich.console import Console
 from rich.table import Table
+from rich.text import Text
 
-from ai_configurator.services.library_service import LibraryService
+from ai_configurator.services.library_service import LibraryService, build_layers
 from ai_configurator.services.sync_service import SyncService
 from ai_configurator.services.file_service import FileService
 
@@ -12,11 +14,13 @@ console = Console()
 
 
 def get_library_service():
-    """Get configured library service."""
+    """Get configured library service, layering in any remote team libraries."""
+    from ai_configurator.core.config import get_config
     config_dir = Path.home() / ".config" / "ai-configurator"
     base_path = config_dir / "library"
     personal_path = config_dir / "personal"
-    return LibraryService(base_path, personal_path)
+    layers = build_layers(base_path, personal_path, get_config().library_config)
+    return LibraryService(base_path, personal_path, layers=layers)
 
 
 @click.group()
@@ -40,7 +44,11 @@ def status():
         console.print(f"\n[bold cyan]Library Status[/bold cyan]")
         console.print(f"Base Files: {base_count}")
         console.print(f"Personal Files: {personal_count}")
+        remote_count = sum(1 for f in library.files.values() if f.source.value == 'remote')
+        if remote_count:
+            console.print(f"Remote Files: {remote_count}")
         console.print(f"Total Files: {len(library.files)}")
+        console.print(f"Effective Files: {len(library.effective_paths())}")
     except Exception as e:
         console.print(f"[yellow]Status unavailable: {e}[/yellow]")
 
@@ -50,12 +58,15 @@ def status():
 def sync(interactive: bool):
     """Sync library with conflict resolution."""
     from ai_configurator.models.sync_models import LibrarySync
+    from ai_configurator.core.config import get_config
+    from ai_configurator.services.resolution_planner import ResolutionPlanner
     from pathlib import Path
     
     service = get_library_service()
-    sync_service = SyncService()
     
     try:
+        planner = ResolutionPlanner.from_settings(get_config().sync_settings)
+        sync_service = SyncService(index=service.index, planner=planner)
         library = service.create_library()
         config_dir = Path.home() / ".config" / "ai-configurator"
         backup_path = config_dir / "backups"
@@ -73,6 +84,10 @@ def sync(interactive: bool):
         if result.conflicts_detected > 0:
             console.print(f"[yellow]Found {result.conflicts_detected} conflicts[/yellow]")
             console.print(f"Resolved: {result.conflicts_resolved}")
+            console.print(
+                f"Merged automatically: {result.merges_automatic}, resolved by policy: {result.resolved_by_policy}, "
+                f"need manual merge: {result.merges_manual}"
+            )
             if interactive:
                 console.print("[dim]Use TUI mode for interactive resolution: ai-config[/dim]")
         else:
@@ -82,38 +97,47 @@ def sync(interactive: bool):
 
 
 @library.command()
-def diff():
-    """Show differences between base and personal library."""
-    from ai_configurator.models.sync_models import LibrarySync
-    from pathlib import Path
+@click.argument('file', required=False)
+@click.option('--side-by-side', is_flag=True, help='Show FILE as a side-by-side diff')
+def diff(file: str, side_by_side: bool):
+    """Show differences between base and personal library.
     
+    Lists changed files; pass a FILE path to show its diff.
+    """
     service = get_library_service()
-    sync_service = SyncService()
+    sync_service = SyncService(index=service.index)
     
     try:
-        library = service.create_library()
-        config_dir = Path.home() / ".config" / "ai-configurator"
-        backup_path = config_dir / "backups"
-        backup_path.mkdir(parents=True, exist_ok=True)
+        conflicts = sync_service.detect_conflicts(get_library_sync(service))
         
-        library_sync = LibrarySync(
-            base_path=library.base_path,
-            personal_path=library.personal_path,
-            backup_path=backup_path
-        )
-        
-        diffs = sync_service.get_diff(library_sync)
+        if file:
+            conflict = next((c for c in conflicts if c.file_path == file), None)
+            if conflict is None:
+                console.print(f"[green]No differences for {file}.[/green]")
+                return
+            if side_by_side:
+                sync_service.display_side_by_side(conflict)
+            else:
+                sync_service.display_diff(conflict)
+            return
         
-        if not diffs:
+        if not conflicts:
             console.print("[green]No differences found.[/green]")
             return
         
         table = Table(title="Library Differences")
         table.add_column("File", style="cyan")
         table.add_column("Status", style="yellow")
+        table.add_column("Base Size", justify="right")
+        table.add_column("Personal Size", justify="right")
         
-        for diff in diffs:
-            table.add_row(diff.file_path, diff.status.value)
+        for conflict in conflicts:
+            table.add_row(
+                conflict.file_path,
+                conflict.conflict_type.value,
+                f"{conflict.base_size} bytes" if conflict.base_exists else "-",
+                f"{conflict.personal_size} bytes" if conflict.personal_exists else "-"
+            )
         
         console.print(table)
     except Exception as e:
@@ -131,11 +155,193 @@ def update():
     console.print("[green]✓[/green] Library updated")
 
 
+def get_library_sync(service: LibraryService):
+    """Build the LibrarySync used for sync and backup commands."""
+    from ai_configurator.models.sync_models import LibrarySync
+    
+    backup_path = Path.home() / ".config" / "ai-configurator" / "backups"
+    backup_path.mkdir(parents=True, exist_ok=True)
+    return LibrarySync(
+        base_path=service.base_path,
+        personal_path=service.personal_path,
+        backup_path=backup_path
+    )
+
+
+@library.group()
+def backup():
+    """Personal library snapshots."""
+    pass
+
+
+@backup.command(name="create")
+def backup_create():
+    """Snapshot the personal library now."""
+    service = get_library_service()
+    if SyncService(index=service.index).create_backup(get_library_sync(service)) is None:
+        console.print("⚠️  No personal library to back up")
+
+
+@backup.command(name="list")
+def backup_list():
+    """List personal library snapshots, newest first."""
+    service = get_library_service()
+    store = SyncService(index=service.index).get_snapshot_store(get_library_sync(service))
+    snapshots = store.list()
+    
+    if not snapshots:
+        console.print("[yellow]No snapshots found.[/yellow]")
+        return
+    
+    table = Table(title="Library Snapshots")
+    table.add_column("ID", style="cyan")
+    table.add_column("Created", style="green")
+    table.add_column("Files", justify="right")
+    table.add_column("Size", justify="right")
+    
+    for info in snapshots:
+        table.add_row(
+            info.snapshot_id,
+            info.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            str(info.file_count),
+            f"{info.total_size / 1024:.1f} KB"
+        )
+    
+    console.print(table)
+
+
+@backup.command(name="diff")
+@click.argument('old_id')
+@click.argument('new_id')
+def backup_diff(old_id: str, new_id: str):
+    """Show files changed between two snapshots."""
+    service = get_library_service()
+    store = SyncService(index=service.index).get_snapshot_store(get_library_sync(service))
+    
+    try:
+        result = store.diff(old_id, new_id)
+    except KeyError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        return
+    
+    if not (result.added or result.removed or result.modified):
+        console.print("[green]Snapshots are identical.[/green]")
+        return
+    
+    for path in result.added:
+        console.print(f"[green]+ {path}[/green]")
+    for path in result.removed:
+        console.print(f"[red]- {path}[/red]")
+    for path in result.modified:
+        console.print(f"[yellow]~ {path}[/yellow]")
+
+
+@backup.command(name="restore")
+@click.argument('snapshot_id')
+@click.option('--yes', is_flag=True, help='Do not ask for confirmation')
+def backup_restore(snapshot_id: str, yes: bool):
+    """Restore the personal library from a snapshot.
+    
+    The current personal library is snapshotted first, so a restore can
+    itself be undone.
+    """
+    service = get_library_service()
+    sync_service = SyncService(index=service.index)
+    library_sync = get_library_sync(service)
+    
+    if not yes and not click.confirm(f"Replace personal library with snapshot {snapshot_id}?"):
+        return
+    
+    try:
+        sync_service.create_backup(library_sync)
+        result = sync_service.get_snapshot_store(library_sync).restore(snapshot_id, service.personal_path)
+    except KeyError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        return
+    
+    console.print(
+        f"[green]✓[/green] Restored {snapshot_id}: {len(result.added)} added, "
+        f"{len(result.modified)} updated, {len(result.removed)} removed"
+    )
+
+
+@backup.command(name="gc")
+@click.option('--retention-days', type=int, help='Override the configured backup retention')
+def backup_gc(retention_days: int):
+    """Delete expired snapshots and unreferenced content."""
+    from ai_configurator.core.production_config import get_production_config
+    
+    service = get_library_service()
+    library_sync = get_library_sync(service)
+    store = SyncService(index=service.index).get_snapshot_store(library_sync)
+    
+    if retention_days is None:
+        retention_days = get_production_config().library.backup_retention_days
+    
+    result = store.gc(retention_days, legacy_dir=library_sync.backup_path)
+    console.print(
+        f"[green]✓[/green] Removed {result.snapshots_removed} snapshots, "
+        f"{result.legacy_backups_removed} legacy backups and {result.blobs_removed} blobs "
+        f"({result.bytes_freed / 1024:.1f} KB freed)"
+    )
+
+
 @library.command()
-@click.argument('pattern')
+@click.argument('query', nargs=-1, required=True)
+@click.option('--limit', default=20, help='Maximum number of results')
+def search(query: tuple, limit: int):
+    """Search library files, best matches first.
+    
+    All words must match. Use prefix* for prefix matches and quotes for
+    exact phrases, e.g. ai-config library search '"code review"' secur*
+    """
+    service = get_library_service()
+    
+    try:
+        results = service.search(" ".join(query), limit=limit)
+    except Exception as e:
+        console.print(f"[red]Search error: {e}[/red]")
+        return
+    
+    if not results:
+        console.print("[yellow]No matching files found.[/yellow]")
+        return
+    
+    console.print(f"\n[bold cyan]Top {len(results)} matches[/bold cyan]\n")
+    
+    for result in results:
+        source = next((layer.name for layer in service.layers if layer.path == result.root), "base")
+        header = f"[cyan]{result.path}[/cyan] [dim]({source}, score {result.score:.2f})[/dim]"
+        if result.title:
+            header += f" - {result.title}"
+        console.print(header)
+        
+        snippet = Text(result.snippet, style="dim")
+        for start, end in result.highlights:
+            snippet.stylize("bold yellow", start, end)
+        console.print(Text("  ").append(snippet))
+        console.print()
+
+
+@library.command()
+@click.argument('pattern', required=False)
 @click.option('--agent', help='Agent name to add files to')
-def files(pattern: str, agent: str):
-    """Discover files matching pattern."""
+@click.option('--tag', 'tags', multiple=True, help='Only files with this tag (repeatable, all must match)')
+@click.option('--category', help='Only files in this top-level directory, e.g. roles')
+@click.option('--title', help='Only files whose title contains this text')
+@click.option('--cached', is_flag=True, help='Query the index as of the last scan without checking the disk')
+def files(pattern: str, agent: str, tags: tuple, category: str, title: str, cached: bool):
+    """Discover files matching pattern, or filter library files by metadata.
+    
+    e.g. ai-config library files --tag security --category roles
+    """
+    if tags or category or title:
+        _list_indexed_files(pattern, tags, category, title, refresh=not cached)
+        return
+    
+    if not pattern:
+        raise click.UsageError("Give a PATTERN or at least one of --tag, --category, --title")
+    
     service = FileService()
     result = service.discover_files(pattern)
     
@@ -151,6 +357,22 @@ def files(pattern: str, agent: str):
         console.print(f"\n[dim]Adding to agent: {agent}[/dim]")
 
 
+def _list_indexed_files(pattern: str, tags: tuple, category: str, title: str, refresh: bool) -> None:
+    """Print library files matching metadata filters, narrowed by an optional glob."""
+    service = get_library_service()
+    matches = service.find_files(tags, category, title, refresh=refresh)
+    if pattern:
+        matches = [(path, source) for path, source in matches if fnmatch.fnmatch(path, pattern)]
+    
+    if not matches:
+        console.print("[yellow]No matching files found.[/yellow]")
+        return
+    
+    console.print(f"\n[bold cyan]Found {len(matches)} files[/bold cyan]")
+    for path, source in matches:
+        console.print(f"  {path} [dim]({source.value})[/dim]")
+
+
 @library.command()
 @click.argument('pattern')
 @click.argument('agent')
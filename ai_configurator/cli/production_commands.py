@@ -77,7 +77,7 @@ def show(env: str):
     cache_table.add_column("Value", style="white")
     
     cache_table.add_row("Enabled", str(config.cache.enabled))
-    cache_table.add_row("Max Memory Size", str(config.cache.max_memory_size))
+    cache_table.add_row("Max Memory Size (MB)", str(config.cache.max_memory_size))
     cache_table.add_row("TTL Hours", str(config.cache.ttl_hours))
     cache_table.add_row("Lazy Load Threshold (KB)", str(config.cache.lazy_load_threshold_kb))
     cache_table.add_row("Persistent Cache", str(config.cache.persistent_cache))
@@ -10,6 +10,7 @@ from rich.console import Console
 from rich.table import Table
 
 from ..models.sync_models import LibrarySync
+from ..services.resolution_planner import ResolutionPlanner
 from ..services.sync_service import SyncService
 from ..core.config import ConfigManager
 
@@ -41,8 +42,8 @@ def sync(ctx, interactive: bool, dry_run: bool):
             backup_path=config.library_config.personal_library_path.parent / "backups"
         )
         
-        # Create sync service
-        sync_service = SyncService(console)
+        # Create sync service, resolving conflicts per the configured policies
+        sync_service = SyncService(console, planner=ResolutionPlanner.from_settings(config.sync_settings))
         
         if dry_run:
             console.print("🔍 Dry run mode - detecting conflicts...")
@@ -50,6 +51,7 @@ def sync(ctx, interactive: bool, dry_run: bool):
             sync_service.display_conflicts(conflicts)
             
             if conflicts:
+                sync_service.display_plan(sync_service.planner.plan(conflicts, interactive=interactive))
                 console.print(f"\n📊 Summary: {len(conflicts)} conflicts detected")
                 console.print("Run without --dry-run to resolve conflicts")
             else:
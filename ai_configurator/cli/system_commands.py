@@ -50,7 +50,7 @@ def status():
     agent_service, library_service, registry_service = get_services()
     
     try:
-        agents = agent_service.list_agents()
+        agents = agent_service.list_agent_summaries()
         servers = registry_service.get_installed_servers()
         
         # Count library files
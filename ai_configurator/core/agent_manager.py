@@ -6,8 +6,43 @@ import os
 import json
 from pathlib import Path
 from typing import Dict, List, Optional, Any
-from .file_utils import ensure_directory
+from concurrent.futures import ThreadPoolExecutor
+from .file_utils import ensure_directory, write_if_changed
+from .hashing import hash_bytes, hash_file
 from .library_manager import LibraryManager
+from .library_index import LibraryIndex
+
+
+# Fingerprints and output stats of the last update_all_agents run, per tool
+BUILD_STATE_NAME = "agent-builds.json"
+BUILD_STATE_VERSION = 1
+
+MAX_UPDATE_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+
+def q_cli_agents_dir() -> Path:
+    """Directory Q CLI loads agent configurations from."""
+    return Path.home() / ".aws" / "amazonq" / "cli-agents"
+
+
+def _rule_roles(rules: List[str]) -> List[str]:
+    """Role names of rules under roles/, in first-seen order."""
+    roles = []
+    for rule in rules:
+        # Extract role name from rule path (e.g., "roles/software-engineer/software-engineer.md")
+        if rule.startswith("roles/") and "/" in rule:
+            role_name = rule.split("/")[1]
+            if role_name not in roles:
+                roles.append(role_name)
+    return roles
+
+
+def _stat_key(path: Path) -> Optional[List[int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
 
 
 class AgentConfig:
@@ -66,13 +101,15 @@ class AgentConfig:
 class AgentManager:
     """Manages tool-specific agents."""
     
-    def __init__(self, tool: str = "q-cli"):
+    def __init__(self, tool: str = "q-cli", index: Optional[LibraryIndex] = None):
         self.tool = tool
         self.library_manager = LibraryManager()
         self.config_dir = Path.home() / ".config" / "ai-configurator"
         self.tool_dir = self.config_dir / tool
         self.agents_dir = self.tool_dir / "agents"
         self.mcp_dir = self.tool_dir / "mcp-servers"
+        # Opened on the first update_all_agents() and kept for later runs
+        self._index = index
         
         # Ensure directories exist
         ensure_directory(str(self.agents_dir))
@@ -166,24 +203,55 @@ class AgentManager:
             print(f"Error updating agent: {e}")
             return False
 
-    def update_all_agents(self) -> bool:
-        """Update all existing agents with latest library configurations."""
+    def update_all_agents(self, max_workers: Optional[int] = None) -> bool:
+        """Update all existing agents with latest library configurations.
+        
+        Each agent's inputs (its rules and description, the content hashes of
+        its rule files and of its roles' mcp.json) are fingerprinted. Agents
+        whose fingerprint and output files are unchanged since the last run
+        are skipped without being read; the rest are rebuilt in a worker pool
+        and their files are only rewritten when the rendered output differs.
+        """
         try:
             agents = self.list_agents()
             if not agents:
                 print("No agents found to update")
                 return True
             
-            success_count = 0
+            self.library_manager.ensure_library_synced()
+            state = self._load_build_state()
+            hashes = self._library_hashes()
+            
+            pending = []
             for agent_name in agents:
-                print(f"Updating agent: {agent_name}")
-                if self._update_agent_config(agent_name):
+                plan = self._plan_agent_update(agent_name, state.get(agent_name), hashes)
+                if plan is None:
+                    continue  # Inputs and outputs unchanged since the last update
+                pending.append(plan)
+            
+            success_count = len(agents) - len(pending)
+            if pending:
+                workers = min(max_workers or MAX_UPDATE_WORKERS, len(pending))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent-update") as pool:
+                    results = list(pool.map(lambda plan: self._rebuild_agent(plan, hashes), pending))
+                
+                for plan, (entry, written) in zip(pending, results):
+                    agent_name = plan["name"]
+                    if entry is None:
+                        state.pop(agent_name, None)
+                        print(f"  ❌ {agent_name} failed")
+                        continue
+                    state[agent_name] = entry
                     success_count += 1
-                    print(f"  ✅ {agent_name} updated")
-                else:
-                    print(f"  ❌ {agent_name} failed")
+                    print(f"  ✅ {agent_name} {'updated' if written else 'unchanged'}")
+            
+            # Forget agents that no longer exist
+            for agent_name in [name for name in state if name not in agents]:
+                del state[agent_name]
+            self._save_build_state(state)
             
-            print(f"Updated {success_count}/{len(agents)} agents")
+            print(f"Updated {success_count}/{len(agents)} agents "
+                  f"({len(agents) - len(pending)} skipped as unchanged)")
             return success_count == len(agents)
         except Exception as e:
             print(f"Error updating agents: {e}")
@@ -191,100 +259,149 @@ class AgentManager:
     
     def _update_agent_config(self, name: str) -> bool:
         """Update a single agent configuration without interactive prompts."""
-        agent_file = self.agents_dir / f"{name}.json"
-        if not agent_file.exists():
+        hashes = self._library_hashes()
+        plan = self._plan_agent_update(name, None, hashes)
+        if plan is None:
             return False
+        entry, _ = self._rebuild_agent(plan, hashes)
+        if entry is None:
+            return False
+        state = self._load_build_state()
+        state[name] = entry
+        self._save_build_state(state)
+        return True
+    
+    def _plan_agent_update(self, name: str, entry: Optional[Dict[str, Any]],
+                           hashes: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Work out an agent's inputs; None if it is up to date (or gone).
+        
+        The agent file is only read when its stat differs from the last
+        build; otherwise its rules and description come from the build state.
+        """
+        agent_file = self.agents_dir / f"{name}.json"
+        agent_stat = _stat_key(agent_file)
+        if agent_stat is None:
+            return None
+        
+        if entry is not None and entry.get("stat") == agent_stat:
+            rules, description = entry["rules"], entry["description"]
+        else:
+            try:
+                with open(agent_file, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+            except Exception as e:
+                print(f"Error updating {name}: {e}")
+                return {"name": name, "rules": None}
+            rules, description = self._extract_rules(config), config.get("description", "")
+        
+        inputs = self._fingerprint(description, rules, hashes)
+        if (entry is not None and entry.get("inputs") == inputs and entry.get("stat") == agent_stat
+                and entry.get("export_stat") == self._export_stat(name)):
+            return None
+        return {"name": name, "rules": rules, "description": description, "inputs": inputs}
+    
+    def _rebuild_agent(self, plan: Dict[str, Any], hashes: Dict[str, str]):
+        """Render one agent and write files whose content differs; returns (state entry, written)."""
+        name = plan["name"]
+        if plan["rules"] is None:
+            return None, False
         
         try:
-            # Load existing config
-            with open(agent_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
             # Recreate agent with current library configurations
-            resources = config.get("resources", [])
-            rules = []
-            
-            # Extract rule paths from resources
-            for resource in resources:
-                if resource.startswith("file://"):
-                    file_path = resource.replace("file://", "")
-                    # Convert absolute path back to relative library path
-                    if str(self.library_manager.library_dir) in file_path:
-                        relative_path = Path(file_path).relative_to(self.library_manager.library_dir)
-                        rules.append(str(relative_path))
-            
-            # Create new agent config
-            agent = AgentConfig(name, config.get("description", ""))
-            
-            # Add resources
-            for rule in rules:
-                file_path = self.library_manager.get_file_path(rule)
-                if file_path:
-                    agent.add_resource(str(file_path))
-            
-            # Load role-specific MCP configurations
-            self._add_role_mcp_configs(agent, rules)
+            agent = AgentConfig(name, plan["description"])
+            for rule in plan["rules"]:
+                if hashes.get(rule):
+                    agent.add_resource(str(self.library_manager.library_dir / rule))
+            for role_name in _rule_roles(plan["rules"]):
+                if hashes.get(f"roles/{role_name}/mcp.json"):
+                    mcp_config = self.library_manager.get_role_mcp_config(role_name)
+                    if mcp_config:
+                        agent.merge_mcp_config(mcp_config)
             
-            # Save updated config
-            with open(agent_file, 'w', encoding='utf-8') as f:
-                json.dump(agent.to_dict(), f, indent=2)
+            rendered = json.dumps(agent.to_dict(), indent=2).encode("utf-8")
+            agent_file = self.agents_dir / f"{name}.json"
+            written = write_if_changed(agent_file, rendered)
             
             # Update Amazon Q CLI agent if tool is q-cli
             if self.tool == "q-cli":
-                self._create_q_cli_agent(name, agent.to_dict())
+                ensure_directory(str(q_cli_agents_dir()))
+                written = write_if_changed(q_cli_agents_dir() / f"{name}.json", rendered) or written
             
-            return True
+            return {
+                "stat": _stat_key(agent_file),
+                "export_stat": self._export_stat(name),
+                "rules": plan["rules"],
+                "description": plan["description"],
+                "inputs": plan["inputs"],
+            }, written
         except Exception as e:
             print(f"Error updating {name}: {e}")
-            return False
-        """Update an existing agent (interactive)."""
-        agent_file = self.agents_dir / f"{name}.json"
-        if not agent_file.exists():
-            print(f"Agent '{name}' not found")
-            return False
-        
+            return None, False
+    
+    def _extract_rules(self, config: Dict[str, Any]) -> List[str]:
+        """Library-relative rule paths of an agent's file:// resources."""
+        rules = []
+        library_dir = str(self.library_manager.library_dir)
+        for resource in config.get("resources", []):
+            if resource.startswith("file://"):
+                file_path = resource.replace("file://", "")
+                # Convert absolute path back to relative library path
+                if library_dir in file_path:
+                    relative_path = Path(file_path).relative_to(self.library_manager.library_dir)
+                    rules.append(str(relative_path))
+        return rules
+    
+    def _fingerprint(self, description: str, rules: List[str], hashes: Dict[str, str]) -> str:
+        """Hash of everything a rebuilt agent depends on."""
+        roles = _rule_roles(rules)
+        inputs = {
+            "version": BUILD_STATE_VERSION,
+            "tool": self.tool,
+            "description": description,
+            "rules": [[rule, self._input_hash(rule, hashes)] for rule in rules],
+            "roles": [[role, self._input_hash(f"roles/{role}/mcp.json", hashes)] for role in roles],
+        }
+        return hash_bytes(json.dumps(inputs, sort_keys=True).encode("utf-8"))
+    
+    def _library_hashes(self) -> Dict[str, str]:
+        """Content hash of every library file by relative path, rehashing only changed files."""
+        library_dir = self.library_manager.library_dir
+        if not library_dir.exists():
+            return {}
+        if self._index is None:
+            self._index = LibraryIndex(self.config_dir / "cache" / "library_index.db")
+        scan = self._index.scan(library_dir)
+        return {path: entry.content_hash for path, entry in scan.files.items()}
+    
+    def _input_hash(self, relative_path: str, hashes: Dict[str, str]) -> Optional[str]:
+        """Hash of a library file the index does not cover (e.g. excluded), cached in hashes."""
+        if relative_path not in hashes:
+            try:
+                hashes[relative_path] = hash_file(self.library_manager.library_dir / relative_path)
+            except OSError:
+                hashes[relative_path] = None  # Missing; the rebuild leaves it out
+        return hashes[relative_path]
+    
+    def _export_stat(self, name: str) -> Optional[List[int]]:
+        if self.tool != "q-cli":
+            return None
+        return _stat_key(q_cli_agents_dir() / f"{name}.json")
+    
+    def _load_build_state(self) -> Dict[str, Dict[str, Any]]:
         try:
-            # Load existing config
-            with open(agent_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
-            # Interactive menu
-            while True:
-                print(f"\n{name} Agent Configuration:")
-                print("1. Add/Remove Knowledge Files")
-                print("2. Configure MCP Servers")
-                print("3. Modify Agent Settings")
-                print("4. Save and Exit")
-                print("5. Cancel")
-                
-                choice = input("Select option (1-5): ").strip()
-                
-                if choice == "1":
-                    self._manage_knowledge_files(config)
-                elif choice == "2":
-                    self._manage_mcp_servers(config)
-                elif choice == "3":
-                    self._manage_agent_settings(config)
-                elif choice == "4":
-                    # Save updated config
-                    with open(agent_file, 'w', encoding='utf-8') as f:
-                        json.dump(config, f, indent=2)
-                    
-                    # Update Amazon Q CLI agent if tool is q-cli
-                    if self.tool == "q-cli":
-                        self._create_q_cli_agent(name, config)
-                    
-                    print(f"Agent '{name}' updated successfully")
-                    return True
-                elif choice == "5":
-                    print("Update cancelled")
-                    return False
-                else:
-                    print("Invalid option, please try again")
-        
-        except Exception as e:
-            print(f"Error updating agent: {e}")
-            return False
+            with open(self.tool_dir / BUILD_STATE_NAME, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data["agents"] if data.get("version") == BUILD_STATE_VERSION else {}
+        except (OSError, ValueError, KeyError):
+            return {}
+    
+    def _save_build_state(self, state: Dict[str, Dict[str, Any]]) -> None:
+        """Write the build state atomically; losing it only costs a full rebuild."""
+        state_path = self.tool_dir / BUILD_STATE_NAME
+        temp_path = state_path.with_name(f"{state_path.name}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": BUILD_STATE_VERSION, "agents": state}, f, indent=1, sort_keys=True)
+        os.replace(temp_path, state_path)
     
     def list_agents(self) -> List[str]:
         """List all agents for this tool."""
@@ -306,7 +423,7 @@ class AgentManager:
             
             # Remove Amazon Q CLI agent if tool is q-cli
             if self.tool == "q-cli":
-                q_cli_agent_file = Path.home() / ".aws" / "amazonq" / "cli-agents" / f"{name}.json"
+                q_cli_agent_file = q_cli_agents_dir() / f"{name}.json"
                 if q_cli_agent_file.exists():
                     q_cli_agent_file.unlink()
             
@@ -353,12 +470,11 @@ class AgentManager:
     
     def _create_q_cli_agent(self, name: str, config: Dict[str, Any]):
         """Create Amazon Q CLI agent file."""
-        q_cli_agents_dir = Path.home() / ".aws" / "amazonq" / "cli-agents"
-        ensure_directory(str(q_cli_agents_dir))
+        agents_dir = q_cli_agents_dir()
+        ensure_directory(str(agents_dir))
         
-        agent_file = q_cli_agents_dir / f"{name}.json"
-        with open(agent_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2)
+        agent_file = agents_dir / f"{name}.json"
+        write_if_changed(agent_file, json.dumps(config, indent=2).encode("utf-8"))
     
     def _manage_knowledge_files(self, config: Dict[str, Any]):
         """Interactive knowledge file management."""
@@ -25,7 +25,12 @@ class ConfigManager:
     
     def save_config(self, config: Configuration) -> bool:
         """Save configuration."""
-        return self.config_service.save_configuration(config)
+        saved = self.config_service.save_configuration(config)
+        if saved:
+            # The shared file walker holds the excluded patterns it was built with
+            from .file_walker import reset_file_walker
+            reset_file_walker()
+        return saved
     
     def create_backup(self, config: Configuration, description: str = "") -> bool:
         """Create backup of configuration."""
@@ -0,0 +1,306 @@
+"""
+Line diff engine for library files.
+
+Lines are interned to integer ids and matched with patience diff: lines
+unique to both sides anchor the alignment, and only the stretches between
+anchors fall back to Myers' O(ND) algorithm. Unlike difflib.SequenceMatcher
+this stays close to linear on large, reordered documents. When NumPy is
+installed it is used to drop lines that cannot match before running Myers.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from itertools import zip_longest
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Edit distance above which Myers gives up and reports a region as replaced
+MAX_EDIT_COST = 1024
+
+# Regions smaller than this are prefiltered in Python; NumPy only pays off above it
+NUMPY_MIN_REGION = 4096
+
+Opcode = Tuple[str, int, int, int, int]
+
+
+@dataclass
+class SideBySideRow:
+    """One row of a side-by-side diff; line numbers are 1-based, None for a blank side."""
+    tag: str
+    left_no: Optional[int]
+    left: str
+    right_no: Optional[int]
+    right: str
+
+
+def _intern(a: Sequence[str], b: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """Map equal lines on both sides to the same integer id."""
+    ids: Dict[str, int] = {}
+    a_ids = [ids.setdefault(line, len(ids)) for line in a]
+    b_ids = [ids.setdefault(line, len(ids)) for line in b]
+    return a_ids, b_ids
+
+
+def _shared_lines(a: List[int], b: List[int]) -> Tuple[List[int], List[int]]:
+    """Indices of lines that also occur on the other side; no other line can match."""
+    if NUMPY_AVAILABLE and len(a) + len(b) >= NUMPY_MIN_REGION:
+        a_array = np.asarray(a)
+        b_array = np.asarray(b)
+        return (np.flatnonzero(np.isin(a_array, b_array)).tolist(),
+                np.flatnonzero(np.isin(b_array, a_array)).tolist())
+    a_set, b_set = set(a), set(b)
+    return ([i for i, line in enumerate(a) if line in b_set],
+            [j for j, line in enumerate(b) if line in a_set])
+
+
+def _myers(a: List[int], b: List[int], max_cost: int) -> Optional[List[Tuple[int, int]]]:
+    """Matched index pairs of a shortest edit script, or None if it costs more than max_cost."""
+    n, m = len(a), len(b)
+    limit = min(n + m, max_cost)
+    offset = limit + 1
+    v = [0] * (2 * limit + 3)
+    trace: List[List[int]] = []
+
+    for d in range(limit + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                trace.append(v[offset - d:offset + d + 1])
+                return _backtrack(trace, n, m)
+        # Only diagonals -d..d are ever read back, so that slice is all we keep
+        trace.append(v[offset - d:offset + d + 1])
+
+    return None
+
+
+def _backtrack(trace: List[List[int]], x: int, y: int) -> List[Tuple[int, int]]:
+    pairs = []
+    for d in range(len(trace) - 1, 0, -1):
+        previous = trace[d - 1]
+        k = x - y
+        if k == -d or (k != d and previous[k - 1 + d - 1] < previous[k + 1 + d - 1]):
+            previous_k = k + 1
+            mid_x = previous[previous_k + d - 1]
+        else:
+            previous_k = k - 1
+            mid_x = previous[previous_k + d - 1] + 1
+        mid_y = mid_x - k
+        while x > mid_x and y > mid_y:
+            x -= 1
+            y -= 1
+            pairs.append((x, y))
+        x = previous[previous_k + d - 1]
+        y = x - previous_k
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        pairs.append((x, y))
+    return pairs
+
+
+def _unique_anchors(a: List[int], b: List[int], alo: int, ahi: int,
+                    blo: int, bhi: int) -> List[Tuple[int, int]]:
+    """Longest increasing run of lines that occur exactly once on each side."""
+    a_counts = Counter(a[alo:ahi])
+    b_counts = Counter(b[blo:bhi])
+    b_position = {b[j]: j for j in range(blo, bhi) if b_counts[b[j]] == 1}
+    candidates = [
+        (i, b_position[a[i]]) for i in range(alo, ahi)
+        if a_counts[a[i]] == 1 and a[i] in b_position
+    ]
+    if not candidates:
+        return []
+
+    # Patience sorting: longest increasing subsequence of b positions
+    tails: List[int] = []
+    tail_index: List[int] = []
+    back: List[int] = [-1] * len(candidates)
+    for index, (_, j) in enumerate(candidates):
+        pile = bisect_left(tails, j)
+        if pile == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[pile] = j
+            tail_index[pile] = index
+        back[index] = tail_index[pile - 1] if pile else -1
+
+    anchors = []
+    index = tail_index[-1]
+    while index >= 0:
+        anchors.append(candidates[index])
+        index = back[index]
+    anchors.reverse()
+    return anchors
+
+
+def _match_region(a: List[int], b: List[int], alo: int, ahi: int,
+                  blo: int, bhi: int, pairs: List[Tuple[int, int]]) -> None:
+    """Match a region with no unique anchors using Myers on the lines that can match."""
+    a_keep, b_keep = _shared_lines(a[alo:ahi], b[blo:bhi])
+    if not a_keep or not b_keep:
+        return
+    matched = _myers([a[alo + i] for i in a_keep], [b[blo + j] for j in b_keep], MAX_EDIT_COST)
+    if matched is None:
+        return  # Too different to be worth aligning; reported as a replacement
+    pairs.extend((alo + a_keep[i], blo + b_keep[j]) for i, j in matched)
+
+
+def _matching_pairs(a: List[int], b: List[int]) -> List[Tuple[int, int]]:
+    pairs: List[Tuple[int, int]] = []
+    regions = [(0, len(a), 0, len(b))]
+    while regions:
+        alo, ahi, blo, bhi = regions.pop()
+
+        # Common prefix and suffix
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            pairs.append((alo, blo))
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            pairs.append((ahi, bhi))
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _unique_anchors(a, b, alo, ahi, blo, bhi)
+        if not anchors:
+            _match_region(a, b, alo, ahi, blo, bhi, pairs)
+            continue
+
+        for i, j in anchors:
+            pairs.append((i, j))
+            regions.append((alo, i, blo, j))
+            alo, blo = i + 1, j + 1
+        regions.append((alo, ahi, blo, bhi))
+
+    pairs.sort()
+    return pairs
+
+
+def matching_blocks(a: Sequence[str], b: Sequence[str]) -> List[Tuple[int, int, int]]:
+    """Runs of equal lines as (i, j, size), in the format of SequenceMatcher.get_matching_blocks().
+
+    The list ends with the sentinel (len(a), len(b), 0).
+    """
+    a_ids, b_ids = _intern(a, b)
+    blocks: List[Tuple[int, int, int]] = []
+    for i, j in _matching_pairs(a_ids, b_ids):
+        if blocks:
+            last_i, last_j, size = blocks[-1]
+            if (last_i + size, last_j + size) == (i, j):
+                blocks[-1] = (last_i, last_j, size + 1)
+                continue
+        blocks.append((i, j, 1))
+    blocks.append((len(a), len(b), 0))
+    return blocks
+
+
+def diff_opcodes(a: Sequence[str], b: Sequence[str]) -> List[Opcode]:
+    """Edit operations turning a into b, in the format of SequenceMatcher.get_opcodes()."""
+    opcodes: List[Opcode] = []
+    i = j = 0
+    for ai, bj, size in matching_blocks(a, b):
+        tag = "replace" if i < ai and j < bj else "delete" if i < ai else "insert" if j < bj else ""
+        if tag:
+            opcodes.append((tag, i, ai, j, bj))
+        if size:
+            opcodes.append(("equal", ai, ai + size, bj, bj + size))
+        i, j = ai + size, bj + size
+    return opcodes
+
+
+def grouped_opcodes(opcodes: List[Opcode], n: int = 3) -> Iterator[List[Opcode]]:
+    """Group opcodes into hunks with up to n lines of context, like difflib."""
+    codes = list(opcodes) or [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    group: List[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        # Split a long stretch of unchanged lines into two hunks' context
+        if tag == "equal" and i2 - i1 > n * 2:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _format_range(start: int, stop: int) -> str:
+    """Unified diff range, e.g. '3,4' or '3' (1-based), as difflib formats it."""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def unified_diff(a: Sequence[str], b: Sequence[str], fromfile: str = "", tofile: str = "",
+                 n: int = 3, lineterm: str = "\n") -> Iterator[str]:
+    """Unified diff lines, a drop-in replacement for difflib.unified_diff."""
+    started = False
+    for group in grouped_opcodes(diff_opcodes(a, b), n):
+        if not started:
+            started = True
+            yield f"--- {fromfile}{lineterm}"
+            yield f"+++ {tofile}{lineterm}"
+
+        first, last = group[0], group[-1]
+        yield f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@{lineterm}"
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield " " + line
+                continue
+            if tag in ("replace", "delete"):
+                for line in a[i1:i2]:
+                    yield "-" + line
+            if tag in ("replace", "insert"):
+                for line in b[j1:j2]:
+                    yield "+" + line
+
+
+def side_by_side(a: Sequence[str], b: Sequence[str], n: int = 3) -> Iterator[List[SideBySideRow]]:
+    """Hunks of aligned left/right rows; changed lines are paired up row by row."""
+    for group in grouped_opcodes(diff_opcodes(a, b), n):
+        rows = []
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                rows.extend(
+                    SideBySideRow(tag, i + 1, a[i], j + 1, b[j])
+                    for i, j in zip(range(i1, i2), range(j1, j2))
+                )
+                continue
+            for i, j in zip_longest(range(i1, i2), range(j1, j2)):
+                rows.append(SideBySideRow(
+                    tag,
+                    None if i is None else i + 1, "" if i is None else a[i],
+                    None if j is None else j + 1, "" if j is None else b[j]
+                ))
+        yield rows
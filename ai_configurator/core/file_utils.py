@@ -3,13 +3,21 @@ Simplified file utilities for AI Configurator.
 """
 
 import logging
+import os
 import shutil
+import sys
+import threading
 from pathlib import Path
 from typing import Optional, Union
 
+from .hashing import hash_bytes, hash_file
+
 
 logger = logging.getLogger(__name__)
 
+# Linux ioctl that makes a file share another file's extents (btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
 
 def ensure_directory(path: Union[str, Path]) -> bool:
     """Ensure a directory exists, creating it if necessary."""
@@ -38,6 +46,34 @@ def copy_file(source: Union[str, Path], destination: Union[str, Path]) -> bool:
         return False
 
 
+def clone_file(source: Union[str, Path], destination: Union[str, Path]) -> None:
+    """Copy a file with its metadata, as a reflink where the filesystem supports it.
+    
+    Raises OSError if the file cannot be copied.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            import fcntl
+            with open(source, "rb") as src, open(destination, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            shutil.copystat(source, destination)
+            return
+        except OSError:
+            pass  # Not supported here (e.g. ext4, tmpfs) - fall back to a real copy
+    shutil.copy2(source, destination)
+
+
+def link_or_copy(source: Union[str, Path], destination: Union[str, Path]) -> None:
+    """Hardlink a file, falling back to a copy across filesystems or where links are unsupported.
+    
+    Raises OSError if the file cannot be linked or copied.
+    """
+    try:
+        os.link(source, destination)
+    except OSError:
+        clone_file(source, destination)
+
+
 def read_file(path: Union[str, Path]) -> Optional[str]:
     """Read file content as string."""
     try:
@@ -63,3 +99,35 @@ def write_file(path: Union[str, Path], content: str) -> bool:
     except Exception as e:
         logger.error(f"Error writing file {path}: {e}")
         return False
+
+
+def write_atomic(path: Union[str, Path], content: bytes) -> None:
+    """Write a file through a temporary sibling and a rename, so readers never see it half-written.
+    
+    Raises OSError if the file cannot be written.
+    """
+    path = Path(path)
+    # Hidden and without the target's extension, so directory watchers ignore it
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except OSError:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_if_changed(path: Union[str, Path], content: bytes) -> bool:
+    """Atomically write content unless the file already has the same hash; returns whether it was written.
+    
+    Skipping identical content keeps the file's mtime, so tools watching it
+    do not reload. Raises OSError if the file cannot be written.
+    """
+    try:
+        if os.path.getsize(path) == len(content) and hash_file(path) == hash_bytes(content):
+            return False
+    except OSError:
+        pass  # Missing or unreadable - write it
+    write_atomic(path, content)
+    return True
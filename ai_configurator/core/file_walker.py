@@ -0,0 +1,224 @@
+"""
+Shared os.scandir walker for library trees.
+
+One walk yields every file with a configured extension, using the stat
+results the DirEntry objects already carry. The walker remembers each
+directory's listing together with the directory's mtime, so a rescan only
+reads directories whose entries changed; unchanged ones cost a single
+stat. Files in them are re-stat'ed unless the caller only needs names.
+"""
+
+import fnmatch
+import os
+import re
+import stat
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+DEFAULT_EXTENSIONS = (".md",)
+
+# A listing is only reused once its directory's mtime is this far in the
+# past, so a change landing in the same timestamp tick is never missed
+RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass
+class WalkedFile:
+    """A regular file found by the walker, with the stat taken from its DirEntry."""
+    path: str  # Relative to the walked root
+    full_path: str
+    stat: os.stat_result
+
+    @property
+    def extension(self) -> str:
+        return os.path.splitext(self.path)[1].lower()
+
+
+@dataclass
+class _Listing:
+    """Matching files and subdirectories of one directory, as of its mtime."""
+    mtime_ns: int
+    listed_ns: int
+    files: List[Tuple[str, str, os.stat_result]]
+    dirs: List[Tuple[str, str]]
+
+
+@dataclass
+class FileWalker:
+    """Walks trees once, yielding files with any of the configured extensions.
+
+    extensions=None matches every file. Names or relative paths matching
+    excluded_patterns are skipped, as are hidden entries (such as the
+    .merge-base and .sync-commit working directories) unless include_hidden
+    is set. Files larger than max_file_size are skipped by their stat alone
+    and reported to the walk's ``on_oversized`` callback.
+    """
+    extensions: Optional[Iterable[str]] = DEFAULT_EXTENSIONS
+    max_file_size: Optional[int] = None
+    excluded_patterns: Iterable[str] = ()
+    include_hidden: bool = False
+    cache_listings: bool = True
+
+    def __post_init__(self):
+        if self.extensions is not None:
+            self.extensions = tuple(extension.lower() for extension in self.extensions)
+        self.excluded_patterns = tuple(self.excluded_patterns)
+        self._excluded = (
+            re.compile("|".join(fnmatch.translate(pattern) for pattern in self.excluded_patterns))
+            if self.excluded_patterns else None
+        )
+        self._listings: Dict[str, _Listing] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, library_config=None, excluded_patterns: Optional[Iterable[str]] = None) -> "FileWalker":
+        """Walker for ProductionConfig.library and SyncSettings.excluded_patterns.
+
+        The settings are read once; the walker does not follow later config
+        changes (see reset_file_walker()).
+        """
+        if library_config is None:
+            from .production_config import get_production_config
+            library_config = get_production_config().library
+        if excluded_patterns is None:
+            from .config import get_config
+            excluded_patterns = get_config().sync_settings.excluded_patterns
+        return cls(
+            extensions=library_config.allowed_extensions,
+            max_file_size=library_config.max_file_size_mb * 1024 * 1024,
+            excluded_patterns=excluded_patterns
+        )
+
+    def matches(self, name: str) -> bool:
+        if not self.include_hidden and name.startswith("."):
+            return False
+        return self.extensions is None or name.lower().endswith(self.extensions)
+
+    def walk(self, root: Union[str, Path], refresh_stats: bool = True,
+             on_oversized: Optional[Callable[[str], None]] = None) -> Iterator[WalkedFile]:
+        """Yield matching files below root, depth first, in no particular order.
+
+        Directories whose mtime is unchanged since they were last listed are
+        not read again. Their files are re-stat'ed to catch in-place edits,
+        unless refresh_stats is False because only the paths matter. Skipped
+        oversized files are passed to on_oversized, per walk, since the
+        walker itself is shared between threads.
+        """
+        stack = [(os.fspath(root), "")]
+        while stack:
+            directory, prefix = stack.pop()
+            listed = self._list(directory)
+            if listed is None:
+                continue
+            listing, reused = listed
+
+            for name, full_path in listing.dirs:
+                relative_path = prefix + name
+                if not self._is_excluded(name, relative_path):
+                    stack.append((full_path, relative_path + os.sep))
+
+            for name, full_path, st in listing.files:
+                relative_path = prefix + name
+                if self._is_excluded(name, relative_path):
+                    continue
+                if reused and refresh_stats:
+                    try:
+                        st = os.stat(full_path)
+                    except OSError:
+                        continue
+                    if not stat.S_ISREG(st.st_mode):
+                        continue
+                if self.max_file_size is not None and st.st_size > self.max_file_size:
+                    if on_oversized is not None:
+                        on_oversized(relative_path)
+                    continue
+                yield WalkedFile(relative_path, full_path, st)
+
+    def count(self, root: Union[str, Path]) -> int:
+        """Number of matching files below root, from cached listings where possible."""
+        return sum(1 for _ in self.walk(root, refresh_stats=False)) if os.path.isdir(root) else 0
+
+    def invalidate(self, root: Optional[Union[str, Path]] = None) -> None:
+        """Forget cached listings below root, or all of them."""
+        with self._lock:
+            if root is None:
+                self._listings.clear()
+                return
+            root = os.fspath(root)
+            for directory in [d for d in self._listings if d == root or d.startswith(root + os.sep)]:
+                del self._listings[directory]
+
+    def _is_excluded(self, name: str, relative_path: str) -> bool:
+        return self._excluded is not None and bool(
+            self._excluded.match(name) or self._excluded.match(relative_path)
+        )
+
+    def _list(self, directory: str) -> Optional[Tuple[_Listing, bool]]:
+        """A directory's listing and whether it came from the cache; None if unreadable."""
+        try:
+            dir_mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._listings.pop(directory, None)
+            return None
+
+        cached = self._listings.get(directory)
+        if (cached is not None and cached.mtime_ns == dir_mtime_ns
+                and cached.listed_ns - dir_mtime_ns > RACY_WINDOW_NS):
+            return cached, True
+
+        files: List[Tuple[str, str, os.stat_result]] = []
+        dirs: List[Tuple[str, str]] = []
+        listed_ns = time.time_ns()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.include_hidden or not entry.name.startswith("."):
+                                dirs.append((entry.name, entry.path))
+                            continue
+                        if not self.matches(entry.name):
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    if stat.S_ISREG(st.st_mode):
+                        files.append((entry.name, entry.path, st))
+        except OSError:
+            return None
+
+        listing = _Listing(dir_mtime_ns, listed_ns, files, dirs)
+        if self.cache_listings:
+            with self._lock:
+                self._listings[directory] = listing
+        return listing, False
+
+
+_shared_walker: Optional[FileWalker] = None
+_shared_lock = threading.Lock()
+
+
+def get_file_walker() -> FileWalker:
+    """The process-wide walker for library trees, so every scanner shares its listings.
+
+    It is built from the configuration on first use. Saving the configuration
+    through ConfigManager or reloading the production config rebuilds it;
+    edits made to the config files by another process apply on restart.
+    """
+    global _shared_walker
+    with _shared_lock:
+        if _shared_walker is None:
+            _shared_walker = FileWalker.from_config()
+        return _shared_walker
+
+
+def reset_file_walker() -> None:
+    """Drop the shared walker so the next get_file_walker() reads the current settings."""
+    global _shared_walker
+    with _shared_lock:
+        _shared_walker = None
@@ -0,0 +1,175 @@
+"""
+Shared content hashing for library, sync and file services.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+
+HASH_ALGORITHM = "sha256"
+_new_digest = getattr(hashlib, HASH_ALGORITHM)
+
+# Large reads keep the per-call overhead negligible; hashlib releases the GIL
+# while digesting buffers this size, so worker threads really run in parallel.
+READ_BUFFER_SIZE = 1024 * 1024
+
+MAX_HASH_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+# Below this many files a thread pool costs more than it saves
+PARALLEL_THRESHOLD = 8
+
+
+def hash_bytes(data: bytes) -> str:
+    """Hash an in-memory buffer with the shared algorithm."""
+    return _new_digest(data).hexdigest()
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """Hash a file's bytes without building intermediate chunk objects.
+
+    Raises OSError if the file cannot be read.
+    """
+    with open(path, "rb", buffering=0) as f:
+        if os.fstat(f.fileno()).st_size <= READ_BUFFER_SIZE:
+            # Typical rule file: a single read beats any buffer management
+            return _new_digest(f.readall()).hexdigest()
+
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, HASH_ALGORITHM).hexdigest()
+
+        digest = _new_digest()
+        buffer = bytearray(READ_BUFFER_SIZE)
+        view = memoryview(buffer)
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            digest.update(view[:size])
+        return digest.hexdigest()
+
+
+def hash_files(paths: Iterable[Path], max_workers: Optional[int] = None) -> Dict[Path, str]:
+    """Hash a batch of files concurrently.
+
+    Returns a mapping of path to hex digest. Files that cannot be read are left
+    out of the result rather than failing the whole batch.
+    """
+    paths = list(paths)
+    results: Dict[Path, str] = {}
+
+    if len(paths) < PARALLEL_THRESHOLD:
+        for path in paths:
+            try:
+                results[path] = hash_file(path)
+            except OSError:
+                continue
+        return results
+
+    workers = min(max_workers or MAX_HASH_WORKERS, len(paths))
+    # Hand out several files per task so thousands of tiny rule files don't
+    # pay one executor round-trip each
+    chunk_size = max(1, len(paths) // (workers * 4))
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash") as pool:
+        for chunk_results in pool.map(_hash_chunk, chunks):
+            results.update(chunk_results)
+
+    return results
+
+
+def _hash_chunk(paths: List[Path]) -> Dict[Path, str]:
+    """Pool worker hashing a slice of the batch, skipping unreadable files."""
+    results = {}
+    for path in paths:
+        try:
+            results[path] = hash_file(path)
+        except OSError:
+            continue
+    return results
+
+
+def stat_key(st: os.stat_result) -> Tuple[int, int, int, int]:
+    """Cheap change-detection key for a file: (mtime_ns, size, inode, ctime_ns)."""
+    return (st.st_mtime_ns, st.st_size, st.st_ino, st.st_ctime_ns)
+
+
+class ContentHashCache:
+    """Bounded memo of content digests, validated against each file's stat.
+
+    A hit costs one stat() call. The file is only read and hashed again when
+    its stat key differs from the one the digest was computed for, so an edit
+    is never masked, while unchanged files are never re-read.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int, int, int], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, st: Optional[os.stat_result] = None) -> str:
+        """Return the content digest of a file, rehashing only on stat change.
+
+        Raises OSError if the file cannot be stat'ed or read.
+        """
+        key = str(path)
+        current = stat_key(st if st is not None else os.stat(path))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == current:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        digest = hash_file(path)
+        self._store(key, current, digest)
+        return digest
+
+    def put(self, path: Path, st: os.stat_result, digest: str) -> None:
+        """Record a digest the caller computed from content it already read."""
+        self._store(str(path), stat_key(st), digest)
+
+    def seed(self, path: Path, key: Tuple[int, int, int, int], digest: str) -> None:
+        """Record a digest known to belong to the given stat key, e.g. from a persisted cache."""
+        self._store(str(path), tuple(key), digest)
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """Forget one file, or every memoized digest."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(path), None)
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _store(self, key: str, current: Tuple[int, int, int, int], digest: str) -> None:
+        """Insert an entry, evicting the least recently used ones past maxsize."""
+        with self._lock:
+            self._entries[key] = (current, digest)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def info(self) -> Dict[str, int]:
+        """Hit/miss statistics in the shape of functools' cache_info()."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "currsize": len(self._entries),
+        }
@@ -0,0 +1,85 @@
+"""
+Memory-mapped, lazily decoded file content.
+"""
+
+import codecs
+import mmap
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+from .hashing import hash_bytes
+
+
+class LazyContent:
+    """Read-only view of a file's bytes that decodes text only on request.
+
+    The file is memory-mapped on first use, so hashing, scanning and slicing
+    work on the page cache directly instead of on a copied bytes object or
+    a decoded string. Call release() to unmap once done; any later access
+    maps the file again.
+    """
+
+    def __init__(self, path: Union[str, Path], encoding: str = "utf-8"):
+        self.path = Path(path)
+        self.encoding = encoding
+        self._map: Optional[mmap.mmap] = None
+
+    @property
+    def buffer(self) -> Union[mmap.mmap, bytes]:
+        """The file's bytes as a buffer; empty files cannot be mapped and give b""."""
+        if self._map is None:
+            with open(self.path, "rb") as f:
+                try:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    return b""  # Zero-length file
+        return self._map
+
+    @property
+    def size(self) -> int:
+        return len(self.buffer)
+
+    def hash(self) -> str:
+        """Content hash computed straight from the mapping, without copying the file."""
+        return hash_bytes(self.buffer)
+
+    def head(self, max_bytes: int) -> str:
+        """Decode at most the first max_bytes, dropping a multi-byte character cut in half."""
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        return decoder.decode(self.buffer[:max_bytes], final=False)
+
+    def iter_lines(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """Decoded lines start..stop (0-based, end exclusive), without line endings.
+
+        Only the bytes up to the last requested line are touched.
+        """
+        buffer = self.buffer
+        position = 0
+        number = 0
+        while position < len(buffer) and (stop is None or number < stop):
+            end = buffer.find(b"\n", position)
+            if end == -1:
+                end = len(buffer)
+            if number >= start:
+                yield buffer[position:end].rstrip(b"\r").decode(self.encoding, errors="replace")
+            position = end + 1
+            number += 1
+
+    def lines(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        return list(self.iter_lines(start, stop))
+
+    def text(self) -> str:
+        """Decode the whole file; the result is not kept by the handle."""
+        return str(self.buffer, self.encoding)
+
+    def release(self) -> None:
+        """Unmap the file; it is mapped again on the next access."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __enter__(self) -> "LazyContent":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
@@ -0,0 +1,507 @@
+"""
+Persistent, stat-validated index of library files.
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .file_walker import FileWalker, get_file_walker
+from .hashing import hash_bytes, hash_file, hash_files
+from .lazy_content import LazyContent
+from .metadata import MetadataExtractor, get_metadata_extractor
+from .sqlite_utils import open_database
+
+
+DEFAULT_INDEX_PATH = Path.home() / ".config" / "ai-configurator" / "cache" / "library_index.db"
+
+SCHEMA_VERSION = 4
+
+SCHEMA = """
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    UNIQUE (root, path)
+);
+CREATE TABLE dirs (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    node_hash TEXT NOT NULL,
+    PRIMARY KEY (root, path)
+) WITHOUT ROWID;
+CREATE TABLE metadata (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    category TEXT NOT NULL,
+    title TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (root, path)
+) WITHOUT ROWID;
+CREATE INDEX metadata_category ON metadata (root, category);
+CREATE TABLE tags (
+    root TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (root, tag, path)
+) WITHOUT ROWID;
+CREATE INDEX tags_path ON tags (root, path);
+CREATE TABLE title_trigrams (
+    root TEXT NOT NULL,
+    trigram TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (root, trigram, path)
+) WITHOUT ROWID;
+CREATE INDEX title_trigrams_path ON title_trigrams (root, path);
+"""
+
+
+@dataclass
+class IndexedFile:
+    """Index row for a single library file."""
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+    content_hash: str
+
+    @property
+    def stat_key(self) -> Tuple[int, int, int]:
+        return (self.size, self.mtime_ns, self.inode)
+
+
+@dataclass
+class DirNode:
+    """Merkle tree node for one directory of a library root."""
+    node_hash: str = ""
+    files: List[str] = field(default_factory=list)
+    dirs: List[str] = field(default_factory=list)
+
+
+@dataclass
+class IndexScan:
+    """Result of scanning one library root against the index."""
+    root: Path
+    files: Dict[str, IndexedFile] = field(default_factory=dict)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # Relative directory path ("" for the root) -> Merkle node
+    dirs: Dict[str, DirNode] = field(default_factory=dict)
+
+    @property
+    def root_hash(self) -> str:
+        """Hash of the whole tree; empty for an empty library."""
+        node = self.dirs.get("")
+        return node.node_hash if node else ""
+
+
+@dataclass
+class TreeDiff:
+    """Files that differ between two scanned trees."""
+    modified: List[str] = field(default_factory=list)
+    only_left: List[str] = field(default_factory=list)
+    only_right: List[str] = field(default_factory=list)
+
+
+def _join(directory: str, name: str) -> str:
+    return os.path.join(directory, name) if directory else name
+
+
+def _ancestors(path: str) -> List[str]:
+    """Every directory containing a relative path, innermost first, ending with the root ""."""
+    parents = []
+    while path:
+        path = os.path.dirname(path)
+        parents.append(path)
+    return parents
+
+
+def category_of(path: str) -> str:
+    """A file's category: its top-level directory, or "" for files at the root."""
+    head, sep, _ = path.partition(os.sep)
+    return head if sep else ""
+
+
+def normalize_tag(tag: str) -> str:
+    return tag.lstrip("#").lower()
+
+
+def _trigrams(text: str) -> Set[str]:
+    text = text.casefold()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _subtree_files(scan: IndexScan, directory: str) -> List[str]:
+    """All file paths below a directory of a scanned tree."""
+    paths = []
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        node = scan.dirs.get(current)
+        if node is None:
+            continue
+        paths.extend(_join(current, name) for name in node.files)
+        stack.extend(_join(current, name) for name in node.dirs)
+    return paths
+
+
+def diff_trees(left: IndexScan, right: IndexScan) -> TreeDiff:
+    """Compare two scanned trees, descending only into directories whose hashes differ."""
+    result = TreeDiff()
+    if left.root_hash == right.root_hash:
+        return result
+
+    stack = [""]
+    while stack:
+        directory = stack.pop()
+        left_node = left.dirs.get(directory) or DirNode()
+        right_node = right.dirs.get(directory) or DirNode()
+        if left_node.node_hash == right_node.node_hash:
+            continue  # Identical subtree
+
+        right_files = set(right_node.files)
+        for name in left_node.files:
+            path = _join(directory, name)
+            if name not in right_files:
+                result.only_left.append(path)
+            elif left.files[path].content_hash != right.files[path].content_hash:
+                result.modified.append(path)
+        left_files = set(left_node.files)
+        result.only_right.extend(_join(directory, name) for name in right_node.files if name not in left_files)
+
+        right_dirs = set(right_node.dirs)
+        for name in left_node.dirs:
+            if name in right_dirs:
+                stack.append(_join(directory, name))
+            else:
+                result.only_left.extend(_subtree_files(left, _join(directory, name)))
+        left_dirs = set(left_node.dirs)
+        for name in right_node.dirs:
+            if name not in left_dirs:
+                result.only_right.extend(_subtree_files(right, _join(directory, name)))
+
+    result.modified.sort()
+    result.only_left.sort()
+    result.only_right.sort()
+    return result
+
+
+class LibraryIndex:
+    """SQLite-backed index mapping library paths to content hashes.
+
+    Rows are keyed by (root, relative path) and remember the (size, mtime_ns,
+    inode) the hash was computed for, so a rescan only reads files whose stat
+    changed since the last scan. Each directory also gets a Merkle node hash
+    over its children, and only the ancestors of changed files are rehashed.
+    Extracted file metadata is stored alongside, tagged with the content
+    hash it was computed from.
+
+    Which files are indexed comes from the walker (by default the shared one
+    for the configured extensions, size limit and excluded patterns);
+    metadata uses the extractor registered for each file's extension unless
+    one is passed in.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, extractor: Optional[MetadataExtractor] = None,
+                 walker: Optional[FileWalker] = None):
+        self.db_path = db_path or DEFAULT_INDEX_PATH
+        self.extractor = extractor
+        self.walker = walker or get_file_walker()
+        self._conn = open_database(self.db_path, SCHEMA, SCHEMA_VERSION)
+        self._lock = threading.Lock()
+
+    def scan(self, root: Path) -> IndexScan:
+        """Walk a library root, rehashing only files whose stat changed."""
+        result = IndexScan(root=root)
+        root_key = str(root)
+
+        with self._lock:
+            known = self._load_root(root_key)
+            known_dirs = self._load_dirs(root_key)
+
+        if not root.exists():
+            result.removed = sorted(known)
+            self._apply(root_key, [], result.removed, {}, list(known_dirs))
+            return result
+
+        stale: Dict[Path, Tuple[str, os.stat_result]] = {}
+        for walked in self.walker.walk(root):
+            relative_path, st = walked.path, walked.stat
+            entry = known.pop(relative_path, None)
+
+            if entry is None or entry.stat_key != (st.st_size, st.st_mtime_ns, st.st_ino):
+                stale[Path(walked.full_path)] = (relative_path, st)
+            else:
+                result.files[relative_path] = entry
+
+        # Anything still left in `known` has disappeared from disk
+        result.removed = sorted(known)
+
+        # Rehash everything whose stat changed in one concurrent batch
+        updates: List[IndexedFile] = []
+        for file_path, content_hash in hash_files(stale).items():
+            relative_path, st = stale[file_path]
+            entry = IndexedFile(relative_path, st.st_size, st.st_mtime_ns, st.st_ino, content_hash)
+            result.files[relative_path] = entry
+            result.changed.append(relative_path)
+            updates.append(entry)
+
+        result.changed.sort()
+        dir_updates = self._build_tree(result, known_dirs)
+        dir_removed = [path for path in known_dirs if path not in result.dirs]
+        self._apply(root_key, updates, result.removed, dir_updates, dir_removed)
+        self._index_metadata(root, updates)
+        return result
+
+    def refresh_file(self, root: Path, relative_path: str) -> Optional[IndexedFile]:
+        """Re-index a single file after it was written by the application."""
+        file_path = root / relative_path
+        try:
+            st = file_path.stat()
+            content_hash = hash_file(file_path)
+        except OSError:
+            self._apply(str(root), [], [relative_path], {}, _ancestors(relative_path))
+            return None
+
+        entry = IndexedFile(relative_path, st.st_size, st.st_mtime_ns, st.st_ino, content_hash)
+        # Ancestor node hashes are now stale; the next scan rebuilds them
+        self._apply(str(root), [entry], [], {}, _ancestors(relative_path))
+        self._index_metadata(root, [entry])
+        return entry
+
+    def metadata(self, scan: IndexScan) -> Dict[str, Dict[str, Any]]:
+        """Metadata (title, tags, counts, front matter) for every file of a scan.
+
+        Metadata is extracted when a scan sees a new content hash, so this is
+        normally a single query; files missing from the table are filled in.
+        """
+        root_key = str(scan.root)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, content_hash, data FROM metadata WHERE root = ?", (root_key,)
+            ).fetchall()
+
+        result: Dict[str, Dict[str, Any]] = {}
+        for path, content_hash, data in rows:
+            entry = scan.files.get(path)
+            if entry is not None and entry.content_hash == content_hash:
+                result[path] = json.loads(data)
+
+        missing = [entry for path, entry in scan.files.items() if path not in result]
+        result.update(self._index_metadata(scan.root, missing))
+        return result
+
+    def query(self, root: Path, tags: Iterable[str] = (), category: Optional[str] = None,
+              title: Optional[str] = None) -> Set[str]:
+        """Indexed paths under a root matching every given filter, without touching the disk.
+
+        Tags match case-insensitively with or without a leading "#", category
+        is the top-level directory, and title is a case-insensitive substring
+        looked up through the title trigram index.
+        """
+        root_key = str(root)
+        matches: Optional[Set[str]] = None
+
+        def narrow(rows) -> None:
+            nonlocal matches
+            paths = {row[0] for row in rows}
+            matches = paths if matches is None else matches & paths
+
+        with self._lock:
+            if category is not None:
+                narrow(self._conn.execute(
+                    "SELECT path FROM metadata WHERE root = ? AND category = ?",
+                    (root_key, category.strip("/"))
+                ))
+            for tag in tags:
+                narrow(self._conn.execute(
+                    "SELECT path FROM tags WHERE root = ? AND tag = ?", (root_key, normalize_tag(tag))
+                ))
+            if title:
+                narrow(self._match_title(root_key, title.casefold()))
+            if matches is None:
+                narrow(self._conn.execute("SELECT path FROM metadata WHERE root = ?", (root_key,)))
+        return matches
+
+    def categories(self, root: Path) -> Dict[str, int]:
+        """Number of indexed files per category of a root."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT category, COUNT(*) FROM metadata WHERE root = ? GROUP BY category", (str(root),)
+            )
+            return dict(rows.fetchall())
+
+    def clear(self, root: Optional[Path] = None) -> None:
+        """Drop indexed rows for one root, or the whole index."""
+        with self._lock, self._conn:
+            for table in ("files", "dirs", "metadata", "tags", "title_trigrams"):
+                if root is None:
+                    self._conn.execute(f"DELETE FROM {table}")
+                else:
+                    self._conn.execute(f"DELETE FROM {table} WHERE root = ?", (str(root),))
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def _load_root(self, root_key: str) -> Dict[str, IndexedFile]:
+        """Load all index rows for a root in a single query."""
+        rows = self._conn.execute(
+            "SELECT path, size, mtime_ns, inode, content_hash FROM files WHERE root = ?",
+            (root_key,)
+        )
+        return {row[0]: IndexedFile(*row) for row in rows}
+
+    def _load_dirs(self, root_key: str) -> Dict[str, str]:
+        """Load the stored Merkle node hashes for a root."""
+        rows = self._conn.execute("SELECT path, node_hash FROM dirs WHERE root = ?", (root_key,))
+        return dict(rows.fetchall())
+
+    def _build_tree(self, result: IndexScan, known_dirs: Dict[str, str]) -> Dict[str, str]:
+        """Fill in result.dirs, rehashing only directories above a change.
+
+        Returns the node hashes that differ from the stored ones.
+        """
+        for relative_path in result.files:
+            directory, name = os.path.split(relative_path)
+            node = result.dirs.get(directory)
+            if node is None:
+                node = result.dirs[directory] = DirNode()
+                # Link the new directory into its parents, creating them as needed
+                while directory:
+                    parent, dir_name = os.path.split(directory)
+                    parent_node = result.dirs.get(parent)
+                    is_new = parent_node is None
+                    if is_new:
+                        parent_node = result.dirs[parent] = DirNode()
+                    parent_node.dirs.append(dir_name)
+                    if not is_new:
+                        break
+                    directory = parent
+            node.files.append(name)
+
+        dirty = set()
+        for relative_path in result.changed + result.removed:
+            dirty.update(_ancestors(relative_path))
+        for directory in result.dirs:
+            if directory not in known_dirs:
+                dirty.add(directory)
+                dirty.update(_ancestors(directory))
+
+        updates = {}
+        # Children before parents: deeper paths first
+        for directory in sorted(result.dirs, key=lambda d: d.count(os.sep) + bool(d), reverse=True):
+            node = result.dirs[directory]
+            node.files.sort()
+            node.dirs.sort()
+            if directory not in dirty:
+                node.node_hash = known_dirs[directory]
+                continue
+            entries = [f"f {name} {result.files[_join(directory, name)].content_hash}" for name in node.files]
+            entries += [f"d {name} {result.dirs[_join(directory, name)].node_hash}" for name in node.dirs]
+            node.node_hash = hash_bytes("\n".join(entries).encode("utf-8"))
+            if known_dirs.get(directory) != node.node_hash:
+                updates[directory] = node.node_hash
+        return updates
+
+    def _apply(self, root_key: str, updates: List[IndexedFile], removed: List[str],
+               dir_updates: Dict[str, str], dir_removed: List[str]) -> None:
+        """Persist changed rows and drop removed ones in one transaction."""
+        if not updates and not removed and not dir_updates and not dir_removed:
+            return
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO files (root, path, size, mtime_ns, inode, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (root, path) DO UPDATE SET "
+                "size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                "inode = excluded.inode, content_hash = excluded.content_hash",
+                [(root_key, e.path, e.size, e.mtime_ns, e.inode, e.content_hash) for e in updates]
+            )
+            self._conn.executemany(
+                "DELETE FROM files WHERE root = ? AND path = ?",
+                [(root_key, path) for path in removed]
+            )
+            self._drop_metadata(root_key, removed)
+            self._conn.executemany(
+                "DELETE FROM dirs WHERE root = ? AND path = ?",
+                [(root_key, path) for path in dir_removed]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dirs (root, path, node_hash) VALUES (?, ?, ?)",
+                [(root_key, path, node_hash) for path, node_hash in dir_updates.items()]
+            )
+
+    def _index_metadata(self, root: Path, entries: List[IndexedFile]) -> Dict[str, Dict[str, Any]]:
+        """Extract and store metadata for entries whose content hash has none stored yet."""
+        if not entries:
+            return {}
+        root_key = str(root)
+        with self._lock:
+            stored = dict(self._conn.execute(
+                "SELECT path, content_hash FROM metadata WHERE root = ?", (root_key,)
+            ).fetchall())
+
+        extracted: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for entry in entries:
+            if stored.get(entry.path) == entry.content_hash:
+                continue
+            try:
+                with LazyContent(root / entry.path) as content:
+                    extractor = self.extractor or get_metadata_extractor(content.path.suffix)
+                    extracted[entry.path] = (entry.content_hash, extractor.extract(content.buffer))
+            except OSError:
+                continue
+
+        if extracted:
+            with self._lock, self._conn:
+                self._drop_metadata(root_key, list(extracted))
+                for path, (content_hash, metadata) in extracted.items():
+                    self._write_metadata(root_key, path, content_hash, metadata)
+        return {path: metadata for path, (_, metadata) in extracted.items()}
+
+    def _write_metadata(self, root_key: str, path: str, content_hash: str, metadata: Dict[str, Any]) -> None:
+        """Insert one file's metadata and its tag and title postings. Caller holds the lock."""
+        title = metadata.get("title", "")
+        self._conn.execute(
+            "INSERT INTO metadata (root, path, content_hash, category, title, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (root_key, path, content_hash, category_of(path), title, json.dumps(metadata))
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO tags (root, tag, path) VALUES (?, ?, ?)",
+            [(root_key, normalize_tag(tag), path) for tag in metadata.get("tags", [])]
+        )
+        self._conn.executemany(
+            "INSERT INTO title_trigrams (root, trigram, path) VALUES (?, ?, ?)",
+            [(root_key, trigram, path) for trigram in _trigrams(title)]
+        )
+
+    def _drop_metadata(self, root_key: str, paths: List[str]) -> None:
+        """Delete metadata and its postings for some paths. Caller holds the lock."""
+        rows = [(root_key, path) for path in paths]
+        for table in ("metadata", "tags", "title_trigrams"):
+            self._conn.executemany(f"DELETE FROM {table} WHERE root = ? AND path = ?", rows)
+
+    def _match_title(self, root_key: str, needle: str) -> List[Tuple[str]]:
+        """Paths whose title contains needle; trigrams narrow the candidates first."""
+        trigrams = sorted(_trigrams(needle))
+        if trigrams:
+            placeholders = ", ".join("?" * len(trigrams))
+            rows = self._conn.execute(
+                "SELECT m.path, m.title FROM metadata m WHERE m.root = ? AND m.path IN ("
+                f"SELECT path FROM title_trigrams WHERE root = ? AND trigram IN ({placeholders}) "
+                "GROUP BY path HAVING COUNT(*) = ?)",
+                (root_key, root_key, *trigrams, len(trigrams))
+            )
+        else:
+            rows = self._conn.execute("SELECT path, title FROM metadata WHERE root = ?", (root_key,))
+        return [(path,) for path, title in rows if needle in title.casefold()]
@@ -0,0 +1,227 @@
+"""
+Manifest-driven incremental installer for the packaged knowledge library.
+"""
+
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from .file_utils import clone_file, link_or_copy
+from .file_walker import FileWalker, WalkedFile
+from .hashing import hash_file
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".library-manifest.json"
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class InstallPlan:
+    """Relative paths to add, update, remove or keep in the installed library."""
+    add: List[str] = field(default_factory=list)
+    update: List[str] = field(default_factory=list)
+    remove: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    # Installed manifest needs rewriting even if no file changes (e.g. refreshed stats)
+    stale_manifest: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.add or self.update or self.remove)
+
+
+class LibraryInstaller:
+    """Installs a source library tree into a destination directory incrementally.
+
+    The destination keeps a manifest of path -> content hash (plus the stat
+    each hash was taken for, on both sides), so checking an up-to-date
+    install only stats files. When something differs, a staging copy is
+    assembled next to the destination - unchanged files hardlinked from the
+    current install, new and changed ones reflinked or copied from the
+    source - and swapped in with two renames. An interrupted install is
+    rolled forward or back by recover() on the next run, so the destination
+    is never left half-written.
+
+    Only paths recorded in the previous manifest are ever removed. Anything
+    else in the destination (the personal library, imported files, merge
+    bases, user notes) is untracked and carried into the staging copy
+    unchanged.
+    """
+
+    def __init__(self, source: Path, destination: Path):
+        self.source = source
+        self.destination = destination
+        self.staging = destination.with_name(f".{destination.name}.staging")
+        self.previous = destination.with_name(f".{destination.name}.previous")
+        self._source_manifest: Dict[str, list] = {}
+        self._tracked: Set[str] = set()
+
+    def plan(self) -> InstallPlan:
+        """Compare source and destination manifests without changing anything on disk."""
+        if not self.source.is_dir():
+            raise FileNotFoundError(f"Library source not found: {self.source}")
+
+        self.recover()
+        manifest = self._load_manifest()
+        installed = manifest.get("files", {})
+        self._source_manifest = self._scan_source(manifest.get("source", {}))
+
+        on_disk = {walked.path for walked in self._walk(self.destination)} if self.destination.is_dir() else set()
+        plan = InstallPlan(stale_manifest=manifest.get("source") != self._source_manifest)
+
+        for path, (_, _, digest) in sorted(self._source_manifest.items()):
+            record = installed.get(path)
+            if path not in on_disk:
+                plan.add.append(path)
+            elif record is None or record["hash"] != digest:
+                plan.update.append(path)
+            elif not self._matches_record(self.destination / path, record):
+                # Touched since install: only rehash files whose stat moved
+                plan.stale_manifest = True
+                try:
+                    intact = hash_file(self.destination / path) == digest
+                except OSError:
+                    intact = False
+                (plan.unchanged if intact else plan.update).append(path)
+            else:
+                plan.unchanged.append(path)
+
+        # Never delete what a previous install did not put there
+        plan.remove = sorted((on_disk & installed.keys()) - self._source_manifest.keys())
+        self._tracked = set(installed) | set(self._source_manifest)
+        return plan
+
+    def install(self, plan: Optional[InstallPlan] = None) -> InstallPlan:
+        """Bring the destination in line with the source, touching only what differs."""
+        if plan is None:
+            plan = self.plan()
+
+        if plan.is_empty:
+            if plan.stale_manifest:
+                self._write_manifest(self.destination, plan.unchanged)
+            return plan
+
+        if self.staging.exists():
+            shutil.rmtree(self.staging)
+        self.staging.mkdir(parents=True)
+
+        # Recreate the source's directory layout, including empty directories
+        for directory, _, _ in os.walk(self.source):
+            relative = Path(directory).relative_to(self.source)
+            (self.staging / relative).mkdir(parents=True, exist_ok=True)
+
+        for path in plan.unchanged:
+            link_or_copy(self.destination / path, self.staging / path)
+        for path in plan.add + plan.update:
+            clone_file(self.source / path, self.staging / path)
+        if self.destination.is_dir():
+            self._carry_untracked()
+
+        # The manifest is written last; its presence marks the staging copy complete
+        self._write_manifest(self.staging, plan.unchanged + plan.add + plan.update)
+        self._swap()
+        return plan
+
+    def recover(self) -> None:
+        """Finish or roll back an install that was interrupted mid-swap."""
+        if not self.destination.exists():
+            if (self.staging / MANIFEST_NAME).exists():
+                logger.info(f"Completing interrupted library install into {self.destination}")
+                os.rename(self.staging, self.destination)
+            elif self.previous.exists():
+                logger.info(f"Restoring previous library install at {self.destination}")
+                os.rename(self.previous, self.destination)
+
+        for leftover in (self.staging, self.previous):
+            if leftover.exists():
+                shutil.rmtree(leftover, ignore_errors=True)
+
+    def _swap(self) -> None:
+        """Replace the destination with the staging copy."""
+        if self.destination.exists():
+            os.rename(self.destination, self.previous)
+        os.rename(self.staging, self.destination)
+        shutil.rmtree(self.previous, ignore_errors=True)
+
+    def _carry_untracked(self) -> None:
+        """Link every file, symlink and directory the manifests don't know about into the staging copy."""
+        for directory, dirnames, filenames in os.walk(self.destination):
+            relative_dir = os.path.relpath(directory, self.destination)
+            relative_dir = "" if relative_dir == "." else relative_dir
+            (self.staging / relative_dir).mkdir(parents=True, exist_ok=True)
+
+            for name in list(dirnames):
+                if os.path.islink(os.path.join(directory, name)):
+                    dirnames.remove(name)
+                    filenames.append(name)  # Carried as a link, not descended into
+
+            for name in filenames:
+                path = os.path.join(relative_dir, name)
+                if path in self._tracked or path == MANIFEST_NAME:
+                    continue
+                source_path, staged_path = os.path.join(directory, name), self.staging / path
+                if os.path.lexists(staged_path):
+                    continue
+                if os.path.islink(source_path):
+                    os.symlink(os.readlink(source_path), staged_path)
+                else:
+                    link_or_copy(source_path, staged_path)
+
+    def _scan_source(self, cached: Dict[str, list]) -> Dict[str, list]:
+        """Map source paths to [size, mtime_ns, hash], reusing hashes whose stat is unchanged."""
+        manifest = {}
+        for walked in self._walk(self.source):
+            path, st = walked.path, walked.stat
+            record = cached.get(path)
+            if record and record[0] == st.st_size and record[1] == st.st_mtime_ns:
+                manifest[path] = record
+            else:
+                manifest[path] = [st.st_size, st.st_mtime_ns, hash_file(self.source / path)]
+        return manifest
+
+    def _walk(self, root: Path) -> Iterator[WalkedFile]:
+        """Yield all files below a root, with their stat, except the manifest."""
+        walker = FileWalker(extensions=None, include_hidden=True, cache_listings=False)
+        for walked in walker.walk(root):
+            if os.path.basename(walked.path) != MANIFEST_NAME:
+                yield walked
+
+    def _matches_record(self, file_path: Path, record: Dict) -> bool:
+        try:
+            st = file_path.stat()
+        except OSError:
+            return False
+        return (st.st_size, st.st_mtime_ns, st.st_ino) == (record["size"], record["mtime_ns"], record["inode"])
+
+    def _load_manifest(self) -> Dict:
+        """Read the destination manifest; a missing or unreadable one is treated as empty."""
+        try:
+            with open(self.destination / MANIFEST_NAME, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if manifest.get("version") == MANIFEST_VERSION else {}
+
+    def _write_manifest(self, root: Path, paths: List[str]) -> None:
+        """Record the hash and current stat of every installed file under root."""
+        files = {}
+        for path in paths:
+            st = (root / path).stat()
+            files[path] = {
+                "hash": self._source_manifest[path][2],
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "inode": st.st_ino,
+            }
+
+        manifest = {"version": MANIFEST_VERSION, "files": files, "source": self._source_manifest}
+        temp_path = root / f"{MANIFEST_NAME}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, root / MANIFEST_NAME)
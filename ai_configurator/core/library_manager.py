@@ -3,11 +3,13 @@ Library Manager for tool-agnostic knowledge library.
 """
 
 import os
-import shutil
 import json
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from .file_utils import ensure_directory, copy_file
+from .file_walker import get_file_walker
+from .library_installer import LibraryInstaller
+from .search_index import SearchIndex
 
 
 class LibraryManager:
@@ -17,50 +19,66 @@ class LibraryManager:
         self.source_library = Path(__file__).parent.parent.parent / "library"
         self.config_dir = Path.home() / ".config" / "ai-configurator"
         self.library_dir = self.config_dir / "library"
+        self.installer = LibraryInstaller(self.source_library, self.library_dir)
+        self._synced = False
+        self._search_index: Optional[SearchIndex] = None
+    
+    @property
+    def search_index(self) -> SearchIndex:
+        """Full-text index of the library, opened on first search."""
+        if self._search_index is None:
+            self._search_index = SearchIndex()
+        return self._search_index
     
     def sync_library(self) -> bool:
-        """Sync library from source to config directory."""
+        """Sync library from source to config directory.
+        
+        Only files that differ from the installed manifest are copied or
+        deleted, and the new tree is swapped in atomically.
+        """
         try:
             ensure_directory(str(self.config_dir))
-            
-            # Remove existing library if it exists
-            if self.library_dir.exists():
-                shutil.rmtree(self.library_dir)
-            
-            # Copy entire library
-            shutil.copytree(self.source_library, self.library_dir)
-            
+            self.installer.install()
+            self._synced = True
             return True
         except Exception as e:
             print(f"Error syncing library: {e}")
             return False
     
     def ensure_library_synced(self) -> bool:
-        """Ensure library is synced, sync if not present."""
-        if not self.library_dir.exists():
-            return self.sync_library()
-        return True
+        """Ensure library is synced with the packaged source, syncing if it differs."""
+        if self._synced:
+            return True
+        
+        if not self.source_library.exists():
+            # Nothing to install from - use whatever is already there
+            return self.library_dir.exists()
+        
+        try:
+            self.installer.install()
+            self._synced = True
+            return True
+        except Exception as e:
+            print(f"Error syncing library: {e}")
+            return self.library_dir.exists()
     
     def list_categories(self) -> Dict[str, List[str]]:
         """List all categories and their contents."""
         if not self.ensure_library_synced():
             return {}
         
-        categories = {}
-        
-        for category_dir in self.library_dir.iterdir():
-            if category_dir.is_dir() and not category_dir.name.startswith('.'):
-                files = []
-                # Include both .md and .json files
-                for file_path in category_dir.rglob("*.md"):
-                    relative_path = file_path.relative_to(self.library_dir)
-                    files.append(str(relative_path))
-                for file_path in category_dir.rglob("*.json"):
-                    relative_path = file_path.relative_to(self.library_dir)
-                    files.append(str(relative_path))
-                categories[category_dir.name] = sorted(files)
-        
-        return categories
+        categories = {
+            entry.name: [] for entry in os.scandir(self.library_dir)
+            if entry.is_dir() and not entry.name.startswith('.')
+        }
+        
+        # One walk over the whole library, for every allowed extension
+        for walked in get_file_walker().walk(self.library_dir, refresh_stats=False):
+            category, sep, _ = walked.path.partition(os.sep)
+            if sep and category in categories:
+                categories[category].append(walked.path)
+        
+        return {name: sorted(files) for name, files in categories.items()}
     
     def list_roles(self) -> List[str]:
         """List all available roles."""
@@ -137,23 +155,21 @@ class LibraryManager:
         return None
     
     def search_files(self, query: str) -> List[str]:
-        """Search for files containing the query."""
+        """Search for files containing the query.
+        
+        Words must all appear in a file; use `prefix*` for prefix matches and
+        double quotes for exact phrases. Only files changed since the last
+        search are re-indexed.
+        """
         if not self.ensure_library_synced():
             return []
         
-        matches = []
-        query_lower = query.lower()
-        
-        for file_path in self.library_dir.rglob("*.md"):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read().lower()
-                    if query_lower in content or query_lower in file_path.name.lower():
-                        relative_path = file_path.relative_to(self.library_dir)
-                        matches.append(str(relative_path))
-            except Exception:
-                continue
-        
+        try:
+            return self.search_index.search(self.library_dir, query)
+        except Exception as e:
+            print(f"Error searching library: {e}")
+            return []
+    
     def get_role_info(self, role_name: str) -> Dict[str, Any]:
         """Get comprehensive information about a role."""
         if not self.ensure_library_synced():
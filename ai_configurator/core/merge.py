@@ -0,0 +1,100 @@
+"""
+Three-way line merge (diff3 style) for library files.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from .diff import matching_blocks
+
+
+@dataclass
+class MergeResult:
+    """Merged lines plus the number of overlapping changes left in conflict markers."""
+    lines: List[str] = field(default_factory=list)
+    conflicts: int = 0
+
+    @property
+    def clean(self) -> bool:
+        return self.conflicts == 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self.lines)
+
+
+def _sync_regions(ancestor: List[str], ours: List[str], theirs: List[str]) -> List[Tuple[int, int, int, int]]:
+    """Ranges of the ancestor left unchanged on both sides.
+
+    Each region is (ancestor_start, ancestor_end, ours_start, theirs_start),
+    ending with an empty sentinel region at the end of all three files.
+    """
+    ours_blocks = matching_blocks(ancestor, ours)
+    theirs_blocks = matching_blocks(ancestor, theirs)
+
+    regions = []
+    i = j = 0
+    while i < len(ours_blocks) and j < len(theirs_blocks):
+        ours_base, ours_start, ours_len = ours_blocks[i]
+        theirs_base, theirs_start, theirs_len = theirs_blocks[j]
+
+        start = max(ours_base, theirs_base)
+        end = min(ours_base + ours_len, theirs_base + theirs_len)
+        if start < end:
+            regions.append((start, end, ours_start + start - ours_base, theirs_start + start - theirs_base))
+
+        if ours_base + ours_len < theirs_base + theirs_len:
+            i += 1
+        else:
+            j += 1
+
+    regions.append((len(ancestor), len(ancestor), len(ours), len(theirs)))
+    return regions
+
+
+def _terminated(lines: List[str]) -> List[str]:
+    """Make sure a chunk ends with a newline before a conflict marker follows it."""
+    if lines and not lines[-1].endswith("\n"):
+        return lines[:-1] + [lines[-1] + "\n"]
+    return lines
+
+
+def merge3(ancestor: str, ours: str, theirs: str,
+           ours_label: str = "personal", theirs_label: str = "base") -> MergeResult:
+    """Merge two edited versions of a text against their common ancestor.
+
+    Hunks changed on only one side, or changed identically on both, are
+    taken automatically. Overlapping changes are written with diff3-style
+    conflict markers (ours, ancestor, theirs) and counted in the result.
+    """
+    ancestor_lines = ancestor.splitlines(keepends=True)
+    ours_lines = ours.splitlines(keepends=True)
+    theirs_lines = theirs.splitlines(keepends=True)
+
+    result = MergeResult()
+    a = o = t = 0
+    for a_start, a_end, o_start, t_start in _sync_regions(ancestor_lines, ours_lines, theirs_lines):
+        ancestor_chunk = ancestor_lines[a:a_start]
+        ours_chunk = ours_lines[o:o_start]
+        theirs_chunk = theirs_lines[t:t_start]
+
+        if ours_chunk == ancestor_chunk:
+            result.lines.extend(theirs_chunk)
+        elif theirs_chunk == ancestor_chunk or ours_chunk == theirs_chunk:
+            result.lines.extend(ours_chunk)
+        else:
+            result.conflicts += 1
+            result.lines.append(f"<<<<<<< {ours_label}\n")
+            result.lines.extend(_terminated(ours_chunk))
+            result.lines.append("||||||| ancestor\n")
+            result.lines.extend(_terminated(ancestor_chunk))
+            result.lines.append("=======\n")
+            result.lines.extend(_terminated(theirs_chunk))
+            result.lines.append(f">>>>>>> {theirs_label}\n")
+
+        result.lines.extend(ancestor_lines[a_start:a_end])
+        a = a_end
+        o = o_start + (a_end - a_start)
+        t = t_start + (a_end - a_start)
+
+    return result
@@ -0,0 +1,206 @@
+"""
+Metadata extraction for library files.
+
+Extraction runs as a pipeline of stages over a file's raw bytes. Stages
+that only need the top of the file (front matter, title) see a decoded
+prefix of at most PREFIX_BYTES; the body is covered by a single streaming
+pass that counts words and lines and collects tags without decoding it.
+Each file format (by extension) has its own pipeline.
+"""
+
+import json
+import mmap
+import re
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import yaml
+
+from .lazy_content import LazyContent
+
+
+TAG_PATTERN = re.compile(r'#(\w+)')
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+(.+?)\s*#*\s*$', re.MULTILINE)
+FRONT_MATTER_PATTERN = re.compile(r'\A---[ \t]*\r?\n(.*?)\r?\n---[ \t]*(?:\r?\n|\Z)', re.DOTALL)
+
+# Bytes decoded for front matter and title; bytes scanned per step of the body pass
+PREFIX_BYTES = 8192
+SCAN_CHUNK_BYTES = 1024 * 1024
+
+Buffer = Union[bytes, memoryview, mmap.mmap]
+
+# A stage reads the raw buffer and/or decoded prefix and updates the metadata in place
+MetadataStage = Callable[[Buffer, str, Dict[str, Any]], None]
+
+
+def front_matter_stage(buffer: Buffer, prefix: str, metadata: Dict[str, Any]) -> None:
+    """Read YAML front matter; its title, description, version and tags take precedence."""
+    match = FRONT_MATTER_PATTERN.match(prefix)
+    if not match:
+        return
+    try:
+        front_matter = yaml.safe_load(match.group(1))
+    except yaml.YAMLError:
+        return
+    if not isinstance(front_matter, dict):
+        return
+
+    metadata["body_offset"] = match.end()
+    _apply_document(front_matter, metadata)
+
+
+def _apply_document(document: Dict[str, Any], metadata: Dict[str, Any]) -> None:
+    """Take title, description, version and tags from a parsed mapping."""
+    # Dates and other YAML types are kept as strings so metadata stays JSON-serializable
+    metadata["front_matter"] = document = json.loads(json.dumps(document, default=str))
+    for key in ("title", "description", "version"):
+        if document.get(key) is not None:
+            metadata[key] = str(document[key])
+
+    tags = document.get("tags")
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(",")]
+    if isinstance(tags, list):
+        metadata["front_matter_tags"] = [str(tag) for tag in tags if str(tag)]
+
+
+def _apply_config_document(document: Any, metadata: Dict[str, Any]) -> None:
+    """Like front matter, but agent and server configs name themselves with "name"."""
+    if not isinstance(document, dict):
+        return
+    _apply_document(document, metadata)
+    # The document is the whole file; only the fields above are worth keeping
+    del metadata["front_matter"]
+    if not metadata["title"] and document.get("name") is not None:
+        metadata["title"] = str(document["name"])
+
+
+def json_stage(buffer: Buffer, prefix: str, metadata: Dict[str, Any]) -> None:
+    """Read title, description, version and tags from a top-level JSON object."""
+    try:
+        _apply_config_document(json.loads(bytes(buffer)), metadata)
+    except ValueError:
+        return
+
+
+def yaml_stage(buffer: Buffer, prefix: str, metadata: Dict[str, Any]) -> None:
+    """Read title, description, version and tags from a top-level YAML mapping."""
+    try:
+        _apply_config_document(yaml.safe_load(bytes(buffer)), metadata)
+    except yaml.YAMLError:
+        return
+
+
+def heading_stage(buffer: Buffer, prefix: str, metadata: Dict[str, Any]) -> None:
+    """Use the first top-level heading in the first 10 lines of the body as the title."""
+    if metadata["title"]:
+        return
+    for line in prefix[metadata.get("body_offset", 0):].splitlines()[:10]:
+        line = line.strip()
+        if line.startswith('# '):
+            metadata["title"] = line[2:].strip()
+            return
+
+
+def body_stage(buffer: Buffer, prefix: str, metadata: Dict[str, Any], collect_tags: bool = True) -> None:
+    """Count words and lines and collect #tags in one pass over the bytes.
+
+    Chunks are cut after their last ASCII whitespace byte, so no word, tag
+    or multi-byte character straddles two chunks and only SCAN_CHUNK_BYTES
+    are held at a time. Each chunk is decoded before counting, so Unicode
+    word characters and spaces behave as they do on the decoded text.
+    """
+    words = lines = 0
+    tags = set()
+    carry = b""
+    size = len(buffer)
+    for offset in range(0, size, SCAN_CHUNK_BYTES):
+        chunk = carry + buffer[offset:offset + SCAN_CHUNK_BYTES]
+        carry = b""
+        if offset + SCAN_CHUNK_BYTES < size:
+            cut = max(chunk.rfind(b" "), chunk.rfind(b"\n"), chunk.rfind(b"\t"), chunk.rfind(b"\r"))
+            chunk, carry = chunk[:cut + 1], chunk[cut + 1:]
+        lines += chunk.count(b"\n")
+        text = chunk.decode("utf-8", errors="replace")
+        words += len(text.split())
+        if collect_tags:
+            tags.update(TAG_PATTERN.findall(text))
+
+    if size and buffer[size - 1:size] != b"\n":
+        lines += 1
+
+    metadata["word_count"] = words
+    metadata["line_count"] = lines
+    metadata["tags"] = list(tags | set(metadata.pop("front_matter_tags", [])))
+
+
+def statistics_stage(buffer: Buffer, prefix: str, metadata: Dict[str, Any]) -> None:
+    """Word and line counts only; "#" in structured data is not a tag."""
+    body_stage(buffer, prefix, metadata, collect_tags=False)
+
+
+class MetadataExtractor:
+    """Runs metadata stages over a file; add stages to extract more fields."""
+
+    DEFAULT_STAGES: List[MetadataStage] = [front_matter_stage, heading_stage, body_stage]
+
+    def __init__(self, stages: Optional[List[MetadataStage]] = None):
+        self.stages = list(stages if stages is not None else self.DEFAULT_STAGES)
+
+    def add_stage(self, stage: MetadataStage) -> None:
+        self.stages.append(stage)
+
+    def extract(self, buffer: Buffer) -> Dict[str, Any]:
+        """Extract metadata from raw file bytes (bytes, mmap or memoryview)."""
+        metadata: Dict[str, Any] = {
+            "version": "1.0.0",  # Default version for compatibility
+            "title": "",
+            "tags": [],
+            "description": "",
+            "word_count": 0,
+            "line_count": 0
+        }
+        if not len(buffer):
+            return metadata
+
+        prefix = bytes(buffer[:PREFIX_BYTES]).decode("utf-8", errors="ignore")
+        for stage in self.stages:
+            stage(buffer, prefix, metadata)
+        metadata.pop("body_offset", None)
+        return metadata
+
+
+_default_extractor = MetadataExtractor()
+
+# Extractors per lower-case file extension; unknown extensions use the markdown one
+_extractors: Dict[str, MetadataExtractor] = {
+    ".md": _default_extractor,
+    ".txt": MetadataExtractor([body_stage]),
+    ".json": MetadataExtractor([json_stage, statistics_stage]),
+    ".yaml": MetadataExtractor([yaml_stage, statistics_stage]),
+    ".yml": MetadataExtractor([yaml_stage, statistics_stage]),
+}
+
+
+def register_extractor(extension: str, extractor: MetadataExtractor) -> None:
+    """Use an extractor for files with the given extension, e.g. ".toml"."""
+    _extractors[extension.lower()] = extractor
+
+
+def get_metadata_extractor(extension: str = ".md") -> MetadataExtractor:
+    """The shared extractor for a file extension."""
+    return _extractors.get(extension.lower(), _default_extractor)
+
+
+def extract_metadata(content: str, extension: str = ".md") -> Dict[str, Any]:
+    """Extract title, tags and size statistics from file content."""
+    return get_metadata_extractor(extension).extract(content.encode("utf-8"))
+
+
+def extract_metadata_lazy(content: LazyContent) -> Dict[str, Any]:
+    """Extract metadata from a mapped file without decoding it."""
+    return get_metadata_extractor(content.path.suffix).extract(content.buffer)
+
+
+def extract_headings(content: str) -> List[str]:
+    """Return the text of every markdown heading, in document order."""
+    return HEADING_PATTERN.findall(content)
@@ -44,7 +44,7 @@ class DatabaseConfig:
 class CacheConfig:
     """Cache configuration."""
     enabled: bool = True
-    max_memory_size: int = 50
+    max_memory_size: int = 50  # Megabytes of file content kept in memory
     ttl_hours: int = 24
     lazy_load_threshold_kb: int = 10
     persistent_cache: bool = True
@@ -349,7 +349,9 @@ class ConfigManager:
     
     def reload_config(self, env: Environment = None) -> ProductionConfig:
         """Reload configuration from environment."""
+        from .file_walker import reset_file_walker
         self._config = None
+        reset_file_walker()
         return self.load_config(env)
     
     def validate_config(self) -> List[str]:
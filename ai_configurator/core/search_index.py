@@ -0,0 +1,498 @@
+"""
+Persistent full-text inverted index over library markdown files.
+"""
+
+import math
+import re
+import threading
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .metadata import extract_headings, extract_metadata
+from .sqlite_utils import open_database
+from .library_index import IndexScan, LibraryIndex
+
+
+DEFAULT_SEARCH_INDEX_PATH = Path.home() / ".config" / "ai-configurator" / "cache" / "search_index.db"
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE docs (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    title TEXT NOT NULL,
+    len_title INTEGER NOT NULL,
+    len_headings INTEGER NOT NULL,
+    len_tags INTEGER NOT NULL,
+    len_body INTEGER NOT NULL,
+    content BLOB NOT NULL,
+    UNIQUE (root, path)
+);
+CREATE TABLE terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE
+);
+CREATE TABLE postings (
+    term_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL REFERENCES docs (id) ON DELETE CASCADE,
+    tf_title INTEGER NOT NULL,
+    tf_headings INTEGER NOT NULL,
+    tf_tags INTEGER NOT NULL,
+    tf_body INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    offsets BLOB NOT NULL,
+    PRIMARY KEY (term_id, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX postings_doc ON postings (doc_id);
+"""
+
+TOKEN_PATTERN = re.compile(r"\w+")
+QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+# Fields scored by BM25F, in the column order used by docs and postings
+FIELDS = ("title", "headings", "tags", "body")
+FIELD_BOOSTS = {"title": 3.0, "headings": 2.0, "tags": 2.0, "body": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SNIPPET_CHARS = 160
+
+# File name tokens are indexed after the body, one position apart so that a
+# phrase can never match across the boundary
+NAME_POSITION_GAP = 1
+
+# SQLite's default limit on bound parameters per statement is 999
+_SQL_BATCH = 500
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+@dataclass
+class QueryClause:
+    """One AND-ed part of a search query: a term, a `prefix*` or a "quoted phrase"."""
+    terms: List[str]
+    prefix: bool = False
+
+
+@dataclass
+class SearchResult:
+    """A ranked match with a snippet of the surrounding text."""
+    root: Path
+    path: str
+    score: float
+    title: str = ""
+    snippet: str = ""
+    # (start, end) character spans of matched words within the snippet
+    highlights: List[Tuple[int, int]] = field(default_factory=list)
+
+
+def parse_query(query: str) -> List[QueryClause]:
+    """Parse a query string into clauses that must all match."""
+    clauses = []
+    for phrase, word in QUERY_PATTERN.findall(query):
+        if phrase:
+            terms = tokenize(phrase)
+            if terms:
+                clauses.append(QueryClause(terms))
+            continue
+
+        prefix = word.endswith("*")
+        terms = tokenize(word)
+        if not terms:
+            continue
+        if prefix:
+            # "api-gate*" -> "api" AND "gate*"
+            clauses.extend(QueryClause([term]) for term in terms[:-1])
+            clauses.append(QueryClause([terms[-1]], prefix=True))
+        else:
+            clauses.extend(QueryClause([term]) for term in terms)
+    return clauses
+
+
+@dataclass
+class _Document:
+    """Analyzed form of one file, ready to be written to the index."""
+    path: str
+    content_hash: str
+    content: str
+    title: str
+    lengths: Tuple[int, int, int, int]
+    # term -> ([tf per field], positions, body character offsets)
+    postings: Dict[str, Tuple[List[int], List[int], List[int]]]
+
+
+class SearchIndex:
+    """SQLite inverted index of library files with BM25F ranking.
+
+    Each posting holds per-field term frequencies (title, headings, tags,
+    body), word positions for phrase queries and character offsets for
+    snippets; the compressed text is stored alongside so results never
+    re-read the file. Change detection is delegated to a LibraryIndex scan,
+    and a document is only re-analyzed when its content hash changes.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, library_index: Optional[LibraryIndex] = None):
+        self.db_path = db_path or DEFAULT_SEARCH_INDEX_PATH
+        self.library_index = library_index or LibraryIndex()
+        self._conn = open_database(self.db_path, SCHEMA, SCHEMA_VERSION)
+        self._lock = threading.Lock()
+        self._term_ids: Dict[str, int] = {}
+
+    def refresh(self, root: Path) -> Tuple[int, int]:
+        """Bring the postings for a library root up to date.
+
+        Returns the number of documents (re)indexed and removed.
+        """
+        return self.update(self.library_index.scan(root))
+
+    def update(self, scan: IndexScan) -> Tuple[int, int]:
+        """Apply a library scan, re-indexing only documents whose hash changed."""
+        root_key = str(scan.root)
+        with self._lock:
+            indexed = {
+                path: (doc_id, content_hash)
+                for doc_id, path, content_hash in self._conn.execute(
+                    "SELECT id, path, content_hash FROM docs WHERE root = ?", (root_key,)
+                )
+            }
+
+        stale = [
+            entry for path, entry in scan.files.items()
+            if indexed.get(path, (None, None))[1] != entry.content_hash
+        ]
+        removed = [indexed[path][0] for path in indexed if path not in scan.files]
+
+        # Analyze outside the lock; reading the files is the slow part
+        documents = []
+        for entry in stale:
+            try:
+                content = (scan.root / entry.path).read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            documents.append(self._analyze(entry.path, entry.content_hash, content))
+
+        if documents or removed:
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM docs WHERE id = ?", [(doc_id,) for doc_id in removed])
+                for document in documents:
+                    self._write_document(root_key, document)
+
+        return len(documents), len(removed)
+
+    def search(self, root: Path, query: str, refresh: bool = True) -> List[str]:
+        """Return relative paths under a root matching every clause of a query.
+
+        Supports plain terms, `prefix*` terms and "quoted phrases"; matching is
+        case-insensitive on whole words.
+        """
+        if refresh:
+            self.refresh(root)
+
+        with self._lock:
+            docs = self._matching_docs([root], parse_query(query))
+        return sorted(path for _, path in docs.values())
+
+    def rank(self, roots: Sequence[Path], query: str, limit: int = 20,
+             refresh: bool = True) -> List[SearchResult]:
+        """Return the best matches across library roots, highest BM25F score first."""
+        if refresh:
+            for root in roots:
+                self.refresh(root)
+
+        clauses = parse_query(query)
+        with self._lock:
+            docs = self._matching_docs(roots, clauses)
+            if not docs:
+                return []
+
+            scoring_terms = self._scoring_term_ids(clauses)
+            scores = self._score(roots, docs, scoring_terms)
+            ranked = sorted(docs, key=lambda doc_id: (-scores.get(doc_id, 0.0), docs[doc_id][1]))
+
+            results = []
+            for doc_id in ranked[:limit]:
+                root_key, path = docs[doc_id]
+                result = SearchResult(root=Path(root_key), path=path, score=scores.get(doc_id, 0.0))
+                self._add_snippet(result, doc_id, scoring_terms)
+                results.append(result)
+        return results
+
+    def clear(self, root: Optional[Path] = None) -> None:
+        """Drop the postings for one root, or the whole index."""
+        with self._lock, self._conn:
+            if root is None:
+                self._conn.execute("DELETE FROM docs")
+                self._conn.execute("DELETE FROM terms")
+                self._term_ids.clear()
+            else:
+                self._conn.execute("DELETE FROM docs WHERE root = ?", (str(root),))
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def _analyze(self, relative_path: str, content_hash: str, content: str) -> _Document:
+        """Tokenize a document into per-field frequencies, positions and offsets."""
+        metadata = extract_metadata(content, Path(relative_path).suffix)
+        title = metadata["title"]
+        postings: Dict[str, Tuple[List[int], List[int], List[int]]] = {}
+
+        def posting(term: str) -> Tuple[List[int], List[int], List[int]]:
+            if term not in postings:
+                postings[term] = ([0] * len(FIELDS), [], [])
+            return postings[term]
+
+        body_length = 0
+        for position, match in enumerate(TOKEN_PATTERN.finditer(content)):
+            tf, positions, offsets = posting(match.group().lower())
+            tf[3] += 1
+            positions.append(position)
+            offsets.append(match.start())
+            body_length = position + 1
+
+        # The file name counts towards the title and can be matched as a phrase
+        name_tokens = tokenize(Path(relative_path).stem)
+        name_start = body_length + NAME_POSITION_GAP
+        for offset, token in enumerate(name_tokens):
+            posting(token)[1].append(name_start + offset)
+
+        field_tokens = (
+            tokenize(title) + name_tokens,
+            [token for heading in extract_headings(content) for token in tokenize(heading)],
+            [token for tag in metadata["tags"] for token in tokenize(tag)],
+        )
+        for field_index, tokens in enumerate(field_tokens):
+            for token in tokens:
+                posting(token)[0][field_index] += 1
+
+        lengths = (len(field_tokens[0]), len(field_tokens[1]), len(field_tokens[2]), body_length)
+        return _Document(relative_path, content_hash, content, title, lengths, postings)
+
+    def _write_document(self, root_key: str, document: _Document) -> None:
+        """Replace one document's postings. Caller holds the lock and a transaction."""
+        self._conn.execute(
+            "INSERT INTO docs (root, path, content_hash, title, len_title, len_headings, len_tags, "
+            "len_body, content) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (root, path) DO UPDATE SET content_hash = excluded.content_hash, "
+            "title = excluded.title, len_title = excluded.len_title, "
+            "len_headings = excluded.len_headings, len_tags = excluded.len_tags, "
+            "len_body = excluded.len_body, content = excluded.content",
+            (root_key, document.path, document.content_hash, document.title, *document.lengths,
+             zlib.compress(document.content.encode("utf-8")))
+        )
+        doc_id = self._conn.execute(
+            "SELECT id FROM docs WHERE root = ? AND path = ?", (root_key, document.path)
+        ).fetchone()[0]
+        self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+
+        term_ids = self._resolve_term_ids(document.postings)
+        self._conn.executemany(
+            "INSERT INTO postings (term_id, doc_id, tf_title, tf_headings, tf_tags, tf_body, "
+            "positions, offsets) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(term_ids[term], doc_id, *tf, array("I", positions).tobytes(), array("I", offsets).tobytes())
+             for term, (tf, positions, offsets) in document.postings.items()]
+        )
+
+    def _resolve_term_ids(self, terms: Iterable[str]) -> Dict[str, int]:
+        """Look up (creating where needed) the ids of a set of terms."""
+        missing = [term for term in terms if term not in self._term_ids]
+        for start in range(0, len(missing), _SQL_BATCH):
+            batch = missing[start:start + _SQL_BATCH]
+            self._conn.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", [(t,) for t in batch])
+            placeholders = ",".join("?" * len(batch))
+            self._term_ids.update(
+                (term, term_id) for term_id, term in self._conn.execute(
+                    f"SELECT id, term FROM terms WHERE term IN ({placeholders})", batch
+                )
+            )
+        return self._term_ids
+
+    def _matching_docs(self, roots: Sequence[Path], clauses: List[QueryClause]) -> Dict[int, Tuple[str, str]]:
+        """Map doc id -> (root, path) for documents under the roots matching every clause."""
+        if not clauses or not roots:
+            return {}
+
+        candidates: Optional[Set[int]] = None
+        # Cheapest clauses first so later ones only need to shrink the set
+        for clause in sorted(clauses, key=lambda c: (c.prefix, len(c.terms))):
+            matches = self._match_clause(clause)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return {}
+
+        root_keys = [str(root) for root in roots]
+        root_placeholders = ",".join("?" * len(root_keys))
+        docs = {}
+        doc_ids = list(candidates)
+        for start in range(0, len(doc_ids), _SQL_BATCH):
+            batch = doc_ids[start:start + _SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            for doc_id, root_key, path in self._conn.execute(
+                f"SELECT id, root, path FROM docs WHERE root IN ({root_placeholders}) "
+                f"AND id IN ({placeholders})",
+                [*root_keys, *batch]
+            ):
+                docs[doc_id] = (root_key, path)
+        return docs
+
+    def _match_clause(self, clause: QueryClause) -> Set[int]:
+        """Documents matching a single clause. Caller holds the lock."""
+        if clause.prefix:
+            term = clause.terms[0]
+            # Every term sharing the prefix sorts within [term, term + U+10FFFF)
+            rows = self._conn.execute(
+                "SELECT DISTINCT p.doc_id FROM terms t JOIN postings p ON p.term_id = t.id "
+                "WHERE t.term >= ? AND t.term < ?",
+                (term, term + "\U0010ffff")
+            )
+            return {doc_id for (doc_id,) in rows}
+
+        if len(clause.terms) == 1:
+            rows = self._conn.execute(
+                "SELECT p.doc_id FROM terms t JOIN postings p ON p.term_id = t.id WHERE t.term = ?",
+                (clause.terms[0],)
+            )
+            return {doc_id for (doc_id,) in rows}
+
+        return self._match_phrase(clause.terms)
+
+    def _match_phrase(self, terms: List[str]) -> Set[int]:
+        """Documents containing the terms at consecutive positions."""
+        postings: List[Dict[int, bytes]] = []
+        for term in terms:
+            rows = self._conn.execute(
+                "SELECT p.doc_id, p.positions FROM terms t JOIN postings p ON p.term_id = t.id "
+                "WHERE t.term = ?",
+                (term,)
+            ).fetchall()
+            if not rows:
+                return set()
+            postings.append(dict(rows))
+
+        matches = set()
+        for doc_id in set.intersection(*(set(p) for p in postings)):
+            # Shift each term's positions back by its offset in the phrase;
+            # a common start position is a phrase occurrence
+            starts = set(array("I", postings[0][doc_id]))
+            for offset, term_postings in enumerate(postings[1:], start=1):
+                starts &= {pos - offset for pos in array("I", term_postings[doc_id])}
+                if not starts:
+                    break
+            if starts:
+                matches.add(doc_id)
+        return matches
+
+    def _scoring_term_ids(self, clauses: List[QueryClause]) -> List[int]:
+        """Ids of the indexed terms a query scores on, prefixes expanded."""
+        term_ids = set()
+        for clause in clauses:
+            if clause.prefix:
+                term = clause.terms[0]
+                rows = self._conn.execute(
+                    "SELECT id FROM terms WHERE term >= ? AND term < ?", (term, term + "\U0010ffff")
+                )
+            else:
+                placeholders = ",".join("?" * len(clause.terms))
+                rows = self._conn.execute(
+                    f"SELECT id FROM terms WHERE term IN ({placeholders})", clause.terms
+                )
+            term_ids.update(term_id for (term_id,) in rows)
+        return sorted(term_ids)
+
+    def _score(self, roots: Sequence[Path], docs: Dict[int, Tuple[str, str]],
+               term_ids: List[int]) -> Dict[int, float]:
+        """BM25F scores for the candidate documents.
+
+        Field frequencies are length-normalized per field, weighted by
+        FIELD_BOOSTS and summed before the k1 saturation, so a word repeated
+        in the body cannot outweigh a single hit in the title.
+        """
+        root_keys = [str(root) for root in roots]
+        root_placeholders = ",".join("?" * len(root_keys))
+        stats = self._conn.execute(
+            f"SELECT COUNT(*), AVG(len_title), AVG(len_headings), AVG(len_tags), AVG(len_body) "
+            f"FROM docs WHERE root IN ({root_placeholders})",
+            root_keys
+        ).fetchone()
+        total_docs = stats[0]
+        avg_lengths = [avg or 1.0 for avg in stats[1:]]
+        boosts = [FIELD_BOOSTS[name] for name in FIELDS]
+
+        scores: Dict[int, float] = {}
+        for term_id in term_ids:
+            rows = self._conn.execute(
+                f"SELECT p.doc_id, p.tf_title, p.tf_headings, p.tf_tags, p.tf_body, "
+                f"d.len_title, d.len_headings, d.len_tags, d.len_body "
+                f"FROM postings p JOIN docs d ON d.id = p.doc_id "
+                f"WHERE p.term_id = ? AND d.root IN ({root_placeholders})",
+                [term_id, *root_keys]
+            ).fetchall()
+            if not rows:
+                continue
+
+            idf = math.log(1 + (total_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+            for doc_id, *values in rows:
+                if doc_id not in docs:
+                    continue
+                weighted_tf = 0.0
+                for i in range(len(FIELDS)):
+                    tf, length = values[i], values[i + len(FIELDS)]
+                    if tf:
+                        norm = 1 - BM25_B + BM25_B * length / avg_lengths[i]
+                        weighted_tf += boosts[i] * tf / norm
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * weighted_tf * (BM25_K1 + 1) / (weighted_tf + BM25_K1)
+        return scores
+
+    def _add_snippet(self, result: SearchResult, doc_id: int, term_ids: List[int]) -> None:
+        """Fill in title and a highlighted snippet from the stored text and offsets."""
+        title, content = self._conn.execute(
+            "SELECT title, content FROM docs WHERE id = ?", (doc_id,)
+        ).fetchone()
+        text = zlib.decompress(content).decode("utf-8")
+        result.title = title
+
+        offsets: List[int] = []
+        if term_ids:
+            placeholders = ",".join("?" * len(term_ids))
+            for (blob,) in self._conn.execute(
+                f"SELECT offsets FROM postings WHERE doc_id = ? AND term_id IN ({placeholders})",
+                [doc_id, *term_ids]
+            ):
+                offsets.extend(array("I", blob))
+            offsets.sort()
+
+        # Window starting at the match followed by the most other matches
+        start = 0
+        if offsets:
+            best, right = 0, 0
+            for left, offset in enumerate(offsets):
+                while right < len(offsets) and offsets[right] < offset + SNIPPET_CHARS:
+                    right += 1
+                if right - left > best:
+                    best, start = right - left, offset
+            start = max(0, start - SNIPPET_CHARS // 4)
+            # Don't cut a word in half at the start of the snippet
+            while 0 < start and text[start - 1].isalnum():
+                start -= 1
+        end = min(len(text), start + SNIPPET_CHARS)
+
+        prefix = "…" if start > 0 else ""
+        suffix = "…" if end < len(text) else ""
+        result.snippet = prefix + text[start:end].replace("\n", " ") + suffix
+
+        for offset in offsets:
+            if start <= offset < end:
+                match = TOKEN_PATTERN.match(text, offset)
+                if match:
+                    result.highlights.append(
+                        (offset - start + len(prefix), min(match.end(), end) - start + len(prefix))
+                    )
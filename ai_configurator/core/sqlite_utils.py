@@ -0,0 +1,54 @@
+"""
+SQLite helpers for the persistent indexes and caches.
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+
+def open_database(db_path: Path, schema: str, schema_version: int, _retry: bool = True) -> sqlite3.Connection:
+    """Open a WAL-mode SQLite database, (re)creating the schema when its version changes.
+
+    Every store built on this helper is a derived cache of files on disk, so a
+    version mismatch simply drops the old tables and starts over.
+    """
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), check_same_thread=False)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+
+        current_version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if current_version != schema_version:
+            if current_version:
+                logger.info(f"Rebuilding {db_path.name}: schema {current_version} -> {schema_version}")
+            _drop_all_tables(conn)
+            conn.executescript(schema)
+            conn.execute(f"PRAGMA user_version = {int(schema_version)}")
+            conn.commit()
+    except sqlite3.DatabaseError:
+        conn.close()
+        if not _retry:
+            raise
+        # Corrupted cache file - discard it and start from scratch
+        logger.warning(f"Discarding unreadable database {db_path}")
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+        return open_database(db_path, schema, schema_version, _retry=False)
+    return conn
+
+
+def _drop_all_tables(conn: sqlite3.Connection) -> None:
+    """Drop every user table (and with it, its indexes) in the database."""
+    conn.execute("PRAGMA foreign_keys=OFF")
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    ).fetchall()
+    for (name,) in rows:
+        conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+    conn.execute("PRAGMA foreign_keys=ON")
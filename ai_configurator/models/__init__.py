@@ -4,7 +4,7 @@ Pydantic models for AI Configurator domain entities.
 
 from .agent import Agent, AgentConfig, AgentSettings
 from .configuration import Configuration, UserPreferences, SyncSettings, LibraryConfig, BackupPolicy, BackupInfo
-from .library import Library, LibraryMetadata, LibraryFile, ConflictInfo
+from .library import Library, LibraryLayer, LibraryMetadata, LibraryFile, ConflictInfo
 from .mcp_server import MCPServer, MCPServerConfig
 from .sync_models import LibrarySync, ConflictReport, SyncHistory, SyncOperation, FileDiff
 from .file_models import FilePattern, LocalResource, FileWatcher, FileWatchConfig, FileDiscoveryResult
@@ -27,6 +27,7 @@ __all__ = [
     "BackupInfo",
     "LibraryMetadata",
     "LibraryFile",
+    "LibraryLayer",
     "ConflictInfo",
     "MCPServerConfig",
     # Sync models
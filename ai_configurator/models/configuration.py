@@ -22,6 +22,10 @@ class SyncSettings(BaseModel):
     """Library synchronization preferences."""
     auto_sync_on_startup: bool = Field(default=True)
     conflict_resolution_strategy: str = Field(default="prompt", description="Default conflict resolution")
+    conflict_policies: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Conflict resolution per file glob, e.g. {'roles/**': 'keep_local'}; first match wins"
+    )
     excluded_patterns: List[str] = Field(default_factory=lambda: ["*.tmp", "*.bak"])
     sync_timeout_seconds: int = Field(default=300, ge=1)
 
@@ -33,6 +37,14 @@ class LibraryConfig(BaseModel):
     backup_path: Path = Field(default_factory=lambda: Path.home() / ".config" / "ai-configurator" / "backups")
     remote_library_url: Optional[str] = Field(default=None, description="Remote Git repository URL")
     remote_library_path: Optional[str] = Field(default=None, description="Local path for remote library")
+    remote_layers: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Additional team library checkouts layered over the base library, name -> local path"
+    )
+    layer_precedence: List[str] = Field(
+        default_factory=list,
+        description="Layer names from lowest to highest precedence; empty for base, remote layers, personal"
+    )
 
 
 class UserPreferences(BaseModel):
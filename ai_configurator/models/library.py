@@ -4,8 +4,8 @@ Library domain model for knowledge management.
 
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Set
+from pydantic import BaseModel, Field, PrivateAttr
 
 from .value_objects import LibrarySource, ConflictType, Resolution, SyncStatus
 
@@ -41,23 +41,104 @@ class LibraryFile(BaseModel):
     size: int = Field(default=0, description="File size in bytes")
 
 
+class LibraryLayer(BaseModel):
+    """One directory tree of library files; higher layers override lower ones."""
+    name: str = Field(..., description="Layer name, used as the key prefix in Library.files")
+    path: Path = Field(..., description="Root directory of the layer")
+    source: LibrarySource = Field(..., description="Source of the layer's files")
+    
+    class Config:
+        frozen = True
+
+
 class Library(BaseModel):
-    """Core Library domain entity."""
+    """Core Library domain entity.
+    
+    Files from every layer live in ``files`` under "<layer>/<relative path>"
+    keys. The effective view (which layer wins for each relative path) is
+    materialized once and updated per file as layers change, so lookups are
+    a dict access whatever the number of layers.
+    """
     base_path: Path = Field(..., description="Path to base library")
     personal_path: Path = Field(..., description="Path to personal library")
     metadata: LibraryMetadata = Field(default_factory=LibraryMetadata)
     files: Dict[str, LibraryFile] = Field(default_factory=dict)
+    layers: List[LibraryLayer] = Field(
+        default_factory=list,
+        description="Layers from lowest to highest precedence; defaults to base then personal"
+    )
+    
+    # Relative path -> rank of the winning layer, and the paths present in each layer
+    _effective: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _layer_paths: Dict[str, Set[str]] = PrivateAttr(default_factory=dict)
+    _ranks: Dict[str, int] = PrivateAttr(default_factory=dict)
+    
+    def model_post_init(self, __context: Any) -> None:
+        if not self.layers:
+            self.layers = [
+                LibraryLayer(name=LibrarySource.BASE.value, path=self.base_path, source=LibrarySource.BASE),
+                LibraryLayer(name=LibrarySource.PERSONAL.value, path=self.personal_path, source=LibrarySource.PERSONAL),
+            ]
+        self._ranks = {layer.name: rank for rank, layer in enumerate(self.layers)}
+        self._layer_paths = {layer.name: set() for layer in self.layers}
+        for key in self.files:
+            layer, _, relative_path = key.partition("/")
+            self._promote(layer, relative_path)
     
     def get_effective_file(self, relative_path: str) -> Optional[LibraryFile]:
-        """Get effective file with personal library taking precedence."""
-        # Check personal library first
-        personal_key = f"personal/{relative_path}"
-        if personal_key in self.files:
-            return self.files[personal_key]
-        
-        # Fall back to base library
-        base_key = f"base/{relative_path}"
-        return self.files.get(base_key)
+        """Get the file from the highest-precedence layer that has it."""
+        rank = self._effective.get(relative_path)
+        if rank is None:
+            return None
+        return self.files[f"{self.layers[rank].name}/{relative_path}"]
+    
+    def get_effective_layer(self, relative_path: str) -> Optional[LibraryLayer]:
+        """Get the layer the effective file comes from."""
+        rank = self._effective.get(relative_path)
+        return None if rank is None else self.layers[rank]
+    
+    def effective_paths(self) -> List[str]:
+        """Relative paths of all effective files."""
+        return sorted(self._effective)
+    
+    def get_layer(self, name: str) -> Optional[LibraryLayer]:
+        rank = self._ranks.get(name)
+        return None if rank is None else self.layers[rank]
+    
+    def put_file(self, layer: str, library_file: LibraryFile) -> None:
+        """Add or replace a file in one layer."""
+        self.files[f"{layer}/{library_file.path}"] = library_file
+        self._promote(layer, library_file.path)
+    
+    def remove_file(self, layer: str, relative_path: str) -> None:
+        """Remove a file from one layer, uncovering the next layer's copy."""
+        if self.files.pop(f"{layer}/{relative_path}", None) is None:
+            return
+        self._layer_paths.get(layer, set()).discard(relative_path)
+        if self._effective.get(relative_path) != self._ranks.get(layer):
+            return
+        for rank in range(self._ranks[layer] - 1, -1, -1):
+            if relative_path in self._layer_paths[self.layers[rank].name]:
+                self._effective[relative_path] = rank
+                return
+        del self._effective[relative_path]
+    
+    def set_layer_files(self, layer: str, files: Dict[str, LibraryFile]) -> None:
+        """Replace one layer's files (keyed by relative path); only paths that changed are touched."""
+        for relative_path in self._layer_paths.get(layer, set()) - files.keys():
+            self.remove_file(layer, relative_path)
+        for relative_path, library_file in files.items():
+            if self.files.get(f"{layer}/{relative_path}") != library_file:
+                self.put_file(layer, library_file)
+    
+    def _promote(self, layer: str, relative_path: str) -> None:
+        rank = self._ranks.get(layer)
+        if rank is None:
+            return  # Not a layer of this library
+        self._layer_paths[layer].add(relative_path)
+        current = self._effective.get(relative_path)
+        if current is None or current <= rank:
+            self._effective[relative_path] = rank
     
     def has_conflict(self, relative_path: str) -> bool:
         """Check if a file has unresolved conflicts."""
@@ -104,21 +185,14 @@ class Library(BaseModel):
         return False
     
     def discover_files(self, pattern: str = "**/*.md") -> List[str]:
-        """Discover files matching the given pattern."""
-        discovered = []
-        
-        # Search base library
-        if self.base_path.exists():
-            for file_path in self.base_path.glob(pattern):
-                if file_path.is_file():
-                    relative_path = file_path.relative_to(self.base_path)
-                    discovered.append(str(relative_path))
+        """Discover files matching the given pattern in any layer."""
+        discovered = set()
         
-        # Search personal library (overrides base)
-        if self.personal_path.exists():
-            for file_path in self.personal_path.glob(pattern):
+        for layer in self.layers:
+            if not layer.path.exists():
+                continue
+            for file_path in layer.path.glob(pattern):
                 if file_path.is_file():
-                    relative_path = file_path.relative_to(self.personal_path)
-                    discovered.append(str(relative_path))
+                    discovered.add(str(file_path.relative_to(layer.path)))
         
-        return list(set(discovered))  # Remove duplicates
+        return list(discovered)
@@ -29,6 +29,11 @@ class ConflictReport(BaseModel):
     personal_exists: bool = Field(..., description="File exists in personal library")
     base_hash: str = Field(default="", description="Hash of base content")
     personal_hash: str = Field(default="", description="Hash of personal content")
+    ancestor_hash: str = Field(default="", description="Hash of the base version the personal file came from")
+    base_size: int = Field(default=0, description="Size of base file in bytes")
+    personal_size: int = Field(default=0, description="Size of personal file in bytes")
+    base_file: Optional[Path] = Field(default=None, description="Base file location, read when a diff is requested")
+    personal_file: Optional[Path] = Field(default=None, description="Personal file location, read when a diff is requested")
     diff: Optional[FileDiff] = Field(default=None, description="File differences")
     suggested_resolution: Resolution = Field(..., description="Suggested resolution")
     
@@ -49,6 +54,7 @@ class SyncOperation(BaseModel):
     resolution: Optional[Resolution] = Field(default=None, description="Applied resolution")
     backup_path: Optional[str] = Field(default=None, description="Path to backup file")
     success: bool = Field(default=False, description="Operation success status")
+    manual_merge: bool = Field(default=False, description="Merge needed (or still needs) a human")
     error_message: Optional[str] = Field(default=None, description="Error message if failed")
 
 
@@ -60,6 +66,9 @@ class SyncHistory(BaseModel):
     operations: List[SyncOperation] = Field(default_factory=list)
     conflicts_detected: int = Field(default=0, description="Number of conflicts detected")
     conflicts_resolved: int = Field(default=0, description="Number of conflicts resolved")
+    merges_automatic: int = Field(default=0, description="Number of conflicts merged without user input")
+    resolved_by_policy: int = Field(default=0, description="Number of conflicts a policy resolved by keeping or replacing a side")
+    merges_manual: int = Field(default=0, description="Number of conflicts that needed a manual merge")
     success: bool = Field(default=False, description="Overall sync success")
     
     def add_operation(self, operation: SyncOperation) -> None:
@@ -19,6 +19,7 @@ class LibrarySource(str, Enum):
     BASE = "base"
     PERSONAL = "personal"
     LOCAL = "local"
+    REMOTE = "remote"
 
 
 class ConflictType(str, Enum):
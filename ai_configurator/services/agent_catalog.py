@@ -0,0 +1,341 @@
+"""
+Persistent, stat-validated catalog of agent summaries and their dependencies.
+"""
+
+import json
+import os
+import posixpath
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..core.hashing import hash_bytes
+from ..core.sqlite_utils import open_database
+from ..models import (
+    Agent, AgentConfig, AgentSettings, HealthStatus, LibrarySource, MCPServerConfig, ResourcePath, ToolType
+)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+CATALOG_FILENAME = ".catalog.db"
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE agents (
+    file TEXT PRIMARY KEY,
+    name TEXT,
+    tool_type TEXT,
+    description TEXT NOT NULL,
+    resource_count INTEGER NOT NULL,
+    server_count INTEGER NOT NULL,
+    health TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE agent_resources (
+    path TEXT NOT NULL,
+    file TEXT NOT NULL,
+    PRIMARY KEY (path, file)
+) WITHOUT ROWID;
+CREATE INDEX agent_resources_file ON agent_resources (file);
+CREATE TABLE agent_servers (
+    server TEXT NOT NULL,
+    file TEXT NOT NULL,
+    PRIMARY KEY (server, file)
+) WITHOUT ROWID;
+CREATE INDEX agent_servers_file ON agent_servers (file);
+"""
+
+_COLUMNS = ("file, name, tool_type, description, resource_count, server_count, health, "
+            "size, mtime_ns, inode, content_hash")
+
+
+@dataclass
+class AgentSummary:
+    """Catalog row for one agent file; name is None if the file does not parse."""
+    file: str
+    name: Optional[str]
+    tool_type: Optional[ToolType]
+    description: str
+    resource_count: int
+    server_count: int
+    health_status: HealthStatus
+    size: int
+    mtime_ns: int
+    inode: int
+    content_hash: str
+
+    @property
+    def valid(self) -> bool:
+        return self.name is not None
+
+    @property
+    def stat_key(self) -> Tuple[int, int, int]:
+        return (self.size, self.mtime_ns, self.inode)
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "AgentSummary":
+        file, name, tool_type, description, resources, servers, health, size, mtime_ns, inode, content_hash = row
+        return cls(file, name, ToolType(tool_type) if tool_type else None, description, resources, servers,
+                   HealthStatus(health), size, mtime_ns, inode, content_hash)
+
+    def to_row(self) -> tuple:
+        return (self.file, self.name, self.tool_type.value if self.tool_type else None, self.description,
+                self.resource_count, self.server_count, self.health_status.value,
+                self.size, self.mtime_ns, self.inode, self.content_hash)
+
+
+def summarize(file: str, agent: Optional[Agent], st: os.stat_result, content_hash: str) -> AgentSummary:
+    """Build a catalog row from a validated agent, or an invalid row for an unreadable file."""
+    if agent is None:
+        return AgentSummary(file, None, None, "", 0, 0, HealthStatus.ERROR,
+                            st.st_size, st.st_mtime_ns, st.st_ino, content_hash)
+    return AgentSummary(
+        file, agent.name, agent.tool_type, agent.config.description,
+        len(agent.config.resources), len(agent.config.mcp_servers), agent.health_status,
+        st.st_size, st.st_mtime_ns, st.st_ino, content_hash
+    )
+
+
+def normalize_resource_path(path: str) -> str:
+    """Resource paths as compared by the dependency index: "/"-separated, without "./" or a trailing "/"."""
+    path = posixpath.normpath(path.replace(os.sep, "/")) if path else ""
+    return "" if path == "." else path
+
+
+def loads(data: bytes) -> Any:
+    """Parse JSON bytes, with orjson when it is installed."""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def parse_agent(data: bytes) -> Optional[Agent]:
+    """Parse and validate an agent file's bytes; None if it is not a valid agent."""
+    try:
+        agent = Agent(config=AgentConfig(**loads(data)))
+    except Exception:
+        return None
+    agent.validate()  # Update health status
+    return agent
+
+
+@lru_cache(maxsize=8192)
+def _resource_path(path: str, source: str) -> ResourcePath:
+    """ResourcePath is frozen, so agents referencing the same library file share one instance."""
+    return ResourcePath.model_construct(path=path, source=LibrarySource(source))
+
+
+def construct_agent(data: Dict[str, Any]) -> Agent:
+    """Build a healthy agent from an already validated document, skipping pydantic validation.
+
+    Only the nested models, enums and timestamps are converted by hand.
+    Raises ValueError, KeyError or TypeError if the document is not shaped
+    like a saved agent.
+    """
+    fields = dict(data)
+    fields["tool_type"] = ToolType(data["tool_type"])
+    fields["resources"] = [_resource_path(resource["path"], resource["source"]) for resource in data.get("resources", ())]
+    fields["mcp_servers"] = {
+        name: MCPServerConfig.model_construct(**config) for name, config in data.get("mcp_servers", {}).items()
+    }
+    if "settings" in data:
+        fields["settings"] = AgentSettings.model_construct(**data["settings"])
+    for key in ("created_at", "updated_at"):
+        if key in data:
+            fields[key] = datetime.fromisoformat(data[key])
+    return Agent.model_construct(
+        config=AgentConfig.model_construct(**fields), health_status=HealthStatus.HEALTHY, validation_errors=[]
+    )
+
+
+class AgentCatalog:
+    """SQLite catalog of the agents directory, one summary row per agent file.
+
+    Rows remember the (size, mtime_ns, inode) they were built from. Listing
+    takes one scandir of the directory and one query; only files whose stat
+    changed are read, parsed and validated again. AgentService keeps rows
+    current when it saves or deletes agents itself.
+
+    Alongside each row the catalog keeps the agent's edges in a reverse
+    dependency index (resource path -> agent files, MCP server name -> agent
+    files), so the agents affected by a library or server change are found
+    with an indexed lookup instead of loading every agent.
+    """
+
+    def __init__(self, agents_dir: Path, db_path: Optional[Path] = None):
+        self.agents_dir = agents_dir
+        self.db_path = db_path or agents_dir / CATALOG_FILENAME
+        self._conn = open_database(self.db_path, SCHEMA, SCHEMA_VERSION)
+        self._lock = threading.Lock()
+
+    def summaries(self, tool_type: Optional[ToolType] = None,
+                  parsed: Optional[Dict[str, Agent]] = None) -> List[AgentSummary]:
+        """Summaries of every valid agent, sorted by name, revalidated against the directory.
+
+        Agents parsed along the way (new or changed files) are added to
+        ``parsed`` by file name, so a caller loading them needn't read them again.
+        """
+        return sorted(
+            (summary for summary in self.refresh(parsed).values()
+             if summary.valid and (tool_type is None or summary.tool_type == tool_type)),
+            key=lambda summary: summary.name
+        )
+
+    def refresh(self, parsed: Optional[Dict[str, Agent]] = None) -> Dict[str, AgentSummary]:
+        """Bring the catalog in line with the directory; returns every row (valid or not) by file."""
+        with self._lock:
+            known = {
+                row[0]: AgentSummary.from_row(row)
+                for row in self._conn.execute(f"SELECT {_COLUMNS} FROM agents")
+            }
+
+        current: Dict[str, AgentSummary] = {}
+        updates: List[Tuple[AgentSummary, Optional[Agent]]] = []
+        try:
+            with os.scandir(self.agents_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json"):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    summary = known.pop(entry.name, None)
+                    if summary is None or summary.stat_key != (st.st_size, st.st_mtime_ns, st.st_ino):
+                        read = self._read(entry.name)
+                        if read is None:
+                            continue
+                        updates.append(read)
+                        summary = read[0]
+                        if parsed is not None and read[1] is not None:
+                            parsed[entry.name] = read[1]
+                    current[entry.name] = summary
+        except OSError:
+            pass
+
+        # Rows still in `known` belong to files that are gone
+        if updates or known:
+            self._store(updates, known)
+        return current
+
+    def get(self, file: str) -> Optional[AgentSummary]:
+        """The stored row for a file, without checking the disk."""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM agents WHERE file = ?", (file,)).fetchone()
+        return AgentSummary.from_row(row) if row else None
+
+    def load(self, file: str, summary: Optional[AgentSummary] = None) -> Optional[Agent]:
+        """Load an agent file, trusting it when it is exactly what the catalog validated.
+
+        A file matching a healthy row (written by AgentService, or fully
+        validated when it was catalogued) is constructed without pydantic
+        validation; anything else takes the validating path. Like refresh(),
+        a matching (size, mtime_ns, inode) is trusted as is, and only files
+        whose stat changed are hashed to check their content.
+        Pass the row when it is at hand to save the lookup.
+        """
+        try:
+            with open(self.agents_dir / file, "rb") as f:
+                st = os.fstat(f.fileno())
+                data = f.read()
+        except OSError:
+            return None
+        summary = summary or self.get(file)
+        if (summary is not None and summary.health_status == HealthStatus.HEALTHY
+                and (summary.stat_key == (st.st_size, st.st_mtime_ns, st.st_ino)
+                     or summary.content_hash == hash_bytes(data))):
+            try:
+                return construct_agent(loads(data))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                pass
+        return parse_agent(data)
+
+    def dependents(self, paths: Iterable[str] = (), servers: Iterable[str] = ()) -> List[AgentSummary]:
+        """Valid agents referencing any of the resource paths or MCP servers, sorted by name.
+
+        A path also matches every resource below it, so "roles" or "roles/"
+        finds agents using any role file.
+        """
+        rows = self.refresh()
+        files: Set[str] = set()
+        with self._lock:
+            for path in paths:
+                path = normalize_resource_path(path)
+                if not path:
+                    continue
+                files.update(file for (file,) in self._conn.execute(
+                    "SELECT file FROM agent_resources WHERE path = ? OR (path >= ? AND path < ?)",
+                    (path, path + "/", path + "0")  # "0" sorts right after "/"
+                ))
+            for server in servers:
+                files.update(file for (file,) in self._conn.execute(
+                    "SELECT file FROM agent_servers WHERE server = ?", (server,)
+                ))
+
+        return sorted(
+            (rows[file] for file in files if file in rows and rows[file].valid),
+            key=lambda summary: summary.name
+        )
+
+    def update(self, file: str, agent: Agent, data: bytes) -> None:
+        """Record an agent just written to file, from the bytes that were written."""
+        try:
+            st = (self.agents_dir / file).stat()
+        except OSError:
+            self.remove(file)
+            return
+        self._store([(summarize(file, agent, st, hash_bytes(data)), agent)], ())
+
+    def remove(self, file: str) -> None:
+        self._store((), [file])
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            for table in ("agents", "agent_resources", "agent_servers"):
+                self._conn.execute(f"DELETE FROM {table}")
+
+    def _store(self, updates: Iterable[Tuple[AgentSummary, Optional[Agent]]], removed: Iterable[str]) -> None:
+        """Replace rows and dependency edges of updated files and drop removed ones, in one transaction."""
+        updates = list(updates)
+        stale = [(summary.file,) for summary, _ in updates] + [(file,) for file in removed]
+        resources = []
+        servers = []
+        for summary, agent in updates:
+            if agent is None:
+                continue
+            resources.extend({(normalize_resource_path(r.path), summary.file) for r in agent.config.resources})
+            servers.extend((server, summary.file) for server in agent.config.mcp_servers)
+
+        with self._lock, self._conn:
+            for table in ("agents", "agent_resources", "agent_servers"):
+                self._conn.executemany(f"DELETE FROM {table} WHERE file = ?", stale)
+            self._conn.executemany(
+                f"INSERT INTO agents ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [summary.to_row() for summary, _ in updates]
+            )
+            self._conn.executemany("INSERT OR IGNORE INTO agent_resources (path, file) VALUES (?, ?)", resources)
+            self._conn.executemany("INSERT INTO agent_servers (server, file) VALUES (?, ?)", servers)
+
+    def _read(self, file: str) -> Optional[Tuple[AgentSummary, Optional[Agent]]]:
+        """Parse one agent file into a row and its agent; None if it vanished or cannot be read."""
+        path = self.agents_dir / file
+        try:
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                data = f.read()
+        except OSError:
+            return None
+        agent = parse_agent(data)
+        return summarize(file, agent, st, hash_bytes(data)), agent
@@ -3,11 +3,33 @@ Agent service for managing AI agent lifecycle and operations.
 """
 
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
+from ..core.agent_manager import q_cli_agents_dir
+from ..core.file_utils import write_if_changed
 from ..models import Agent, AgentConfig, ToolType, HealthStatus
+from .agent_catalog import AgentCatalog, AgentSummary
+
+
+MAX_EXPORT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+
+@dataclass
+class ExportReport:
+    """Outcome of a bulk export, by agent name."""
+    written: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    
+    @property
+    def ok(self) -> bool:
+        return not self.failed and not self.missing
 
 
 class AgentService:
@@ -16,6 +38,7 @@ class AgentService:
     def __init__(self, agents_dir: Path):
         self.agents_dir = agents_dir
         self.agents_dir.mkdir(parents=True, exist_ok=True)
+        self.catalog = AgentCatalog(agents_dir)
     
     def create_agent(self, name: str, tool_type: ToolType, description: str = "") -> Optional[Agent]:
         """Create a new agent."""
@@ -36,18 +59,7 @@ class AgentService:
     
     def load_agent(self, name: str, tool_type: ToolType) -> Optional[Agent]:
         """Load an existing agent."""
-        agent_file = self._get_agent_file(name, tool_type)
-        if not agent_file.exists():
-            return None
-        
-        try:
-            data = json.loads(agent_file.read_text())
-            config = AgentConfig(**data)
-            agent = Agent(config=config)
-            agent.validate()  # Update health status
-            return agent
-        except Exception:
-            return None
+        return self.catalog.load(self._get_agent_file(name, tool_type).name)
     
     def update_agent(self, agent: Agent) -> bool:
         """Update an existing agent."""
@@ -63,28 +75,39 @@ class AgentService:
         if agent_file.exists():
             try:
                 agent_file.unlink()
+                self.catalog.remove(agent_file.name)
                 return True
             except Exception:
                 pass
         return False
     
     def list_agents(self, tool_type: Optional[ToolType] = None) -> List[Agent]:
-        """List all agents, optionally filtered by tool type."""
+        """List all agents, optionally filtered by tool type.
+        
+        Loads every matching agent in full; use list_agent_summaries() when
+        only names, counts and health are needed.
+        """
         agents = []
         
-        for agent_file in self.agents_dir.glob("*.json"):
-            try:
-                data = json.loads(agent_file.read_text())
-                config = AgentConfig(**data)
-                
-                if tool_type is None or config.tool_type == tool_type:
-                    agent = Agent(config=config)
-                    agent.validate()  # Update health status
-                    agents.append(agent)
-            except Exception:
-                continue
+        parsed: Dict[str, Agent] = {}
+        for summary in self.catalog.summaries(tool_type, parsed):
+            agent = parsed.get(summary.file) or self.catalog.load(summary.file, summary)
+            if agent is not None:
+                agents.append(agent)
+        
+        return agents
+    
+    def list_agent_summaries(self, tool_type: Optional[ToolType] = None) -> List[AgentSummary]:
+        """Name, tool, resource and server counts and health of every agent, from the catalog."""
+        return self.catalog.summaries(tool_type)
+    
+    def find_dependent_agents(self, paths: Iterable[str] = (), servers: Iterable[str] = ()) -> List[AgentSummary]:
+        """Agents that reference any of the library paths (or files below them) or MCP servers.
         
-        return sorted(agents, key=lambda a: a.config.name)
+        Answered from the catalog's reverse dependency index, so updates,
+        re-exports and validations can be limited to the affected agents.
+        """
+        return self.catalog.dependents(paths, servers)
     
     def agent_exists(self, name: str, tool_type: ToolType) -> bool:
         """Check if an agent exists."""
@@ -107,30 +130,69 @@ class AgentService:
             return False
         
         try:
-            # Q CLI agents directory
-            q_cli_dir = Path.home() / ".aws" / "amazonq" / "cli-agents"
+            q_cli_dir = q_cli_agents_dir()
             q_cli_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Export agent config
-            config = agent.to_q_cli_format()
-            agent_file = q_cli_dir / f"{agent.name}.json"
-            
-            agent_file.write_text(json.dumps(config, indent=2, default=str))
+            write_if_changed(q_cli_dir / f"{agent.name}.json", self._render_q_cli(agent))
             return True
         except Exception:
             return False
     
+    def export_agents_to_q_cli(self, names: Optional[Iterable[str]] = None, max_workers: Optional[int] = None,
+                               target_dir: Optional[Path] = None) -> ExportReport:
+        """Export Q CLI agents (all of them, or the given names) in parallel.
+        
+        Agents are loaded and rendered in a thread pool. Each target file is
+        replaced atomically, and only when its content hash differs, so
+        unchanged agents keep their mtime and Q CLI does not reload them.
+        """
+        report = ExportReport()
+        summaries = self.catalog.summaries(ToolType.Q_CLI)
+        if names is not None:
+            by_name = {summary.name: summary for summary in summaries}
+            wanted = list(dict.fromkeys(names))
+            report.missing = [name for name in wanted if name not in by_name]
+            summaries = [by_name[name] for name in wanted if name in by_name]
+        if not summaries:
+            return report
+        
+        target_dir = target_dir or q_cli_agents_dir()
+        target_dir.mkdir(parents=True, exist_ok=True)
+        
+        def export_one(summary: AgentSummary) -> Optional[bool]:
+            agent = self.catalog.load(summary.file, summary)
+            if agent is None:
+                return None
+            try:
+                return write_if_changed(target_dir / f"{agent.name}.json", self._render_q_cli(agent))
+            except OSError:
+                return None
+        
+        workers = min(max_workers or MAX_EXPORT_WORKERS, len(summaries))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent-export") as pool:
+            for summary, written in zip(summaries, pool.map(export_one, summaries)):
+                if written is None:
+                    report.failed.append(summary.name)
+                elif written:
+                    report.written.append(summary.name)
+                else:
+                    report.unchanged.append(summary.name)
+        return report
+    
     def _save_agent(self, agent: Agent) -> bool:
         """Save agent to file."""
         agent_file = self._get_agent_file(agent.name, agent.tool_type)
         
         try:
-            data = agent.config.dict()
-            agent_file.write_text(json.dumps(data, indent=2, default=str))
+            data = json.dumps(agent.config.dict(), indent=2, default=str).encode("utf-8")
+            agent_file.write_bytes(data)
+            self.catalog.update(agent_file.name, agent, data)
             return True
         except Exception:
             return False
     
+    def _render_q_cli(self, agent: Agent) -> bytes:
+        return json.dumps(agent.to_q_cli_format(), indent=2, default=str).encode("utf-8")
+    
     def _get_agent_file(self, name: str, tool_type: ToolType) -> Path:
         """Get the file path for an agent."""
         filename = f"{name}_{tool_type.value}.json"
@@ -2,32 +2,63 @@
 Performance-optimized library service with caching and lazy loading.
 """
 
-import hashlib
-import json
+import os
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Any
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Any
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
-from functools import lru_cache
+from dataclasses import dataclass, field
 
 from rich.console import Console
 
+from ..core.file_walker import FileWalker, get_file_walker
+from ..core.hashing import ContentHashCache, hash_bytes, stat_key
+from ..core.lazy_content import LazyContent
+from ..core.metadata import extract_metadata, extract_metadata_lazy
+from ..core.production_config import CacheConfig
+from .library_cache_store import LibraryCacheStore
 from ..models.library import Library, LibraryMetadata
 from ..models.value_objects import LibrarySource
 
 
+# How stale a stored row's access time may get before a cache hit refreshes it
+ACCESS_STAMP_INTERVAL = timedelta(hours=1)
+
+
 @dataclass
 class CachedLibraryFile:
-    """Cached library file with content and metadata."""
+    """Cached library file with content and metadata.
+    
+    Large files carry a memory-mapped handle instead of their text, which
+    is only decoded when ``content`` is first read.
+    """
     path: str
-    content: str
     metadata: Dict[str, Any]
     last_modified: datetime
     content_hash: str
     source: LibrarySource = LibrarySource.BASE
     _from_cache: bool = False
     _lazy_loaded: bool = False
+    _content: Optional[str] = field(default=None, repr=False)
+    _handle: Optional[LazyContent] = field(default=None, repr=False)
+    
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            if self._handle is not None:
+                self._content = self._handle.text()
+                self._handle.release()
+                self._handle = None
+            else:
+                self._content = ""
+        return self._content
+    
+    def preview(self, max_lines: int = 10) -> List[str]:
+        """First lines of the file, without decoding the rest of a lazy file."""
+        if self._content is None and self._handle is not None:
+            return self._handle.lines(0, max_lines)
+        return self.content.splitlines()[:max_lines]
 
 
 @dataclass
@@ -39,6 +70,12 @@ class CacheEntry:
     content: Optional[str] = None
     last_accessed: datetime = None
     last_modified: datetime = None
+    size_bytes: int = 0
+    # Stat the entry was last validated against
+    stat_key: Optional[Tuple[int, int, int, int]] = None
+    # Stat and access time as last staged to the persistent store
+    staged_stat_key: Optional[Tuple[int, int, int, int]] = None
+    staged_at: Optional[datetime] = None
     
     def __post_init__(self):
         if self.last_accessed is None:
@@ -47,26 +84,120 @@ class CacheEntry:
             self.last_modified = datetime.now()
 
 
+class MemoryCache:
+    """LRU of cache entries bounded by the bytes of content they hold.
+    
+    Backed by an OrderedDict, so lookups, touches and evictions are all O(1).
+    Metadata-only entries (lazy files) are charged a small fixed overhead so
+    the entry count stays bounded too.
+    """
+    
+    ENTRY_OVERHEAD_BYTES = 512
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._weights: Dict[str, int] = {}
+    
+    def get(self, key: str, is_valid: Optional[Callable[[CacheEntry], bool]] = None) -> Optional[CacheEntry]:
+        """Return a valid entry and mark it most recently used, dropping stale ones."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        if is_valid is not None and not is_valid(entry):
+            self.pop(key)
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+    
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Insert or re-weigh an entry, evicting least recently used ones over budget."""
+        weight = self._weigh(entry)
+        if weight > self.max_bytes and entry.content is not None:
+            # Never let one huge document flush the whole cache - keep metadata only
+            entry.content = None
+            weight = self._weigh(entry)
+        
+        self.current_bytes += weight - self._weights.get(key, 0)
+        self._weights[key] = weight
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._evict()
+    
+    def resize(self, max_bytes: int) -> None:
+        """Change the byte budget, evicting least recently used entries down to it now."""
+        self.max_bytes = max_bytes
+        self._evict()
+    
+    def pop(self, key: str) -> Optional[CacheEntry]:
+        """Remove an entry without counting it as an eviction."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= self._weights.pop(key)
+        return entry
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+        self._weights.clear()
+        self.current_bytes = 0
+    
+    def items(self) -> Iterator[Tuple[str, CacheEntry]]:
+        return iter(list(self._entries.items()))
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _evict(self) -> None:
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            old_key, _ = self._entries.popitem(last=False)
+            self.current_bytes -= self._weights.pop(old_key)
+            self.evictions += 1
+    
+    def _weigh(self, entry: CacheEntry) -> int:
+        content_bytes = entry.size_bytes if entry.content is not None else 0
+        return content_bytes + self.ENTRY_OVERHEAD_BYTES
+
+
 class CachedLibraryService:
     """Performance-optimized library service with intelligent caching."""
     
-    def __init__(self, cache_dir: Optional[Path] = None, console: Optional[Console] = None):
+    def __init__(self, cache_dir: Optional[Path] = None, console: Optional[Console] = None,
+                 cache_config: Optional[CacheConfig] = None, walker: Optional[FileWalker] = None):
         self.console = console or Console()
+        self.walker = walker or get_file_walker()
         self.cache_dir = cache_dir or Path.home() / ".config" / "ai-configurator" / "cache"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_config = cache_config or CacheConfig()
+        
+        # Cache configuration
+        self.cache_ttl_hours = cache_config.ttl_hours
+        self.lazy_load_threshold = cache_config.lazy_load_threshold_kb
         
         # In-memory caches
-        self._file_cache: Dict[str, CacheEntry] = {}
+        self._file_cache = MemoryCache(max_bytes=cache_config.max_memory_size * 1024 * 1024)
         self._metadata_cache: Dict[str, LibraryMetadata] = {}
         self._directory_cache: Dict[str, Tuple[List[str], datetime]] = {}
         
-        # Cache configuration
-        self.max_memory_cache_size = 50  # Keep 50 most recent files in memory
-        self.cache_ttl_hours = 24  # Cache valid for 24 hours
-        self.lazy_load_threshold = 10  # Load content only when needed for files > 10KB
+        # Content digests, revalidated by stat on every lookup
+        self._hash_cache = ContentHashCache(maxsize=4096)
         
-        # Load persistent cache
-        self._load_persistent_cache()
+        # Persistent cache, read lazily on memory misses
+        self._store: Optional[LibraryCacheStore] = None
+        if cache_config.persistent_cache:
+            self._open_persistent_cache()
     
     def get_library_files(self, library_paths: List[Path], force_refresh: bool = False) -> List[CachedLibraryFile]:
         """Get library files with intelligent caching."""
@@ -82,12 +213,18 @@ class CachedLibraryService:
             
             # Check directory cache first
             dir_key = str(library_path)
+            if dir_key not in self._directory_cache and self._store:
+                stored_listing = self._store.get_directory(dir_key)
+                if stored_listing:
+                    self._directory_cache[dir_key] = stored_listing
             cached_files, cache_time = self._directory_cache.get(dir_key, ([], datetime.min))
             
             # Refresh directory cache if needed
             if force_refresh or self._is_cache_expired(cache_time):
                 file_paths = self._scan_directory(library_path)
                 self._directory_cache[dir_key] = (file_paths, datetime.now())
+                if self._store:
+                    self._store.stage_directory(dir_key, file_paths, datetime.now())
                 cache_misses += 1
             else:
                 file_paths = cached_files
@@ -100,11 +237,14 @@ class CachedLibraryService:
                 
                 if library_file:
                     all_files.append(library_file)
-                    if hasattr(library_file, '_from_cache'):
+                    if library_file._from_cache:
                         cache_hits += 1
                     else:
                         cache_misses += 1
         
+        # Persist only the entries that changed during this call
+        self.save_persistent_cache()
+        
         elapsed = time.time() - start_time
         
         self.console.print(f"📊 Performance: {len(all_files)} files loaded in {elapsed:.2f}s "
@@ -112,69 +252,89 @@ class CachedLibraryService:
         
         return all_files
     
+    def set_memory_budget(self, max_bytes: int) -> None:
+        """Set the memory cache size, evicting entries over the new budget immediately."""
+        self._file_cache.resize(max_bytes)
+    
     def _scan_directory(self, directory: Path) -> List[str]:
-        """Scan directory for markdown files."""
-        files = []
-        
-        for file_path in directory.rglob("*.md"):
-            if file_path.is_file():
-                relative_path = str(file_path.relative_to(directory))
-                files.append(relative_path)
-        
-        return sorted(files)
+        """Scan directory for library files of every allowed extension and size."""
+        return sorted(walked.path for walked in self.walker.walk(directory, refresh_stats=False))
     
     def _get_cached_file(self, file_path: Path, force_refresh: bool = False) -> Optional[CachedLibraryFile]:
         """Get file with caching support."""
         cache_key = str(file_path)
         
-        # Check if file exists
-        if not file_path.exists():
+        # Get file stats (also tells us whether the file exists)
+        try:
+            stat = file_path.stat()
+        except OSError:
             return None
         
-        # Get file stats
-        stat = file_path.stat()
-        current_hash = self._calculate_file_hash(file_path)
-        
-        # Check memory cache
-        if not force_refresh and cache_key in self._file_cache:
-            cache_entry = self._file_cache[cache_key]
+        # Check memory cache; entries are only rehashed when the file's stat changed
+        cache_entry = None
+        if not force_refresh:
+            cache_entry = self._file_cache.get(
+                cache_key,
+                is_valid=lambda entry: self._entry_is_current(entry, file_path, stat)
+            )
+            if cache_entry is None and self._store:
+                cache_entry = self._load_stored_entry(cache_key, file_path, stat)
+        
+        if cache_entry is not None:
+            cache_entry.last_accessed = datetime.now()
+            # Keep the stored row's stat key current (so it isn't rehashed on every cold
+            # start) and its access time fresh enough that prune() keeps hot rows
+            if self._store and (cache_entry.staged_stat_key != stat_key(stat) or cache_entry.staged_at is None
+                                or cache_entry.last_accessed - cache_entry.staged_at > ACCESS_STAMP_INTERVAL):
+                self._stage_entry(cache_entry, stat)
             
-            # Validate cache entry
-            if cache_entry.content_hash == current_hash:
-                cache_entry.last_accessed = datetime.now()
-                
-                # Create library file from cache
-                library_file = self._create_library_file_from_cache(cache_entry, file_path)
-                library_file._from_cache = True
-                return library_file
+            # Create library file from cache
+            library_file = self._create_library_file_from_cache(cache_entry, file_path)
+            library_file._from_cache = True
+            return library_file
         
-        # Load file from disk
+        # Load file from disk; large files are mapped and scanned, never decoded here
         try:
-            content = file_path.read_text(encoding='utf-8')
-            metadata = self._extract_metadata(content)
-            
-            # Determine if we should lazy load content
             should_lazy_load = stat.st_size > (self.lazy_load_threshold * 1024)
             
+            handle = None
+            content = None
+            if should_lazy_load:
+                handle = LazyContent(file_path)
+                current_hash = handle.hash()
+                metadata = extract_metadata_lazy(handle)
+                handle.release()
+            else:
+                raw = file_path.read_bytes()
+                content = raw.decode('utf-8')
+                current_hash = hash_bytes(raw)
+                metadata = self._extract_metadata(content, file_path.suffix)
+            self._hash_cache.put(file_path, stat, current_hash)
+            
             # Create cache entry
             cache_entry = CacheEntry(
                 file_path=cache_key,
                 content_hash=current_hash,
                 metadata=metadata,
-                content=None if should_lazy_load else content,
-                last_modified=datetime.fromtimestamp(stat.st_mtime)
+                content=content,
+                last_modified=datetime.fromtimestamp(stat.st_mtime),
+                size_bytes=stat.st_size,
+                stat_key=stat_key(stat)
             )
             
-            # Store in memory cache
+            # Store in memory cache and queue for the persistent cache
             self._store_in_memory_cache(cache_key, cache_entry)
+            if self._store:
+                self._stage_entry(cache_entry, stat)
             
             # Create library file
             library_file = CachedLibraryFile(
                 path=str(file_path.relative_to(file_path.parent.parent)),
-                content=content,
                 metadata=metadata,
                 last_modified=cache_entry.last_modified,
-                content_hash=current_hash
+                content_hash=current_hash,
+                _content=content,
+                _handle=handle
             )
             
             # Mark as lazy loaded if content was not cached
@@ -187,140 +347,108 @@ class CachedLibraryService:
             self.console.print(f"⚠️  Failed to load {file_path}: {e}")
             return None
     
+    def _load_stored_entry(self, cache_key: str, file_path: Path, stat: os.stat_result) -> Optional[CacheEntry]:
+        """Promote a valid persistent cache row into the memory cache."""
+        stored = self._store.get_file(cache_key)
+        if stored is None:
+            return None
+        
+        if stored.stat_key == stat_key(stat):
+            # Unchanged since it was cached - trust the stored digest without reading
+            self._hash_cache.seed(file_path, stored.stat_key, stored.content_hash)
+        elif stored.content_hash != self._calculate_file_hash(file_path, stat):
+            return None
+        
+        cache_entry = CacheEntry(
+            file_path=cache_key,
+            content_hash=stored.content_hash,
+            metadata=stored.metadata,
+            last_accessed=stored.last_accessed,
+            last_modified=stored.last_modified,
+            size_bytes=stored.size_bytes,
+            stat_key=stat_key(stat),
+            staged_stat_key=stored.stat_key,
+            staged_at=stored.last_accessed
+        )
+        self._store_in_memory_cache(cache_key, cache_entry)
+        return cache_entry
+    
+    def _stage_entry(self, cache_entry: CacheEntry, stat: os.stat_result) -> None:
+        """Queue an entry for the persistent cache with the file's current stat."""
+        cache_entry.stat_key = cache_entry.staged_stat_key = stat_key(stat)
+        cache_entry.staged_at = cache_entry.last_accessed
+        self._store.stage_file(
+            cache_entry.file_path, cache_entry.content_hash, cache_entry.metadata, cache_entry.size_bytes,
+            cache_entry.last_accessed, cache_entry.last_modified, cache_entry.staged_stat_key
+        )
+    
+    def _entry_is_current(self, cache_entry: CacheEntry, file_path: Path, stat: os.stat_result) -> bool:
+        """Whether an entry matches the file, hashing it only when its stat changed."""
+        current_key = stat_key(stat)
+        if cache_entry.stat_key == current_key:
+            return True
+        if cache_entry.content_hash != self._calculate_file_hash(file_path, stat):
+            return False
+        cache_entry.stat_key = current_key  # Touched but unchanged
+        return True
+    
     def _store_in_memory_cache(self, cache_key: str, cache_entry: CacheEntry) -> None:
         """Store entry in memory cache with LRU eviction."""
-        self._file_cache[cache_key] = cache_entry
-        
-        # Implement LRU eviction
-        if len(self._file_cache) > self.max_memory_cache_size:
-            # Sort by last accessed time and remove oldest
-            sorted_entries = sorted(
-                self._file_cache.items(),
-                key=lambda x: x[1].last_accessed
-            )
-            
-            # Remove oldest entries
-            entries_to_remove = len(self._file_cache) - self.max_memory_cache_size
-            for i in range(entries_to_remove):
-                key_to_remove = sorted_entries[i][0]
-                del self._file_cache[key_to_remove]
+        self._file_cache.put(cache_key, cache_entry)
     
     def _create_library_file_from_cache(self, cache_entry: CacheEntry, file_path: Path) -> CachedLibraryFile:
-        """Create CachedLibraryFile from cache entry."""
-        # Load content if not cached (lazy loading)
-        content = cache_entry.content
-        if content is None:
-            content = file_path.read_text(encoding='utf-8')
-            cache_entry.content = content  # Cache for next time
-        
-        return CachedLibraryFile(
+        """Create CachedLibraryFile from cache entry.
+        
+        Large files get a lazy handle rather than being read here.
+        """
+        if cache_entry.content is None and cache_entry.size_bytes <= self.lazy_load_threshold * 1024:
+            cache_entry.content = file_path.read_text(encoding='utf-8')
+            self._file_cache.put(cache_entry.file_path, cache_entry)  # Re-weigh with content
+        
+        library_file = CachedLibraryFile(
             path=str(file_path.relative_to(file_path.parent.parent)),
-            content=content,
             metadata=cache_entry.metadata,
             last_modified=cache_entry.last_modified,
-            content_hash=cache_entry.content_hash
+            content_hash=cache_entry.content_hash,
+            _content=cache_entry.content,
+            _handle=None if cache_entry.content is not None else LazyContent(file_path)
         )
+        library_file._lazy_loaded = cache_entry.content is None
+        return library_file
     
-    @lru_cache(maxsize=256)
-    def _calculate_file_hash(self, file_path: Path) -> str:
-        """Calculate file hash with LRU caching."""
+    def _calculate_file_hash(self, file_path: Path, stat: Optional[os.stat_result] = None) -> str:
+        """Calculate the content hash, rehashing only when the file's stat changed."""
         try:
-            # Use file size and mtime for quick hash
-            stat = file_path.stat()
-            quick_hash = f"{stat.st_size}:{stat.st_mtime}"
-            return hashlib.md5(quick_hash.encode()).hexdigest()
-        except Exception:
+            return self._hash_cache.get(file_path, stat)
+        except OSError:
             return ""
     
-    def _extract_metadata(self, content: str) -> Dict[str, Any]:
-        """Extract metadata from file content."""
-        metadata = {
-            "version": "1.0.0",  # Default version for compatibility
-            "title": "",
-            "tags": [],
-            "description": "",
-            "word_count": len(content.split()),
-            "line_count": len(content.splitlines())
-        }
-        
-        lines = content.splitlines()
-        if not lines:
-            return metadata
-        
-        # Extract title from first heading
-        for line in lines[:10]:  # Check first 10 lines
-            line = line.strip()
-            if line.startswith('# '):
-                metadata["title"] = line[2:].strip()
-                break
-        
-        # Extract tags from content (simple implementation)
-        import re
-        tag_pattern = r'#(\w+)'
-        tags = re.findall(tag_pattern, content)
-        metadata["tags"] = list(set(tags))  # Remove duplicates
-        
-        return metadata
+    def _extract_metadata(self, content: str, extension: str = ".md") -> Dict[str, Any]:
+        """Extract metadata from file content with the extractor for its format."""
+        return extract_metadata(content, extension)
     
     def _is_cache_expired(self, cache_time: datetime) -> bool:
         """Check if cache entry is expired."""
         return datetime.now() - cache_time > timedelta(hours=self.cache_ttl_hours)
     
-    def _load_persistent_cache(self) -> None:
-        """Load cache from disk."""
-        cache_file = self.cache_dir / "library_cache.json"
-        
-        if not cache_file.exists():
-            return
+    def _open_persistent_cache(self) -> None:
+        """Open the persistent cache database, retiring the old JSON cache file."""
+        legacy_cache_file = self.cache_dir / "library_cache.json"
+        if legacy_cache_file.exists():
+            legacy_cache_file.unlink()
         
         try:
-            with open(cache_file, 'r') as f:
-                cache_data = json.load(f)
-            
-            # Restore cache entries
-            for key, entry_data in cache_data.get("file_cache", {}).items():
-                # Convert datetime strings back to datetime objects
-                entry_data["last_accessed"] = datetime.fromisoformat(entry_data["last_accessed"])
-                entry_data["last_modified"] = datetime.fromisoformat(entry_data["last_modified"])
-                
-                self._file_cache[key] = CacheEntry(**entry_data)
-            
-            # Restore directory cache
-            for key, (files, cache_time_str) in cache_data.get("directory_cache", {}).items():
-                cache_time = datetime.fromisoformat(cache_time_str)
-                self._directory_cache[key] = (files, cache_time)
-                
+            self._store = LibraryCacheStore(self.cache_dir / "library_cache.db")
         except Exception as e:
             self.console.print(f"⚠️  Failed to load cache: {e}")
     
     def save_persistent_cache(self) -> None:
-        """Save cache to disk."""
-        cache_file = self.cache_dir / "library_cache.json"
+        """Write new and changed cache entries to disk."""
+        if not self._store:
+            return
         
         try:
-            # Prepare cache data for serialization
-            cache_data = {
-                "file_cache": {},
-                "directory_cache": {}
-            }
-            
-            # Convert file cache
-            for key, entry in self._file_cache.items():
-                entry_dict = asdict(entry)
-                # Convert datetime objects to strings
-                entry_dict["last_accessed"] = entry.last_accessed.isoformat()
-                entry_dict["last_modified"] = entry.last_modified.isoformat()
-                # Don't persist content to save space
-                entry_dict["content"] = None
-                cache_data["file_cache"][key] = entry_dict
-            
-            # Convert directory cache
-            for key, (files, cache_time) in self._directory_cache.items():
-                cache_data["directory_cache"][key] = (files, cache_time.isoformat())
-            
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
-                
+            self._store.flush()
         except Exception as e:
             self.console.print(f"⚠️  Failed to save cache: {e}")
     
@@ -330,13 +458,12 @@ class CachedLibraryService:
         self._metadata_cache.clear()
         self._directory_cache.clear()
         
-        # Clear LRU cache
-        self._calculate_file_hash.cache_clear()
+        # Clear content hash memo
+        self._hash_cache.clear()
         
         # Remove persistent cache
-        cache_file = self.cache_dir / "library_cache.json"
-        if cache_file.exists():
-            cache_file.unlink()
+        if self._store:
+            self._store.clear()
         
         self.console.print("✅ Cache cleared")
     
@@ -344,11 +471,16 @@ class CachedLibraryService:
         """Get cache statistics."""
         return {
             "memory_cache_size": len(self._file_cache),
-            "max_memory_cache_size": self.max_memory_cache_size,
+            "memory_cache_bytes": self._file_cache.current_bytes,
+            "max_memory_cache_bytes": self._file_cache.max_bytes,
+            "memory_cache_hits": self._file_cache.hits,
+            "memory_cache_misses": self._file_cache.misses,
+            "memory_cache_evictions": self._file_cache.evictions,
             "directory_cache_size": len(self._directory_cache),
+            "persistent_cache_size": self._store.count() if self._store else 0,
             "cache_ttl_hours": self.cache_ttl_hours,
             "lazy_load_threshold_kb": self.lazy_load_threshold,
-            "lru_cache_info": self._calculate_file_hash.cache_info()._asdict()
+            "lru_cache_info": self._hash_cache.info()
         }
     
     def optimize_cache(self) -> None:
@@ -363,7 +495,7 @@ class CachedLibraryService:
         
         # Remove expired entries
         for key in expired_keys:
-            del self._file_cache[key]
+            self._file_cache.pop(key)
         
         # Find expired directory cache entries
         expired_dir_keys = []
@@ -374,6 +506,10 @@ class CachedLibraryService:
         for key in expired_dir_keys:
             del self._directory_cache[key]
         
+        # Prune the persistent cache with the same TTL
+        if self._store:
+            self._store.prune(now - timedelta(hours=self.cache_ttl_hours))
+        
         self.console.print(f"🧹 Cache optimized: removed {len(expired_keys)} file entries, "
                           f"{len(expired_dir_keys)} directory entries")
     
@@ -16,6 +16,7 @@ from .sync_service import SyncService
 from ..models.sync_models import LibrarySync, SyncHistory, ConflictReport
 from ..models.value_objects import Resolution
 from ..core.config import ConfigProxy
+from ..core.file_walker import get_file_walker
 
 
 class EnhancedSyncService:
@@ -176,6 +177,7 @@ class EnhancedSyncService:
     def get_library_status(self) -> Dict[str, Dict]:
         """Get status of all library sources."""
         status = {}
+        walker = get_file_walker()
         
         # Local libraries
         local_base = Path(self.config.library_path)
@@ -186,8 +188,8 @@ class EnhancedSyncService:
             "personal_path": str(local_personal),
             "base_exists": local_base.exists(),
             "personal_exists": local_personal.exists(),
-            "base_files": len(list(local_base.rglob("*.md"))) if local_base.exists() else 0,
-            "personal_files": len(list(local_personal.rglob("*.md"))) if local_personal.exists() else 0
+            "base_files": walker.count(local_base),
+            "personal_files": walker.count(local_personal)
         }
         
         # Remote library
@@ -201,7 +203,7 @@ class EnhancedSyncService:
                 "exists": remote_path.exists(),
                 "is_git_repo": self.git_service._is_git_repo(remote_path) if remote_path.exists() else False,
                 "git_status": git_status,
-                "files": len(list(remote_path.rglob("*.md"))) if remote_path.exists() else 0
+                "files": walker.count(remote_path)
             }
         else:
             status["remote"] = {
@@ -2,7 +2,6 @@
 File management service for local file discovery and monitoring.
 """
 
-import hashlib
 import threading
 from datetime import datetime
 from pathlib import Path
@@ -12,6 +11,7 @@ from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileModifiedEvent, FileCreatedEvent, FileDeletedEvent
 from rich.console import Console
 
+from ..core.hashing import hash_file
 from ..models.file_models import (
     FilePattern, LocalResource, FileWatcher, FileWatchConfig, FileDiscoveryResult
 )
@@ -77,12 +77,8 @@ class FileService:
         if not file_path.exists():
             return ""
         
-        sha256_hash = hashlib.sha256()
         try:
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(chunk)
-            return sha256_hash.hexdigest()
+            return hash_file(file_path)
         except Exception:
             return ""
     
@@ -0,0 +1,159 @@
+"""
+Persistent store backing CachedLibraryService.
+"""
+
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..core.sqlite_utils import open_database
+
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE file_entries (
+    file_path TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    last_accessed REAL NOT NULL,
+    last_modified REAL NOT NULL,
+    mtime_ns INTEGER,
+    inode INTEGER,
+    ctime_ns INTEGER
+);
+CREATE TABLE directory_entries (
+    directory TEXT PRIMARY KEY,
+    files TEXT NOT NULL,
+    cached_at REAL NOT NULL
+);
+"""
+
+StatKey = Tuple[int, int, int, int]
+
+
+class StoredFileEntry:
+    """Row of the file_entries table, decoded on demand."""
+
+    __slots__ = ("file_path", "content_hash", "metadata", "size_bytes",
+                 "last_accessed", "last_modified", "stat_key")
+
+    def __init__(self, row: tuple):
+        (self.file_path, self.content_hash, metadata, self.size_bytes,
+         last_accessed, last_modified, mtime_ns, inode, ctime_ns) = row
+        self.metadata = json.loads(metadata)
+        self.last_accessed = datetime.fromtimestamp(last_accessed)
+        self.last_modified = datetime.fromtimestamp(last_modified)
+        self.stat_key: Optional[StatKey] = (
+            (mtime_ns, self.size_bytes, inode, ctime_ns) if mtime_ns is not None else None
+        )
+
+
+class LibraryCacheStore:
+    """Versioned SQLite store for cached file metadata and directory listings.
+
+    Rows are read one at a time on cache misses instead of being parsed up
+    front, and writes are batched upserts of only the entries that changed,
+    each batch committed atomically in WAL mode.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._conn = open_database(db_path, SCHEMA, SCHEMA_VERSION)
+        self._lock = threading.Lock()
+        self._pending_files: Dict[str, tuple] = {}
+        self._pending_dirs: Dict[str, tuple] = {}
+
+    def get_file(self, file_path: str) -> Optional[StoredFileEntry]:
+        """Fetch a single file entry, including ones not yet flushed."""
+        with self._lock:
+            row = self._pending_files.get(file_path)
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT file_path, content_hash, metadata, size_bytes, last_accessed, "
+                    "last_modified, mtime_ns, inode, ctime_ns FROM file_entries WHERE file_path = ?",
+                    (file_path,)
+                ).fetchone()
+        return StoredFileEntry(row) if row else None
+
+    def stage_file(self, file_path: str, content_hash: str, metadata: Dict, size_bytes: int,
+                   last_accessed: datetime, last_modified: datetime,
+                   stat_key: Optional[StatKey] = None) -> None:
+        """Queue a file entry for the next flush."""
+        mtime_ns, _, inode, ctime_ns = stat_key or (None, None, None, None)
+        with self._lock:
+            self._pending_files[file_path] = (
+                file_path, content_hash, json.dumps(metadata), size_bytes,
+                last_accessed.timestamp(), last_modified.timestamp(),
+                mtime_ns, inode, ctime_ns
+            )
+
+    def get_directory(self, directory: str) -> Optional[Tuple[List[str], datetime]]:
+        """Fetch a cached directory listing and when it was taken."""
+        with self._lock:
+            row = self._pending_dirs.get(directory)
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT directory, files, cached_at FROM directory_entries WHERE directory = ?",
+                    (directory,)
+                ).fetchone()
+        if not row:
+            return None
+        return json.loads(row[1]), datetime.fromtimestamp(row[2])
+
+    def stage_directory(self, directory: str, files: List[str], cached_at: datetime) -> None:
+        """Queue a directory listing for the next flush."""
+        with self._lock:
+            self._pending_dirs[directory] = (directory, json.dumps(files), cached_at.timestamp())
+
+    def flush(self) -> int:
+        """Upsert all staged rows in a single transaction; returns rows written."""
+        with self._lock:
+            files = list(self._pending_files.values())
+            dirs = list(self._pending_dirs.values())
+            if not files and not dirs:
+                return 0
+
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO file_entries (file_path, content_hash, metadata, size_bytes, "
+                    "last_accessed, last_modified, mtime_ns, inode, ctime_ns) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    files
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO directory_entries (directory, files, cached_at) VALUES (?, ?, ?)",
+                    dirs
+                )
+
+            self._pending_files.clear()
+            self._pending_dirs.clear()
+            return len(files) + len(dirs)
+
+    def prune(self, older_than: datetime) -> Tuple[int, int]:
+        """Delete file entries not accessed, and listings not refreshed, since a cutoff."""
+        cutoff = older_than.timestamp()
+        with self._lock, self._conn:
+            files = self._conn.execute(
+                "DELETE FROM file_entries WHERE last_accessed < ?", (cutoff,)
+            ).rowcount
+            dirs = self._conn.execute(
+                "DELETE FROM directory_entries WHERE cached_at < ?", (cutoff,)
+            ).rowcount
+        return files, dirs
+
+    def clear(self) -> None:
+        """Remove every stored and staged row."""
+        with self._lock, self._conn:
+            self._pending_files.clear()
+            self._pending_dirs.clear()
+            self._conn.execute("DELETE FROM file_entries")
+            self._conn.execute("DELETE FROM directory_entries")
+
+    def count(self) -> int:
+        """Number of persisted file entries."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM file_entries").fetchone()[0]
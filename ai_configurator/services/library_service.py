@@ -2,26 +2,59 @@
 Library service for managing knowledge files and synchronization.
 """
 
-import hashlib
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from ..models import (
-    Library, LibraryFile, LibraryMetadata, ConflictInfo,
+    Library, LibraryFile, LibraryLayer, LibraryMetadata, LibraryConfig, ConflictInfo,
     LibrarySource, ConflictType, Resolution, SyncStatus
 )
+from ..core.hashing import hash_file
+from ..core.library_index import IndexedFile, IndexScan, LibraryIndex, diff_trees
+from ..core.search_index import SearchIndex, SearchResult
+from .merge_base_store import MergeBaseStore
+
+
+def build_layers(base_path: Path, personal_path: Path,
+                 library_config: Optional[LibraryConfig] = None) -> List[LibraryLayer]:
+    """Library layers from lowest to highest precedence.
+    
+    The default order is base, then the configured remote Git library and
+    any team layers, then personal. ``layer_precedence`` reorders them;
+    layers it does not name keep their default order below the named ones.
+    """
+    layers = [LibraryLayer(name=LibrarySource.BASE.value, path=base_path, source=LibrarySource.BASE)]
+    if library_config is not None:
+        remotes = dict(library_config.remote_layers)
+        if library_config.remote_library_path:
+            remotes = {LibrarySource.REMOTE.value: library_config.remote_library_path, **remotes}
+        layers += [
+            LibraryLayer(name=name, path=Path(path).expanduser(), source=LibrarySource.REMOTE)
+            for name, path in remotes.items()
+        ]
+    layers.append(LibraryLayer(name=LibrarySource.PERSONAL.value, path=personal_path, source=LibrarySource.PERSONAL))
+    
+    precedence = library_config.layer_precedence if library_config is not None else []
+    if precedence:
+        named = [layer for name in precedence for layer in layers if layer.name == name]
+        layers = [layer for layer in layers if layer.name not in precedence] + named
+    return layers
 
 
 class LibraryService:
     """Service for library operations and conflict resolution."""
     
-    def __init__(self, base_path: Path, personal_path: Path):
+    def __init__(self, base_path: Path, personal_path: Path, index: Optional[LibraryIndex] = None,
+                 layers: Optional[List[LibraryLayer]] = None):
         self.base_path = base_path
         self.personal_path = personal_path
         self.base_path.mkdir(parents=True, exist_ok=True)
         self.personal_path.mkdir(parents=True, exist_ok=True)
+        self.layers = layers or build_layers(base_path, personal_path)
+        self.index = index or LibraryIndex()
+        self._search_index: Optional[SearchIndex] = None
         self._ensure_templates()
     
     def _ensure_templates(self) -> None:
@@ -101,26 +134,25 @@ General productivity AI assistant for daily tasks and support.
     
     def create_library(self) -> Library:
         """Create a new library instance with indexed files."""
-        # Index base library files
-        base_files = self._index_files(self.base_path, LibrarySource.BASE)
+        # Index every layer; base and personal scans also drive conflict detection
+        scans = self._scan_layers()
+        base_scan = scans[LibrarySource.BASE.value]
+        personal_scan = scans[LibrarySource.PERSONAL.value]
         
-        # Index personal library files
-        personal_files = self._index_files(self.personal_path, LibrarySource.PERSONAL)
-        
-        # Combine all files
         all_files = {}
-        all_files.update(base_files)
-        all_files.update(personal_files)
+        for layer in self.layers:
+            for relative_path, library_file in self._index_files(scans[layer.name], layer).items():
+                all_files[f"{layer.name}/{relative_path}"] = library_file
         
         # Detect conflicts
-        conflicts = self._detect_conflicts(base_files, personal_files)
+        conflicts = self._detect_conflicts(base_scan, personal_scan)
         
         # Create metadata
         metadata = LibraryMetadata(
             version="4.0.0",
             last_sync=datetime.now(),
-            base_hash=self._calculate_library_hash(base_files),
-            personal_hash=self._calculate_library_hash(personal_files),
+            base_hash=self._calculate_library_hash(base_scan),
+            personal_hash=self._calculate_library_hash(personal_scan),
             conflicts=conflicts,
             sync_status=SyncStatus.CONFLICTS if conflicts else SyncStatus.SYNCED
         )
@@ -129,32 +161,29 @@ General productivity AI assistant for daily tasks and support.
             base_path=self.base_path,
             personal_path=self.personal_path,
             metadata=metadata,
-            files=all_files
+            files=all_files,
+            layers=self.layers
         )
     
     def sync_library(self, library: Library) -> List[ConflictInfo]:
         """Synchronize library and detect conflicts."""
-        conflicts = []
-        
-        # Index base library files
-        base_files = self._index_files(self.base_path, LibrarySource.BASE)
+        scans = self._scan_layers()
+        base_scan = scans[LibrarySource.BASE.value]
+        personal_scan = scans[LibrarySource.PERSONAL.value]
         
-        # Index personal library files
-        personal_files = self._index_files(self.personal_path, LibrarySource.PERSONAL)
-        
-        # Update library files
-        library.files.update(base_files)
-        library.files.update(personal_files)
+        # Update library files; the effective view only changes for files that did
+        for layer in self.layers:
+            library.set_layer_files(layer.name, self._index_files(scans[layer.name], layer))
         
         # Detect conflicts
-        conflicts = self._detect_conflicts(base_files, personal_files)
+        conflicts = self._detect_conflicts(base_scan, personal_scan)
         
         # Update metadata
         library.metadata.conflicts = conflicts
         library.metadata.last_sync = datetime.now()
         library.metadata.sync_status = SyncStatus.CONFLICTS if conflicts else SyncStatus.SYNCED
-        library.metadata.base_hash = self._calculate_library_hash(base_files)
-        library.metadata.personal_hash = self._calculate_library_hash(personal_files)
+        library.metadata.base_hash = self._calculate_library_hash(base_scan)
+        library.metadata.personal_hash = self._calculate_library_hash(personal_scan)
         
         return conflicts
     
@@ -172,6 +201,7 @@ General productivity AI assistant for daily tasks and support.
             if base_file_path.exists():
                 personal_file_path.parent.mkdir(parents=True, exist_ok=True)
                 shutil.copy2(base_file_path, personal_file_path)
+                MergeBaseStore(self.personal_path).record(file_path, base_file_path)
         elif resolution == Resolution.KEEP_LOCAL:
             # Keep personal file as is (no action needed)
             pass
@@ -181,8 +211,8 @@ General productivity AI assistant for daily tasks and support.
         
         # Update file in library
         if personal_file_path.exists():
-            library_file = self._create_library_file(personal_file_path, LibrarySource.PERSONAL)
-            library.files[f"personal/{file_path}"] = library_file
+            library_file = self._create_library_file(personal_file_path, LibrarySource.PERSONAL, Path(file_path))
+            library.put_file(LibrarySource.PERSONAL.value, library_file)
         
         return True
     
@@ -192,19 +222,53 @@ General productivity AI assistant for daily tasks and support.
     
     def get_file_content(self, library: Library, relative_path: str) -> Optional[str]:
         """Get effective file content with personal override."""
-        effective_file = library.get_effective_file(relative_path)
-        if not effective_file:
+        layer = library.get_effective_layer(relative_path)
+        if not layer:
             return None
         
-        if effective_file.source == LibrarySource.PERSONAL:
-            file_path = self.personal_path / relative_path
-        else:
-            file_path = self.base_path / relative_path
-        
+        file_path = layer.path / relative_path
         if file_path.exists():
             return file_path.read_text(encoding='utf-8')
         return None
     
+    def file_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """Effective metadata per relative path, higher layers taking precedence.
+        
+        Served from the library index; only files whose content hash changed
+        since the last call are read.
+        """
+        metadata = {}
+        for layer in self.layers:
+            metadata.update(self.index.metadata(self.index.scan(layer.path)))
+        return metadata
+    
+    def find_files(self, tags: Iterable[str] = (), category: Optional[str] = None,
+                   title: Optional[str] = None, refresh: bool = True) -> List[Tuple[str, LibrarySource]]:
+        """Effective files matching every filter, as (relative path, source) pairs.
+        
+        Filters resolve against the tag, category and title indexes kept by
+        the library index. With refresh=False the disk is not walked at all
+        and the index is trusted as of the last scan.
+        """
+        if refresh:
+            self._scan_layers()
+        
+        tags = list(tags)
+        results = []
+        shadowed = set()
+        for layer in reversed(self.layers):
+            # A file in a higher layer overrides lower copies, matching or not
+            matches = self.index.query(layer.path, tags, category, title) - shadowed
+            results += [(path, layer.source) for path in matches]
+            shadowed |= self.index.query(layer.path)
+        return sorted(results)
+    
+    def search(self, query: str, limit: int = 20) -> List[SearchResult]:
+        """Ranked full-text search across the base and personal libraries."""
+        if self._search_index is None:
+            self._search_index = SearchIndex(library_index=self.index)
+        return self._search_index.rank([layer.path for layer in self.layers], query, limit=limit)
+    
     def save_personal_file(self, library: Library, relative_path: str, content: str) -> bool:
         """Save content to personal library."""
         file_path = self.personal_path / relative_path
@@ -214,81 +278,75 @@ General productivity AI assistant for daily tasks and support.
             file_path.write_text(content, encoding='utf-8')
             
             # Update library
-            library_file = self._create_library_file(file_path, LibrarySource.PERSONAL)
-            library.files[f"personal/{relative_path}"] = library_file
+            library_file = self._create_library_file(file_path, LibrarySource.PERSONAL, Path(relative_path))
+            library.put_file(LibrarySource.PERSONAL.value, library_file)
             
             return True
         except Exception:
             return False
     
-    def _index_files(self, root_path: Path, source: LibrarySource) -> Dict[str, LibraryFile]:
-        """Index all files in a directory."""
-        files = {}
-        
-        if not root_path.exists():
-            return files
-        
-        for file_path in root_path.rglob("*.md"):
-            if file_path.is_file():
-                relative_path = file_path.relative_to(root_path)
-                library_file = self._create_library_file(file_path, source, relative_path)
-                key = f"{source.value}/{relative_path}"
-                files[key] = library_file
-        
-        return files
+    def _scan_layers(self) -> Dict[str, IndexScan]:
+        return {layer.name: self.index.scan(layer.path) for layer in self.layers}
+    
+    def _index_files(self, scan: IndexScan, layer: LibraryLayer) -> Dict[str, LibraryFile]:
+        """Build library files, keyed by relative path, from a scan of one layer.
+        
+        Hashes come from the persistent library index, so only files whose
+        stat changed since the previous scan are read from disk.
+        """
+        return {
+            relative_path: self._library_file_from_entry(entry, layer.source)
+            for relative_path, entry in scan.files.items()
+        }
     
     def _create_library_file(self, file_path: Path, source: LibrarySource, relative_path: Path = None) -> LibraryFile:
         """Create LibraryFile from filesystem path."""
-        content = file_path.read_text(encoding='utf-8')
-        content_hash = hashlib.sha256(content.encode()).hexdigest()
+        root = self.personal_path if source == LibrarySource.PERSONAL else self.base_path
+        try:
+            index_path = str(file_path.relative_to(root))
+        except ValueError:
+            index_path = None
         
-        # Use relative_path if provided, otherwise just the filename
-        path_str = str(relative_path) if relative_path else str(file_path.name)
+        entry = self.index.refresh_file(root, index_path) if index_path else None
+        if entry is None:
+            # File outside the indexed roots - hash it directly
+            stat = file_path.stat()
+            content_hash = hash_file(file_path)
+            entry = IndexedFile(file_path.name, stat.st_size, stat.st_mtime_ns, stat.st_ino, content_hash)
         
+        # Use relative_path if provided, otherwise just the filename
+        entry.path = str(relative_path) if relative_path else str(file_path.name)
+        return self._library_file_from_entry(entry, source)
+    
+    def _library_file_from_entry(self, entry: IndexedFile, source: LibrarySource) -> LibraryFile:
+        """Build a LibraryFile from an index row."""
         return LibraryFile(
-            path=path_str,
+            path=entry.path,
             source=source,
-            content_hash=content_hash,
-            last_modified=datetime.fromtimestamp(file_path.stat().st_mtime),
-            size=file_path.stat().st_size
+            content_hash=entry.content_hash,
+            last_modified=datetime.fromtimestamp(entry.mtime_ns / 1e9),
+            size=entry.size
         )
     
-    def _detect_conflicts(self, base_files: Dict[str, LibraryFile], 
-                         personal_files: Dict[str, LibraryFile]) -> List[ConflictInfo]:
-        """Detect conflicts between base and personal libraries."""
-        conflicts = []
+    def _detect_conflicts(self, base_scan: IndexScan, personal_scan: IndexScan) -> List[ConflictInfo]:
+        """Detect conflicts between base and personal libraries.
         
-        # Extract relative paths
-        base_paths = {f.split('/', 1)[1]: f for f in base_files.keys()}
-        personal_paths = {f.split('/', 1)[1]: f for f in personal_files.keys()}
+        Walks both Merkle trees together, so directories with identical
+        hashes are skipped without looking at their files.
+        """
+        conflicts = []
         
-        # Check for conflicts
-        for rel_path in base_paths:
-            if rel_path in personal_paths:
-                base_file = base_files[base_paths[rel_path]]
-                personal_file = personal_files[personal_paths[rel_path]]
-                
-                if base_file.content_hash != personal_file.content_hash:
-                    conflict = ConflictInfo(
-                        file_path=rel_path,
-                        base_content_hash=base_file.content_hash,
-                        personal_content_hash=personal_file.content_hash,
-                        conflict_type=ConflictType.MODIFIED
-                    )
-                    conflicts.append(conflict)
+        for rel_path in diff_trees(base_scan, personal_scan).modified:
+            conflict = ConflictInfo(
+                file_path=rel_path,
+                base_content_hash=base_scan.files[rel_path].content_hash,
+                personal_content_hash=personal_scan.files[rel_path].content_hash,
+                conflict_type=ConflictType.MODIFIED
+            )
+            conflicts.append(conflict)
         
         return conflicts
     
-    def _calculate_library_hash(self, files: Dict[str, LibraryFile]) -> str:
-        """Calculate hash of entire library state."""
-        if not files:
-            return ""
-        
-        # Sort files by path for consistent hashing
-        sorted_files = sorted(files.items())
-        combined_hash = hashlib.sha256()
-        
-        for _, file_info in sorted_files:
-            combined_hash.update(file_info.content_hash.encode())
-        
-        return combined_hash.hexdigest()
+    def _calculate_library_hash(self, scan: IndexScan) -> str:
+        """Calculate hash of entire library state (the Merkle root hash)."""
+        return scan.root_hash
@@ -0,0 +1,101 @@
+"""
+Common-ancestor versions of personal library files, for three-way merges.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..core.file_utils import clone_file
+from ..core.hashing import hash_file
+
+
+MERGE_BASE_DIR = ".merge-base"
+INDEX_VERSION = 1
+
+
+class MergeBaseStore:
+    """Base library content each personal file was last copied or merged from.
+
+    Lives in a hidden directory inside the personal library, so it is
+    included in personal library snapshots. The file walker skips hidden
+    directories, so the store never shows up as library content.
+    """
+
+    def __init__(self, personal_path: Path):
+        self.root = personal_path / MERGE_BASE_DIR
+        self.blobs_dir = self.root / "blobs"
+        self.index_path = self.root / "index.json"
+        self._index: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    def get_hash(self, relative_path: str) -> Optional[str]:
+        """Hash of the recorded ancestor of a file, if any."""
+        return self._load_index().get(relative_path)
+
+    def get(self, relative_path: str) -> Optional[str]:
+        """Recorded ancestor content of a file, if any."""
+        digest = self.get_hash(relative_path)
+        if digest is None:
+            return None
+        try:
+            return self._blob_path(digest).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def record(self, relative_path: str, source_file: Path, digest: Optional[str] = None) -> str:
+        """Record a base file as the ancestor of a personal file; returns its hash."""
+        digest = digest or hash_file(source_file)
+        index = self._load_index()
+        if index.get(relative_path) == digest and self._blob_path(digest).exists():
+            return digest
+
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = blob_path.with_name(f"{blob_path.name}.tmp")
+            clone_file(source_file, temp_path)
+            os.replace(temp_path, blob_path)
+
+        previous = index.get(relative_path)
+        index[relative_path] = digest
+        self._save_index()
+        self._release(previous)
+        return digest
+
+    def forget(self, relative_path: str) -> None:
+        """Drop the ancestor of a file, e.g. when it is removed from the personal library."""
+        index = self._load_index()
+        previous = index.pop(relative_path, None)
+        if previous is not None:
+            self._save_index()
+            self._release(previous)
+
+    def _release(self, digest: Optional[str]) -> None:
+        """Delete a blob once no file refers to it any more."""
+        if digest and digest not in self._load_index().values():
+            self._blob_path(digest).unlink(missing_ok=True)
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / digest[:2] / digest[2:]
+
+    def _load_index(self) -> Dict[str, str]:
+        with self._lock:
+            if self._index is None:
+                try:
+                    with open(self.index_path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    self._index = data["files"] if data.get("version") == INDEX_VERSION else {}
+                except (OSError, ValueError, KeyError):
+                    self._index = {}
+            return self._index
+
+    def _save_index(self) -> None:
+        """Write the index atomically so a crash never loses recorded ancestors."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_name(f"{self.index_path.name}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "files": self._index}, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.index_path)
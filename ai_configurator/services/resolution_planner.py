@@ -0,0 +1,98 @@
+"""
+Policy-driven planning of library conflict resolutions.
+"""
+
+import re
+from dataclasses import dataclass, field
+from fnmatch import translate
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from ..models.configuration import SyncSettings
+from ..models.sync_models import ConflictReport
+from ..models.value_objects import Resolution
+
+
+# Strategies beyond the Resolution values themselves
+PROMPT = "prompt"  # Ask the user; decided like AUTO when nobody can be asked
+AUTO = "auto"      # Follow the merge base suggestion, if the file has one
+
+STRATEGIES = {PROMPT, AUTO} | {resolution.value for resolution in Resolution}
+
+
+@dataclass
+class PlannedResolution:
+    """How one conflict will be resolved, and which policy decided it."""
+    conflict: ConflictReport
+    resolution: Optional[Resolution]
+    rule: str
+    # Decided by the user rather than a policy
+    prompted: bool = False
+
+
+@dataclass
+class ResolutionPlan:
+    """Resolutions for a set of conflicts, decided before anything is applied."""
+    items: List[PlannedResolution] = field(default_factory=list)
+
+    @property
+    def decided(self) -> List[PlannedResolution]:
+        return [item for item in self.items if item.resolution is not None]
+
+    @property
+    def pending(self) -> List[PlannedResolution]:
+        """Conflicts no policy could decide; they need a human."""
+        return [item for item in self.items if item.resolution is None]
+
+
+class ResolutionPlanner:
+    """Maps conflicts to resolutions using per-glob policies.
+
+    Policies are checked in order and the first matching glob wins; files
+    matching none use the default strategy. ``*`` and ``**`` both match
+    across directories, so ``roles/**`` covers everything below ``roles``.
+    """
+
+    def __init__(self, default_strategy: str = PROMPT, policies: Optional[Dict[str, str]] = None):
+        self.default_strategy = self._validate(default_strategy)
+        self._policies: List[Tuple[str, Pattern, str]] = [
+            (pattern, re.compile(translate(pattern)), self._validate(strategy))
+            for pattern, strategy in (policies or {}).items()
+        ]
+
+    @classmethod
+    def from_settings(cls, settings: SyncSettings) -> "ResolutionPlanner":
+        return cls(settings.conflict_resolution_strategy, settings.conflict_policies)
+
+    def strategy_for(self, file_path: str) -> Tuple[str, str]:
+        """The strategy for a file and the rule that chose it."""
+        for pattern, regex, strategy in self._policies:
+            if regex.match(file_path):
+                return strategy, pattern
+        return self.default_strategy, "default"
+
+    def plan(self, conflicts: List[ConflictReport], interactive: bool = False) -> ResolutionPlan:
+        """Decide a resolution for every conflict without touching any file.
+
+        In interactive mode PROMPT conflicts are left pending for the caller
+        to ask about; otherwise they are decided like AUTO.
+        """
+        plan = ResolutionPlan()
+        for conflict in conflicts:
+            strategy, rule = self.strategy_for(conflict.file_path)
+            if strategy == PROMPT and not interactive:
+                strategy = AUTO
+
+            if strategy == PROMPT:
+                resolution = None
+            elif strategy == AUTO:
+                resolution = conflict.suggested_resolution if conflict.ancestor_hash else None
+            else:
+                resolution = Resolution(strategy)
+
+            plan.items.append(PlannedResolution(conflict=conflict, resolution=resolution, rule=rule))
+        return plan
+
+    def _validate(self, strategy: str) -> str:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown conflict resolution strategy: {strategy}")
+        return strategy
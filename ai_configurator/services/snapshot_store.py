@@ -0,0 +1,277 @@
+"""
+Content-addressed snapshot store for personal library backups.
+"""
+
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..core.file_utils import clone_file
+from ..core.file_walker import FileWalker
+from ..core.hashing import hash_files
+
+
+MANIFEST_VERSION = 1
+
+
+def _walk_all(root: Path):
+    """Every file below root, hidden ones included; nothing if root is missing."""
+    return FileWalker(extensions=None, include_hidden=True, cache_listings=False).walk(root)
+
+
+@dataclass
+class SnapshotInfo:
+    """Summary of one stored snapshot."""
+    snapshot_id: str
+    created_at: datetime
+    source: str
+    file_count: int
+    total_size: int
+
+
+@dataclass
+class SnapshotDiff:
+    """Files added, removed or modified from one snapshot to another."""
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+
+
+@dataclass
+class GCResult:
+    """What a garbage collection pass deleted."""
+    snapshots_removed: int = 0
+    legacy_backups_removed: int = 0
+    blobs_removed: int = 0
+    bytes_freed: int = 0
+
+
+class SnapshotStore:
+    """Deduplicated snapshots of a directory tree.
+
+    File contents live once in ``blobs/`` under their SHA-256; each snapshot
+    is a small JSON manifest in ``manifests/`` mapping relative paths to
+    blob hashes. Taking a snapshot of a mostly unchanged tree writes only
+    the new blobs and one manifest, and files whose stat matches the
+    previous snapshot are not even re-read.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.blobs_dir = root / "blobs"
+        self.manifests_dir = root / "manifests"
+
+    def create(self, source: Path, snapshot_id: str) -> Path:
+        """Snapshot a directory tree; returns the manifest path."""
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+
+        previous = self._latest_files(source)
+        files: Dict[str, Dict] = {}
+        to_hash: Dict[Path, Tuple[str, os.stat_result]] = {}
+
+        for walked in sorted(_walk_all(source), key=lambda walked: walked.path):
+            relative_path, st = walked.path, walked.stat
+            file_path = Path(walked.full_path)
+            record = previous.get(relative_path)
+            if (record and self._blob_path(record["hash"]).exists() and
+                    (record["size"], record["mtime_ns"], record["inode"]) == (st.st_size, st.st_mtime_ns, st.st_ino)):
+                files[relative_path] = record
+            else:
+                to_hash[file_path] = (relative_path, st)
+
+        for file_path, digest in hash_files(to_hash).items():
+            relative_path, st = to_hash[file_path]
+            self._store_blob(file_path, digest)
+            files[relative_path] = {
+                "hash": digest,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "inode": st.st_ino,
+            }
+
+        # Never overwrite an existing snapshot taken within the same second
+        base_id, suffix = snapshot_id, 1
+        while self._manifest_path(snapshot_id).exists():
+            snapshot_id = f"{base_id}_{suffix}"
+            suffix += 1
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "id": snapshot_id,
+            "created_at": datetime.now().isoformat(),
+            "source": str(source),
+            "files": dict(sorted(files.items())),
+        }
+        manifest_path = self._manifest_path(snapshot_id)
+        self._write_json(manifest_path, manifest)
+        return manifest_path
+
+    def list(self) -> List[SnapshotInfo]:
+        """All snapshots, newest first."""
+        snapshots = []
+        for manifest_path in self.manifests_dir.glob("*.json") if self.manifests_dir.exists() else []:
+            manifest = self._read_manifest(manifest_path)
+            if manifest is None:
+                continue
+            snapshots.append(SnapshotInfo(
+                snapshot_id=manifest["id"],
+                created_at=datetime.fromisoformat(manifest["created_at"]),
+                source=manifest["source"],
+                file_count=len(manifest["files"]),
+                total_size=sum(record["size"] for record in manifest["files"].values())
+            ))
+        return sorted(snapshots, key=lambda info: info.created_at, reverse=True)
+
+    def diff(self, old_id: str, new_id: str) -> SnapshotDiff:
+        """Compare two snapshots by content hash."""
+        old_files = self._load(old_id)["files"]
+        new_files = self._load(new_id)["files"]
+
+        result = SnapshotDiff()
+        result.added = sorted(new_files.keys() - old_files.keys())
+        result.removed = sorted(old_files.keys() - new_files.keys())
+        result.modified = sorted(
+            path for path in old_files.keys() & new_files.keys()
+            if old_files[path]["hash"] != new_files[path]["hash"]
+        )
+        return result
+
+    def restore(self, snapshot_id: str, target: Optional[Path] = None) -> SnapshotDiff:
+        """Make a directory match a snapshot; returns what had to change.
+
+        Defaults to the directory the snapshot was taken from. Files that
+        already match are left untouched and files not in the snapshot are
+        removed.
+        """
+        manifest = self._load(snapshot_id)
+        target = target or Path(manifest["source"])
+        snapshot_files = manifest["files"]
+
+        current = {}
+        if target.exists():
+            relative_paths = {Path(walked.full_path): walked.path for walked in _walk_all(target)}
+            current = {relative_paths[p]: digest for p, digest in hash_files(relative_paths).items()}
+
+        result = SnapshotDiff()
+        for relative_path, record in snapshot_files.items():
+            digest = current.get(relative_path)
+            if digest == record["hash"]:
+                continue
+            (result.modified if digest else result.added).append(relative_path)
+
+            destination = target / relative_path
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = destination.with_name(f".{destination.name}.restore")
+            clone_file(self._blob_path(record["hash"]), temp_path)
+            os.replace(temp_path, destination)
+
+        for relative_path in current.keys() - snapshot_files.keys():
+            (target / relative_path).unlink()
+            result.removed.append(relative_path)
+
+        result.added.sort()
+        result.modified.sort()
+        result.removed.sort()
+        return result
+
+    def gc(self, retention_days: int, keep_latest: int = 1,
+           legacy_dir: Optional[Path] = None) -> GCResult:
+        """Drop snapshots past retention, then delete blobs no snapshot references.
+
+        The newest ``keep_latest`` snapshots are always kept. If ``legacy_dir``
+        is given, full-copy ``backup_*`` directories there older than the
+        retention period are removed as well.
+        """
+        result = GCResult()
+        cutoff = datetime.now() - timedelta(days=retention_days)
+
+        for info in self.list()[keep_latest:]:
+            if info.created_at < cutoff:
+                self._manifest_path(info.snapshot_id).unlink()
+                result.snapshots_removed += 1
+
+        if legacy_dir and legacy_dir.exists():
+            for backup_dir in legacy_dir.glob("backup_*"):
+                if backup_dir.is_dir() and datetime.fromtimestamp(backup_dir.stat().st_mtime) < cutoff:
+                    shutil.rmtree(backup_dir, ignore_errors=True)
+                    result.legacy_backups_removed += 1
+
+        # Mark and sweep
+        referenced = set()
+        for manifest_path in self.manifests_dir.glob("*.json") if self.manifests_dir.exists() else []:
+            manifest = self._read_manifest(manifest_path)
+            if manifest is None:
+                # Never delete blobs an unreadable manifest might still need
+                return result
+            referenced.update(record["hash"] for record in manifest["files"].values())
+
+        for blob_path in self.blobs_dir.glob("*/*") if self.blobs_dir.exists() else []:
+            if blob_path.parent.name + blob_path.name not in referenced:
+                result.bytes_freed += blob_path.stat().st_size
+                blob_path.unlink()
+                result.blobs_removed += 1
+
+        return result
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / digest[:2] / digest[2:]
+
+    def _manifest_path(self, snapshot_id: str) -> Path:
+        return self.manifests_dir / f"{snapshot_id}.json"
+
+    def _store_blob(self, file_path: Path, digest: str) -> None:
+        """Copy a file into the blob store unless its content is already there."""
+        blob_path = self._blob_path(digest)
+        if blob_path.exists():
+            return
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = blob_path.with_name(f"{blob_path.name}.tmp")
+        clone_file(file_path, temp_path)
+        os.replace(temp_path, blob_path)
+
+    def _latest_files(self, source: Path) -> Dict[str, Dict]:
+        """File records of the newest snapshot of the same source, for stat reuse.
+
+        Manifests are never rewritten, so their mtimes order them by age and
+        only the newest are read, not the whole history.
+        """
+        for manifest_path in self._manifests_newest_first():
+            manifest = self._read_manifest(manifest_path)
+            if manifest is not None and manifest["source"] == str(source):
+                return manifest["files"]
+        return {}
+
+    def _manifests_newest_first(self) -> List[Path]:
+        stamped = []
+        for manifest_path in self.manifests_dir.glob("*.json") if self.manifests_dir.exists() else []:
+            try:
+                stamped.append((manifest_path.stat().st_mtime_ns, manifest_path.name, manifest_path))
+            except OSError:
+                continue  # Removed by a concurrent gc
+        return [manifest_path for _, _, manifest_path in sorted(stamped, reverse=True)]
+
+    def _load(self, snapshot_id: str) -> Dict:
+        manifest = self._read_manifest(self._manifest_path(snapshot_id))
+        if manifest is None:
+            raise KeyError(f"Snapshot not found: {snapshot_id}")
+        return manifest
+
+    def _read_manifest(self, manifest_path: Path) -> Optional[Dict]:
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+    def _write_json(self, path: Path, data: Dict) -> None:
+        """Write JSON atomically so a crash never leaves a truncated manifest."""
+        temp_path = path.with_name(f"{path.name}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(temp_path, path)
@@ -2,49 +2,72 @@
 Library synchronization service.
 """
 
-import hashlib
+import json
+import os
 import shutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from rich.console import Console
 from rich.table import Table
-from rich.panel import Panel
+from rich.text import Text
 from rich.prompt import Confirm, Prompt
 
+from ..core import diff as diff_engine
+from ..core.file_utils import clone_file
+from ..core.hashing import hash_file
+from ..core.merge import merge3
 from ..models.sync_models import (
     ConflictReport, FileDiff, LibrarySync, SyncHistory, SyncOperation
 )
 from ..models.value_objects import ConflictType, Resolution
 from ..models.library import Library, LibraryMetadata
+from ..core.production_config import get_production_config
+from ..core.library_index import IndexScan, LibraryIndex, diff_trees
+from .merge_base_store import MergeBaseStore
+from .resolution_planner import PlannedResolution, ResolutionPlan, ResolutionPlanner
+from .snapshot_store import SnapshotStore
+
+
+# Number of computed diffs kept for re-display, keyed by content hashes
+DIFF_CACHE_SIZE = 16
+
+# Staged resolutions and their commit journal, inside the personal library
+COMMIT_DIR = ".sync-commit"
+JOURNAL_VERSION = 1
+MAX_APPLY_WORKERS = min(8, (os.cpu_count() or 1) * 2)
 
 
 class SyncService:
     """Service for managing library synchronization."""
     
-    def __init__(self, console: Optional[Console] = None):
+    def __init__(
+        self,
+        console: Optional[Console] = None,
+        index: Optional[LibraryIndex] = None,
+        planner: Optional[ResolutionPlanner] = None
+    ):
         self.console = console or Console()
+        self.index = index or LibraryIndex()
+        self.planner = planner or ResolutionPlanner()
+        self._diff_cache: "OrderedDict[Tuple[str, str], List[str]]" = OrderedDict()
     
     def calculate_file_hash(self, file_path: Path) -> str:
         """Calculate SHA-256 hash of a file."""
         if not file_path.exists():
             return ""
         
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        return sha256_hash.hexdigest()
+        return hash_file(file_path)
     
     def generate_diff(self, base_content: str, personal_content: str, file_path: str) -> FileDiff:
         """Generate diff between base and personal content."""
-        import difflib
-        
         base_lines = base_content.splitlines(keepends=True)
         personal_lines = personal_content.splitlines(keepends=True)
         
-        diff_lines = list(difflib.unified_diff(
+        diff_lines = list(diff_engine.unified_diff(
             base_lines, 
             personal_lines,
             fromfile=f"base/{file_path}",
@@ -59,22 +82,72 @@ class SyncService:
             diff_lines=diff_lines
         )
     
-    def detect_conflicts(self, library_sync: LibrarySync) -> List[ConflictReport]:
-        """Detect conflicts between base and personal libraries."""
-        conflicts = []
+    def iter_diff(self, conflict: ConflictReport) -> Iterator[str]:
+        """Stream the unified diff for a conflict, computing it on first use.
+        
+        Diffs are cached by (base_hash, personal_hash), so the same pair of
+        versions is only diffed once per service.
+        """
+        key = (conflict.base_hash, conflict.personal_hash)
+        cached = self._diff_cache.get(key)
+        if cached is not None:
+            self._diff_cache.move_to_end(key)
+            yield from cached
+            return
+        
+        if conflict.base_file is None or conflict.personal_file is None:
+            return
         
-        # Get all files from both libraries
-        base_files = self._scan_directory(library_sync.base_path)
-        personal_files = self._scan_directory(library_sync.personal_path)
+        base_lines = conflict.base_file.read_text(encoding='utf-8').splitlines()
+        personal_lines = conflict.personal_file.read_text(encoding='utf-8').splitlines()
+        
+        lines = []
+        for line in diff_engine.unified_diff(
+            base_lines,
+            personal_lines,
+            fromfile=f"base/{conflict.file_path}",
+            tofile=f"personal/{conflict.file_path}",
+            lineterm=""
+        ):
+            lines.append(line)
+            yield line
+        
+        # Only cache diffs that were consumed to the end
+        self._diff_cache[key] = lines
+        while len(self._diff_cache) > DIFF_CACHE_SIZE:
+            self._diff_cache.popitem(last=False)
+    
+    def get_diff(self, conflict: ConflictReport) -> FileDiff:
+        """Materialize the diff for a conflict as a FileDiff."""
+        return FileDiff(file_path=conflict.file_path, diff_lines=list(self.iter_diff(conflict)))
+    
+    def detect_conflicts(self, library_sync: LibrarySync, adopt_merge_bases: bool = False) -> List[ConflictReport]:
+        """Detect conflicts between base and personal libraries.
+        
+        Only files that exist in both libraries can conflict, and the Merkle
+        tree comparison only descends into directories whose hashes differ.
+        The suggested resolution follows from the recorded merge base: base
+        updates to untouched files are accepted, and files changed on both
+        sides are merged.
+        
+        Detection is read-only unless adopt_merge_bases is set, in which case
+        files identical in both libraries are recorded as their merge base.
+        """
+        conflicts = []
         
-        all_files = set(base_files.keys()) | set(personal_files.keys())
+        base_scan = self.index.scan(library_sync.base_path)
+        personal_scan = self.index.scan(library_sync.personal_path)
+        merge_bases = MergeBaseStore(library_sync.personal_path)
+        if adopt_merge_bases:
+            self._adopt_merge_bases(library_sync, base_scan, personal_scan, merge_bases)
         
-        for file_path in all_files:
-            base_info = base_files.get(file_path)
-            personal_info = personal_files.get(file_path)
+        for file_path in diff_trees(base_scan, personal_scan).modified:
+            base_info = (library_sync.base_path / file_path, base_scan.files[file_path].content_hash)
+            personal_info = (library_sync.personal_path / file_path, personal_scan.files[file_path].content_hash)
             
             conflict = self._analyze_file_conflict(
-                file_path, base_info, personal_info, library_sync
+                file_path, base_info, personal_info, library_sync,
+                ancestor_hash=merge_bases.get_hash(file_path) or ""
             )
             
             if conflict:
@@ -82,27 +155,13 @@ class SyncService:
         
         return conflicts
     
-    def _scan_directory(self, directory: Path) -> Dict[str, Tuple[Path, str]]:
-        """Scan directory and return file info."""
-        files = {}
-        
-        if not directory.exists():
-            return files
-        
-        for file_path in directory.rglob("*.md"):
-            if file_path.is_file():
-                relative_path = str(file_path.relative_to(directory))
-                file_hash = self.calculate_file_hash(file_path)
-                files[relative_path] = (file_path, file_hash)
-        
-        return files
-    
     def _analyze_file_conflict(
         self, 
         file_path: str, 
         base_info: Optional[Tuple[Path, str]], 
         personal_info: Optional[Tuple[Path, str]],
-        library_sync: LibrarySync
+        library_sync: LibrarySync,
+        ancestor_hash: str = ""
     ) -> Optional[ConflictReport]:
         """Analyze a single file for conflicts."""
         base_exists = base_info is not None
@@ -123,12 +182,7 @@ class SyncService:
             if base_hash == personal_hash:
                 return None  # No changes, no conflict
             
-            # Files differ - create conflict report
-            base_content = base_path.read_text(encoding='utf-8')
-            personal_content = personal_path.read_text(encoding='utf-8')
-            
-            diff = self.generate_diff(base_content, personal_content, file_path)
-            
+            # Files differ - record them; the diff is only computed on demand
             return ConflictReport(
                 file_path=file_path,
                 conflict_type=ConflictType.MODIFIED,
@@ -136,22 +190,65 @@ class SyncService:
                 personal_exists=True,
                 base_hash=base_hash,
                 personal_hash=personal_hash,
-                diff=diff,
-                suggested_resolution=Resolution.KEEP_LOCAL  # Default to keeping personal changes
+                ancestor_hash=ancestor_hash,
+                base_size=base_path.stat().st_size,
+                personal_size=personal_path.stat().st_size,
+                base_file=base_path,
+                personal_file=personal_path,
+                suggested_resolution=self._suggest_resolution(base_hash, personal_hash, ancestor_hash)
             )
         
         return None
     
-    def create_backup(self, library_sync: LibrarySync) -> Path:
-        """Create backup of personal library before sync."""
-        backup_name = library_sync.create_backup_name()
-        backup_dir = library_sync.backup_path / backup_name
+    def _suggest_resolution(self, base_hash: str, personal_hash: str, ancestor_hash: str) -> Resolution:
+        """Pick a resolution from which sides changed since the merge base."""
+        if ancestor_hash == personal_hash:
+            return Resolution.ACCEPT_REMOTE  # Only the base library changed
+        if ancestor_hash and ancestor_hash != base_hash:
+            return Resolution.MERGE  # Both sides changed
+        return Resolution.KEEP_LOCAL  # Personal changes only, or no known ancestor
+    
+    def _adopt_merge_bases(
+        self,
+        library_sync: LibrarySync,
+        base_scan: IndexScan,
+        personal_scan: IndexScan,
+        merge_bases: MergeBaseStore
+    ) -> None:
+        """Record files identical in both libraries as their own merge base.
+        
+        This gives files copied before merge bases were tracked an ancestor
+        as soon as they are seen unmodified.
+        """
+        for file_path, entry in personal_scan.files.items():
+            base_entry = base_scan.files.get(file_path)
+            if (base_entry and base_entry.content_hash == entry.content_hash and
+                    merge_bases.get_hash(file_path) != entry.content_hash):
+                merge_bases.record(file_path, library_sync.base_path / file_path, digest=entry.content_hash)
+    
+    def create_backup(self, library_sync: LibrarySync) -> Optional[Path]:
+        """Snapshot the personal library before sync.
+        
+        Snapshots are deduplicated by content, and snapshots older than the
+        configured backup retention are garbage collected afterwards.
+        Returns the snapshot manifest path, or None when there is no personal
+        library to back up.
+        """
+        if not library_sync.personal_path.exists():
+            return None
+        
+        store = self.get_snapshot_store(library_sync)
+        manifest_path = store.create(library_sync.personal_path, library_sync.create_backup_name())
+        self.console.print(f"✅ Backup created: {manifest_path.stem}")
         
-        if library_sync.personal_path.exists():
-            shutil.copytree(library_sync.personal_path, backup_dir)
-            self.console.print(f"✅ Backup created: {backup_dir}")
+        retention_days = get_production_config().library.backup_retention_days
+        store.gc(retention_days, legacy_dir=library_sync.backup_path)
         
-        return backup_dir
+        return manifest_path
+    
+    def get_snapshot_store(self, library_sync: LibrarySync) -> SnapshotStore:
+        """Snapshot store kept under the library backup directory."""
+        return SnapshotStore(library_sync.backup_path / "snapshots")
     
     def display_conflicts(self, conflicts: List[ConflictReport]) -> None:
         """Display conflicts in a user-friendly format."""
@@ -175,16 +272,54 @@ class SyncService:
         
         self.console.print(table)
     
-    def display_diff(self, conflict: ConflictReport) -> None:
-        """Display diff for a specific conflict."""
-        if not conflict.diff:
-            return
+    def display_plan(self, plan: ResolutionPlan) -> None:
+        """Display how each conflict will be resolved and which policy decided it."""
+        table = Table(title="Resolution Plan")
+        table.add_column("File", style="cyan")
+        table.add_column("Resolution", style="green")
+        table.add_column("Policy", style="dim")
+        
+        for item in plan.items:
+            resolution = item.resolution.value if item.resolution else "[yellow]needs manual resolution[/yellow]"
+            table.add_row(item.conflict.file_path, resolution, item.rule)
         
+        self.console.print(table)
+    
+    def display_diff(self, conflict: ConflictReport) -> None:
+        """Display diff for a specific conflict, streaming it line by line."""
         self.console.print(f"\n📄 Diff for {conflict.file_path}:")
         
-        diff_text = "\n".join(conflict.diff.diff_lines)
-        panel = Panel(diff_text, title="File Differences", border_style="blue")
-        self.console.print(panel)
+        styles = {"+": "green", "-": "red", "@": "cyan"}
+        for line in self.iter_diff(conflict):
+            self.console.print(Text(line, style=styles.get(line[:1], "")))
+    
+    def side_by_side_table(self, conflict: ConflictReport, context: int = 3) -> Table:
+        """Base and personal versions of a conflict side by side, changed hunks only."""
+        base_lines = conflict.base_file.read_text(encoding='utf-8').splitlines() if conflict.base_file else []
+        personal_lines = conflict.personal_file.read_text(encoding='utf-8').splitlines() if conflict.personal_file else []
+        
+        table = Table(title=conflict.file_path, show_lines=False, expand=True)
+        table.add_column("#", style="dim", justify="right")
+        table.add_column("Base", ratio=1, overflow="fold")
+        table.add_column("#", style="dim", justify="right")
+        table.add_column("Personal", ratio=1, overflow="fold")
+        
+        styles = {"replace": ("red", "green"), "delete": ("red", ""), "insert": ("", "green")}
+        for hunk_number, hunk in enumerate(diff_engine.side_by_side(base_lines, personal_lines, context)):
+            if hunk_number:
+                table.add_row("", "[dim]…[/dim]", "", "[dim]…[/dim]")
+            for row in hunk:
+                left_style, right_style = styles.get(row.tag, ("", ""))
+                table.add_row(
+                    str(row.left_no or ""), Text(row.left, style=left_style),
+                    str(row.right_no or ""), Text(row.right, style=right_style)
+                )
+        
+        return table
+    
+    def display_side_by_side(self, conflict: ConflictReport) -> None:
+        """Display a conflict as a side-by-side diff."""
+        self.console.print(self.side_by_side_table(conflict))
     
     def resolve_conflict_interactive(self, conflict: ConflictReport) -> Resolution:
         """Interactively resolve a single conflict."""
@@ -203,7 +338,7 @@ class SyncService:
         self.console.print("\nResolution options:")
         self.console.print("1. Keep local (personal) version")
         self.console.print("2. Accept remote (base) version")
-        self.console.print("3. Manual merge (open editor)")
+        self.console.print("3. Merge (automatic three-way merge, editor for overlapping changes)")
         
         while True:
             choice = Prompt.ask("Choose resolution", choices=list(choices.keys()))
@@ -214,9 +349,14 @@ class SyncService:
         self, 
         conflict: ConflictReport, 
         resolution: Resolution,
-        library_sync: LibrarySync
+        library_sync: LibrarySync,
+        interactive: bool = True
     ) -> SyncOperation:
-        """Apply a conflict resolution."""
+        """Apply a conflict resolution.
+        
+        Outside interactive mode a merge with overlapping changes is left
+        unapplied and reported as needing a manual merge.
+        """
         operation = SyncOperation(
             file_path=conflict.file_path,
             operation="resolve",
@@ -226,6 +366,7 @@ class SyncService:
         try:
             personal_file = library_sync.personal_path / conflict.file_path
             base_file = library_sync.base_path / conflict.file_path
+            merge_bases = MergeBaseStore(library_sync.personal_path)
             
             if resolution == Resolution.KEEP_LOCAL:
                 # Keep personal version - no action needed
@@ -235,12 +376,11 @@ class SyncService:
                 # Copy base version to personal
                 personal_file.parent.mkdir(parents=True, exist_ok=True)
                 shutil.copy2(base_file, personal_file)
+                merge_bases.record(conflict.file_path, base_file)
                 operation.success = True
                 
             elif resolution == Resolution.MERGE:
-                # Open editor for manual merge
-                self._open_merge_editor(base_file, personal_file)
-                operation.success = True
+                self._merge_file(conflict.file_path, base_file, personal_file, merge_bases, operation, interactive)
             
         except Exception as e:
             operation.error_message = str(e)
@@ -248,6 +388,49 @@ class SyncService:
         
         return operation
     
+    def _merge_file(
+        self,
+        file_path: str,
+        base_file: Path,
+        personal_file: Path,
+        merge_bases: MergeBaseStore,
+        operation: SyncOperation,
+        interactive: bool
+    ) -> None:
+        """Three-way merge base library changes into a personal file."""
+        ancestor = merge_bases.get(file_path)
+        if ancestor is None:
+            operation.manual_merge = True
+            if interactive:
+                self._open_merge_editor(base_file, personal_file)
+                operation.success = True
+            else:
+                operation.error_message = "No merge base recorded; merge manually"
+            return
+        
+        merged = merge3(
+            ancestor,
+            personal_file.read_text(encoding='utf-8'),
+            base_file.read_text(encoding='utf-8')
+        )
+        
+        if not merged.clean:
+            operation.manual_merge = True
+            if not interactive:
+                operation.error_message = f"{merged.conflicts} overlapping changes need a manual merge"
+                return
+        
+        temp_file = personal_file.with_name(f".{personal_file.name}.merge")
+        temp_file.write_text(merged.text, encoding='utf-8')
+        os.replace(temp_file, personal_file)
+        merge_bases.record(file_path, base_file)
+        
+        if not merged.clean:
+            self.console.print(f"⚠️  {merged.conflicts} overlapping changes in {file_path} - resolve the conflict markers")
+            self._open_merge_editor(base_file, personal_file)
+        
+        operation.success = True
+    
     def _open_merge_editor(self, base_file: Path, personal_file: Path) -> None:
         """Open external editor for manual merge."""
         import subprocess
@@ -269,19 +452,171 @@ class SyncService:
         else:
             self.console.print("⚠️  No suitable editor found. Please manually edit the file.")
     
+    def apply_plan(self, plan: ResolutionPlan, library_sync: LibrarySync) -> List[SyncOperation]:
+        """Apply the decided resolutions of a plan as one journaled commit.
+        
+        New contents are prepared concurrently in a staging directory inside
+        the personal library. Only once a journal listing them is written are
+        they moved into place, so an interrupted commit is rolled forward by
+        recover_pending_commit() instead of leaving some resolutions applied.
+        Merges with overlapping changes are not applied and are reported as
+        needing a manual merge. Returns one operation per decided item.
+        """
+        items = plan.decided
+        if not items:
+            return []
+        
+        self.recover_pending_commit(library_sync)
+        commit_dir = library_sync.personal_path / COMMIT_DIR
+        staging = commit_dir / "staged"
+        staging.mkdir(parents=True, exist_ok=True)
+        merge_bases = MergeBaseStore(library_sync.personal_path)
+        
+        try:
+            workers = min(MAX_APPLY_WORKERS, len(items))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resolve") as pool:
+                results = list(pool.map(
+                    lambda numbered: self._stage_resolution(
+                        numbered[1], library_sync, merge_bases, staging / str(numbered[0])
+                    ),
+                    enumerate(items)
+                ))
+            
+            entries = [entry for _, entry in results if entry]
+            if entries:
+                self._write_journal(commit_dir / "journal.json", entries)
+                self._commit(library_sync, entries, merge_bases)
+                for operation, entry in results:
+                    if entry:
+                        operation.success = True
+        finally:
+            if not (commit_dir / "journal.json").exists():
+                shutil.rmtree(commit_dir, ignore_errors=True)
+        
+        return [operation for operation, _ in results]
+    
+    def recover_pending_commit(self, library_sync: LibrarySync) -> bool:
+        """Finish a resolution commit that was interrupted; returns True if one was."""
+        commit_dir = library_sync.personal_path / COMMIT_DIR
+        journal_path = commit_dir / "journal.json"
+        
+        if journal_path.exists():
+            with open(journal_path, "r", encoding="utf-8") as f:
+                journal = json.load(f)
+            self._commit(library_sync, journal["entries"], MergeBaseStore(library_sync.personal_path), verify=True)
+            self.console.print(f"✅ Completed interrupted sync of {len(journal['entries'])} files")
+            return True
+        
+        # Staging never reached the journal - nothing was applied yet
+        if commit_dir.exists():
+            shutil.rmtree(commit_dir, ignore_errors=True)
+        return False
+    
+    def _stage_resolution(
+        self,
+        item: PlannedResolution,
+        library_sync: LibrarySync,
+        merge_bases: MergeBaseStore,
+        staged_path: Path
+    ) -> Tuple[SyncOperation, Optional[Dict[str, str]]]:
+        """Prepare one resolution without touching the personal library.
+        
+        Returns the operation and, if the personal file changes, its journal entry.
+        """
+        conflict = item.conflict
+        operation = SyncOperation(file_path=conflict.file_path, operation="resolve", resolution=item.resolution)
+        base_file = library_sync.base_path / conflict.file_path
+        personal_file = library_sync.personal_path / conflict.file_path
+        
+        try:
+            if item.resolution == Resolution.KEEP_LOCAL:
+                operation.success = True
+                return operation, None
+            
+            if item.resolution == Resolution.ACCEPT_REMOTE:
+                clone_file(base_file, staged_path)
+            elif item.resolution == Resolution.MERGE:
+                ancestor = merge_bases.get(conflict.file_path)
+                if ancestor is None:
+                    operation.manual_merge = True
+                    operation.error_message = "No merge base recorded; merge manually"
+                    return operation, None
+                
+                merged = merge3(
+                    ancestor,
+                    personal_file.read_text(encoding='utf-8'),
+                    base_file.read_text(encoding='utf-8')
+                )
+                if not merged.clean:
+                    operation.manual_merge = True
+                    operation.error_message = f"{merged.conflicts} overlapping changes need a manual merge"
+                    return operation, None
+                staged_path.write_text(merged.text, encoding='utf-8')
+        except Exception as e:
+            operation.error_message = str(e)
+            return operation, None
+        
+        return operation, {"path": conflict.file_path, "staged": staged_path.name, "base_hash": conflict.base_hash}
+    
+    def _write_journal(self, journal_path: Path, entries: List[Dict[str, str]]) -> None:
+        """Write the commit journal atomically; its presence marks staging complete."""
+        temp_path = journal_path.with_name(f"{journal_path.name}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": JOURNAL_VERSION, "entries": entries}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, journal_path)
+    
+    def _commit(
+        self,
+        library_sync: LibrarySync,
+        entries: List[Dict[str, str]],
+        merge_bases: MergeBaseStore,
+        verify: bool = False
+    ) -> None:
+        """Move journaled files into place, then record their new merge bases.
+        
+        Safe to repeat: files already moved are skipped. With verify, a merge
+        base is only recorded if the base file still has the journaled hash.
+        """
+        commit_dir = library_sync.personal_path / COMMIT_DIR
+        
+        for entry in entries:
+            staged_path = commit_dir / "staged" / entry["staged"]
+            if staged_path.exists():
+                target = library_sync.personal_path / entry["path"]
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(staged_path, target)
+        
+        for entry in entries:
+            base_file = library_sync.base_path / entry["path"]
+            if verify and self.calculate_file_hash(base_file) != entry["base_hash"]:
+                continue
+            merge_bases.record(entry["path"], base_file, digest=entry["base_hash"])
+        
+        (commit_dir / "journal.json").unlink()
+        shutil.rmtree(commit_dir, ignore_errors=True)
+    
     def sync_library(self, library_sync: LibrarySync, interactive: bool = True) -> SyncHistory:
-        """Perform library synchronization."""
+        """Perform library synchronization.
+        
+        Conflicts are resolved according to the planner's policies. Only
+        conflicts left undecided are prompted for in interactive mode; in
+        non-interactive mode they are reported as needing a manual merge.
+        """
         sync_history = SyncHistory(
             base_version="latest",  # TODO: Implement proper versioning
             personal_version="current"
         )
         
         try:
+            self.recover_pending_commit(library_sync)
+            
             # Create backup
-            backup_dir = self.create_backup(library_sync)
+            self.create_backup(library_sync)
             
             # Detect conflicts
-            conflicts = self.detect_conflicts(library_sync)
+            conflicts = self.detect_conflicts(library_sync, adopt_merge_bases=True)
             sync_history.conflicts_detected = len(conflicts)
             
             if not conflicts:
@@ -292,22 +627,29 @@ class SyncService:
             # Display conflicts
             self.display_conflicts(conflicts)
             
-            if not interactive:
-                self.console.print("⚠️  Conflicts detected but running in non-interactive mode.")
-                sync_history.success = False
-                return sync_history
+            plan = self.planner.plan(conflicts, interactive=interactive)
+            if interactive:
+                for item in plan.pending:
+                    item.resolution = self.resolve_conflict_interactive(item.conflict)
+                    item.prompted = True
+            sync_history.merges_manual += len(plan.pending)
             
-            # Resolve conflicts interactively
-            for conflict in conflicts:
-                resolution = self.resolve_conflict_interactive(conflict)
-                operation = self.apply_resolution(conflict, resolution, library_sync)
-                sync_history.add_operation(operation)
-                
-                if operation.success:
-                    sync_history.conflicts_resolved += 1
-                    library_sync.resolve_conflict(conflict.file_path, resolution)
+            # Policy decisions are committed together; prompted merges may need the editor
+            decided = ResolutionPlan(items=[item for item in plan.decided if not item.prompted])
+            for item, operation in zip(decided.items, self.apply_plan(decided, library_sync)):
+                self._record_operation(sync_history, item, operation, library_sync)
+            
+            for item in plan.decided:
+                if item.prompted:
+                    operation = self.apply_resolution(item.conflict, item.resolution, library_sync)
+                    self._record_operation(sync_history, item, operation, library_sync)
             
             sync_history.success = sync_history.conflicts_resolved == sync_history.conflicts_detected
+            self.console.print(
+                f"🔀 {sync_history.merges_automatic} merged automatically, "
+                f"{sync_history.resolved_by_policy} resolved by policy, "
+                f"{sync_history.merges_manual} need manual merge"
+            )
             
             if sync_history.success:
                 self.console.print("✅ All conflicts resolved successfully!")
@@ -319,3 +661,24 @@ class SyncService:
             sync_history.success = False
         
         return sync_history
+    
+    def _record_operation(
+        self,
+        sync_history: SyncHistory,
+        item: PlannedResolution,
+        operation: SyncOperation,
+        library_sync: LibrarySync
+    ) -> None:
+        """Add an applied resolution to the sync history."""
+        sync_history.add_operation(operation)
+        
+        if operation.manual_merge:
+            sync_history.merges_manual += 1
+        elif operation.success and item.resolution == Resolution.MERGE:
+            sync_history.merges_automatic += 1
+        elif operation.success and not item.prompted:
+            sync_history.resolved_by_policy += 1
+        
+        if operation.success:
+            sync_history.conflicts_resolved += 1
+            library_sync.resolve_conflict(item.conflict.file_path, item.resolution)
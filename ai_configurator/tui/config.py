@@ -26,6 +26,13 @@ def get_library_paths() -> tuple[Path, Path]:
     return base_path, personal_path
 
 
+def get_library_layers(base_path: Path, personal_path: Path) -> list:
+    """Get library layers, including remote team libraries from the configuration."""
+    from ai_configurator.core.config import get_config
+    from ai_configurator.services.library_service import build_layers
+    return build_layers(base_path, personal_path, get_config().library_config)
+
+
 def get_registry_dir() -> Path:
     """Get the MCP registry directory."""
     # Use 'registry' for backward compatibility with existing data
@@ -31,14 +31,16 @@ class AgentEditScreen(BaseScreen):
         self.original_tool = agent.tool_type
         
         # Get available items
-        from ai_configurator.tui.config import get_library_paths, get_registry_dir
+        from ai_configurator.tui.config import get_library_layers, get_library_paths, get_registry_dir
         base_path, personal_path = get_library_paths()
-        self.library_service = LibraryService(base_path, personal_path)
+        self.library_service = LibraryService(
+            base_path, personal_path, layers=get_library_layers(base_path, personal_path)
+        )
         self.registry_service = RegistryService(get_registry_dir())
         
-        # Load available items
+        # Load available items, one effective file per path across all layers
         library = self.library_service.create_library()
-        self.available_files = {f.path: f for f in library.files.values()}
+        self.available_files = {path: library.get_effective_file(path) for path in library.effective_paths()}
         
         # Load MCP servers from servers directory
         import json
@@ -61,12 +61,12 @@ class AgentManagerScreen(BaseScreen):
         table.clear()
         
         try:
-            agents = self.agent_service.list_agents()
+            agents = self.agent_service.list_agent_summaries()
             for agent in agents:
                 table.add_row(
                     agent.name,
                     agent.tool_type.value,
-                    str(len(agent.config.resources)),
+                    str(agent.resource_count),
                     agent.health_status.value
                 )
             
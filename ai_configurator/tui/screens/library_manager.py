@@ -22,14 +22,18 @@ class LibraryManagerScreen(BaseScreen):
         Binding("s", "sync", "Sync"),
         Binding("d", "diff", "Diff"),
         Binding("r", "refresh", "Refresh"),
+        Binding("/", "search", "Search"),
+        Binding("f", "filter", "Filter"),
     ]
     
     def __init__(self):
         super().__init__()
-        from ai_configurator.tui.config import get_library_paths
+        from ai_configurator.tui.config import get_library_layers, get_library_paths
         base_path, personal_path = get_library_paths()
-        self.library_service = LibraryService(base_path, personal_path)
-        self.sync_service = SyncService()
+        self.library_service = LibraryService(
+            base_path, personal_path, layers=get_library_layers(base_path, personal_path)
+        )
+        self.sync_service = SyncService(index=self.library_service.index)
         self.selected_file = None
         self.personal_path = personal_path
     
@@ -37,8 +41,8 @@ class LibraryManagerScreen(BaseScreen):
         """Build screen layout."""
         yield Header()
         yield Container(
-            Static("[bold cyan]Library Management[/bold cyan]\n[dim]n=New e=Edit c=Clone s=Sync d=Diff r=Refresh[/dim]", id="title"),
-            Static(self.get_status_text(), id="status"),
+            Static("[bold cyan]Library Management[/bold cyan]\n[dim]n=New e=Edit c=Clone s=Sync d=Diff r=Refresh /=Search f=Filter[/dim]", id="title"),
+            Static("[dim]Loading library...[/dim]", id="status"),
             DataTable(id="file_table", classes="file-list"),
             id="library-container"
         )
@@ -52,10 +56,10 @@ class LibraryManagerScreen(BaseScreen):
         table.focus()
         self.refresh_data()
     
-    def get_status_text(self) -> str:
+    def get_status_text(self, library=None) -> str:
         """Get library status."""
         try:
-            library = self.library_service.create_library()
+            library = library or self.library_service.create_library()
             base_count = sum(1 for f in library.files.values() if f.source.value == 'base')
             personal_count = sum(1 for f in library.files.values() if f.source.value == 'personal')
             
@@ -67,38 +71,32 @@ class LibraryManagerScreen(BaseScreen):
     
     def refresh_data(self) -> None:
         """Refresh status and file list."""
-        # Update status
-        status_widget = self.query_one("#status", Static)
-        status_widget.update(self.get_status_text())
-        
-        # Update file table
         table = self.query_one(DataTable)
         table.clear()
         
         try:
+            # One scan serves both the status panel and the file table
             library = self.library_service.create_library()
-            
-            # Separate base and personal files
-            base_files = [(k, f) for k, f in library.files.items() if f.source.value == 'base']
-            personal_files = [(k, f) for k, f in library.files.items() if f.source.value == 'personal']
-            
-            # Add base files
-            for file_key, file_info in sorted(base_files, key=lambda x: x[1].path):
-                filename = file_info.path
-                source = file_info.source.value
-                size = f"{file_info.size} bytes" if file_info.size > 0 else "-"
-                table.add_row(filename, source, size)
-            
-            # Add separator if both exist
-            if base_files and personal_files:
-                table.add_row("─" * 40, "─" * 10, "─" * 10)
-            
-            # Add personal files
-            for file_key, file_info in sorted(personal_files, key=lambda x: x[1].path):
-                filename = file_info.path
-                source = file_info.source.value
-                size = f"{file_info.size} bytes" if file_info.size > 0 else "-"
-                table.add_row(filename, source, size)
+            self.query_one("#status", Static).update(self.get_status_text(library))
+            
+            # One block of files per layer, lowest precedence first
+            first = True
+            for layer in library.layers:
+                prefix = f"{layer.name}/"
+                layer_files = sorted(
+                    (f for k, f in library.files.items() if k.startswith(prefix)), key=lambda f: f.path
+                )
+                if not layer_files:
+                    continue
+                
+                # Add separator between layers
+                if not first:
+                    table.add_row("─" * 40, "─" * 10, "─" * 10)
+                first = False
+                
+                for file_info in layer_files:
+                    size = f"{file_info.size} bytes" if file_info.size > 0 else "-"
+                    table.add_row(file_info.path, layer.name, size)
                 
         except Exception as e:
             logger.error(f"Error loading files: {e}", exc_info=True)
@@ -125,8 +123,12 @@ class LibraryManagerScreen(BaseScreen):
             
             result = self.sync_service.sync_library(library_sync, interactive=False)
             
-            if result.conflicts_detected > 0:
-                self.show_notification(f"Found {result.conflicts_detected} conflicts", "warning")
+            if result.conflicts_resolved < result.conflicts_detected:
+                self.show_notification(
+                    f"Found {result.conflicts_detected} conflicts: {result.merges_automatic} merged automatically, "
+                    f"{result.resolved_by_policy} resolved by policy, {result.merges_manual} need manual merge",
+                    "warning"
+                )
             else:
                 self.show_notification("Sync completed successfully", "information")
             
@@ -151,6 +153,13 @@ class LibraryManagerScreen(BaseScreen):
             )
             
             conflicts = self.sync_service.detect_conflicts(library_sync)
+            
+            # Selected file differs from base - show it side by side
+            selected = next((c for c in conflicts if c.file_path == self.selected_file), None)
+            if selected:
+                self._show_side_by_side(selected)
+                return
+            
             if conflicts:
                 msg = f"Found {len(conflicts)} differences:\n"
                 for conflict in conflicts[:5]:  # Show first 5
@@ -164,6 +173,128 @@ class LibraryManagerScreen(BaseScreen):
             logger.error(f"Error detecting differences: {e}", exc_info=True)
             self.show_notification(f"Error: {e}", "error")
     
+    def _show_side_by_side(self, conflict) -> None:
+        """Open a scrollable side-by-side diff of base and personal versions."""
+        from textual.screen import ModalScreen
+        
+        table = self.sync_service.side_by_side_table(conflict)
+        
+        class DiffScreen(ModalScreen):
+            """Side-by-side diff viewer."""
+            BINDINGS = [Binding("escape", "dismiss", "Close")]
+            
+            def compose(self):
+                yield VerticalScroll(
+                    Static(table),
+                    Static("[dim]Esc=Close[/dim]"),
+                    id="diff_dialog"
+                )
+        
+        self.app.push_screen(DiffScreen())
+    
+    def action_search(self) -> None:
+        """Search library content, best matches first."""
+        from textual.widgets import Input
+        from textual.screen import ModalScreen
+        from textual.containers import Vertical
+        
+        class SearchInputScreen(ModalScreen):
+            """Search query input."""
+            def compose(self):
+                yield Vertical(
+                    Static('[bold]Search Library[/bold]\nWords, prefix* or "exact phrase" (empty to clear):'),
+                    Input(placeholder="query", id="search_input"),
+                    id="input_dialog"
+                )
+            
+            def on_input_submitted(self, event: Input.Submitted):
+                self.dismiss(event.value)
+        
+        self.app.push_screen(SearchInputScreen(), self._show_search_results)
+    
+    def _show_search_results(self, query: str) -> None:
+        """Replace the file list with ranked search results."""
+        from rich.text import Text
+        
+        if not query or not query.strip():
+            self.refresh_data()
+            return
+        
+        try:
+            results = self.library_service.search(query, limit=100)
+        except Exception as e:
+            logger.error(f"Error searching library: {e}", exc_info=True)
+            self.show_notification(f"Search error: {e}", "error")
+            return
+        
+        table = self.query_one(DataTable)
+        table.clear()
+        for result in results:
+            source = next(
+                (layer.name for layer in self.library_service.layers if layer.path == result.root), "base"
+            )
+            table.add_row(result.path, source, f"score {result.score:.2f}")
+        
+        # Show the best match's snippet in the status panel
+        status = Text.from_markup(f"[bold]Search:[/bold] {query}  ({len(results)} matches, r=Show all)")
+        if results:
+            snippet = Text(results[0].snippet, style="dim")
+            for start, end in results[0].highlights:
+                snippet.stylize("bold yellow", start, end)
+            status.append("\n  ").append(snippet)
+        self.query_one("#status", Static).update(status)
+    
+    def action_filter(self) -> None:
+        """Filter the file list by tag, category and title."""
+        from textual.widgets import Input
+        from textual.screen import ModalScreen
+        from textual.containers import Vertical
+        
+        class FilterInputScreen(ModalScreen):
+            """Filter input."""
+            def compose(self):
+                yield Vertical(
+                    Static('[bold]Filter Library[/bold]\n#tag, category/ and title words, e.g. "#security roles/ review" (empty to clear):'),
+                    Input(placeholder="filter", id="filter_input"),
+                    id="input_dialog"
+                )
+            
+            def on_input_submitted(self, event: Input.Submitted):
+                self.dismiss(event.value)
+        
+        self.app.push_screen(FilterInputScreen(), self._show_filtered_files)
+    
+    def _show_filtered_files(self, expression: str) -> None:
+        """Replace the file list with files matching a filter, straight from the index."""
+        if not expression or not expression.strip():
+            self.refresh_data()
+            return
+        
+        tags, category, words = [], None, []
+        for token in expression.split():
+            if token.startswith("#"):
+                tags.append(token)
+            elif token.endswith("/"):
+                category = token
+            else:
+                words.append(token)
+        
+        try:
+            # The list was scanned when it was loaded; no need to walk the disk again
+            matches = self.library_service.find_files(tags, category, " ".join(words) or None, refresh=False)
+        except Exception as e:
+            logger.error(f"Error filtering library: {e}", exc_info=True)
+            self.show_notification(f"Filter error: {e}", "error")
+            return
+        
+        table = self.query_one(DataTable)
+        table.clear()
+        for path, source in matches:
+            table.add_row(path, source.value, "-")
+        self.query_one("#status", Static).update(
+            f"[bold]Filter:[/bold] {expression}  ({len(matches)} files, r=Show all)"
+        )
+    
     def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
         """Track selected file."""
         try:
@@ -243,24 +374,11 @@ class LibraryManagerScreen(BaseScreen):
             return
         
         try:
-            # Find the file - prefer personal over base
+            # Find the effective file - the highest layer that has it
             library = self.library_service.create_library()
-            file_info = None
             
             logger.info(f"Editing file: {self.selected_file}")
-            
-            # First look for personal version
-            for f in library.files.values():
-                if f.path == self.selected_file and f.source.value == 'personal':
-                    file_info = f
-                    break
-            
-            # If not found, look for base version
-            if not file_info:
-                for f in library.files.values():
-                    if f.path == self.selected_file and f.source.value == 'base':
-                        file_info = f
-                        break
+            file_info = library.get_effective_file(self.selected_file)
             
             if not file_info:
                 self.show_notification(f"File not found: {self.selected_file}", "error")
@@ -274,8 +392,10 @@ class LibraryManagerScreen(BaseScreen):
                 file_path = self.personal_path / file_info.path
                 logger.info(f"Opening personal file: {file_path}")
             else:
-                # Base file - suggest cloning
-                self.show_notification("Base file - press 'c' to clone to personal first", "warning")
+                # Base or remote file - suggest cloning
+                self.show_notification(
+                    f"{file_info.source.value.capitalize()} file - press 'c' to clone to personal first", "warning"
+                )
                 return
             
             if not file_path.exists():
@@ -319,20 +439,11 @@ class LibraryManagerScreen(BaseScreen):
             return
         
         try:
-            # Find the file
+            # Find the effective file and the layer it comes from
             library = self.library_service.create_library()
-            file_info = None
-            source_path = None
-            
-            for key, f in library.files.items():
-                if f.path == self.selected_file:
-                    file_info = f
-                    # Use the key to construct full path
-                    if f.source.value == 'base':
-                        source_path = library.base_path / key.replace('base/', '', 1)
-                    else:
-                        source_path = self.personal_path / key.replace('personal/', '', 1)
-                    break
+            file_info = library.get_effective_file(self.selected_file)
+            layer = library.get_effective_layer(self.selected_file)
+            source_path = layer.path / file_info.path if layer else None
             
             if not file_info or not source_path:
                 self.show_notification(f"File not found: {self.selected_file}", "error")
@@ -348,8 +459,11 @@ class LibraryManagerScreen(BaseScreen):
             # Create parent directories if needed
             target_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Copy file
+            # Copy file, remembering the base version for later three-way merges
             shutil.copy2(source_path, target_path)
+            if file_info.source.value == 'base':
+                from ai_configurator.services.merge_base_store import MergeBaseStore
+                MergeBaseStore(self.personal_path).record(file_info.path, source_path)
             
             self.show_notification(f"Cloned to personal: {self.selected_file}", "information")
             self.refresh_data()
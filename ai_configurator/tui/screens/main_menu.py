@@ -49,7 +49,7 @@ class MainMenuScreen(BaseScreen):
             library_service = LibraryService(base_path, personal_path)
             registry_service = RegistryService(get_registry_dir())
             
-            agents = agent_service.list_agents()
+            agents = agent_service.list_agent_summaries()
             library = library_service.create_library()
             servers = registry_service.get_installed_servers()
             
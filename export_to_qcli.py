@@ -6,6 +6,7 @@ Export AI Configurator agent to Q CLI format.
 import json
 import sys
 from pathlib import Path
+from ai_configurator.core.file_utils import write_if_changed
 from ai_configurator.services import AgentService
 from ai_configurator.models import ToolType
 
@@ -54,10 +55,11 @@ def export_agent_to_qcli(agent_name: str):
     agent_file = q_cli_agents_dir / f"{agent_name}.json"
     
     try:
-        with open(agent_file, 'w') as f:
-            json.dump(q_cli_config, f, indent=2)
-        
-        print(f"✅ Agent exported to Q CLI: {agent_file}")
+        # Atomic, and skipped when identical so Q CLI doesn't reload the agent
+        if write_if_changed(agent_file, json.dumps(q_cli_config, indent=2).encode("utf-8")):
+            print(f"✅ Agent exported to Q CLI: {agent_file}")
+        else:
+            print(f"✅ Agent already up to date in Q CLI: {agent_file}")
         print(f"📄 Resources: {len(fixed_resources)}")
         for resource in fixed_resources:
             print(f"   • {resource}")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk agent loading against the previous validate-everything path.
+
+Writes a synthetic agents directory through AgentService, then times the
+old per-file pydantic parse and validate, a cold listing that builds the
+catalog from scratch, and warm listings of summaries and of full agents
+loaded through the trusted path.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from ai_configurator.models import Agent, AgentConfig, LibrarySource, MCPServerConfig, ResourcePath, ToolType
+from ai_configurator.services import agent_catalog
+from ai_configurator.services.agent_catalog import CATALOG_FILENAME
+from ai_configurator.services.agent_service import AgentService
+
+
+def build_agents(agents_dir: Path, count: int, resources: int, servers: int) -> None:
+    """Write count agents with the given numbers of resources and MCP servers."""
+    service = AgentService(agents_dir)
+    for i in range(count):
+        agent = Agent(config=AgentConfig(
+            name=f"agent-{i:05d}",
+            description=f"Synthetic agent {i}",
+            tool_type=ToolType.Q_CLI,
+            resources=[ResourcePath(path=f"roles/role-{i % 50}/rule-{r}.md", source=LibrarySource.BASE)
+                       for r in range(resources)],
+            mcp_servers={f"server-{s}": MCPServerConfig(command="npx", args=["-y", f"server-{s}"])
+                         for s in range(servers)}
+        ))
+        agent.validate()
+        service._save_agent(agent)
+
+
+def validating_load(agents_dir: Path) -> int:
+    """The previous approach: glob, json.loads, AgentConfig(**data) and validate() per file."""
+    agents = []
+    for agent_file in agents_dir.glob("*.json"):
+        agent = Agent(config=AgentConfig(**json.loads(agent_file.read_text())))
+        agent.validate()
+        agents.append(agent)
+    return len(agents)
+
+
+def timed(label: str, func: Callable[[], int]) -> None:
+    start = time.perf_counter()
+    count = func()
+    print(f"{label:<36}{time.perf_counter() - start:>10.3f}{count:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=10_000, help="Number of agents to generate")
+    parser.add_argument("--resources", type=int, default=10, help="Resources per agent")
+    parser.add_argument("--servers", type=int, default=2, help="MCP servers per agent")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        agents_dir = Path(tmp) / "agents"
+        print(f"🤖 Generating {args.agents} agents...")
+        build_agents(agents_dir, args.agents, args.resources, args.servers)
+        # Start the timed runs from an empty catalog
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{agents_dir / CATALOG_FILENAME}{suffix}").unlink(missing_ok=True)
+
+        print(f"   JSON parser: {'orjson' if agent_catalog.ORJSON_AVAILABLE else 'json'}")
+        print(f"\n{'Load':<36}{'Time (s)':>10}{'Agents':>10}")
+        timed("validating load (previous)", lambda: validating_load(agents_dir))
+        timed("list_agents, cold catalog", lambda: len(AgentService(agents_dir).list_agents()))
+        service = AgentService(agents_dir)
+        timed("list_agent_summaries, warm", lambda: len(service.list_agent_summaries()))
+        timed("list_agents, warm (trusted)", lambda: len(service.list_agents()))
+
+
+if __name__ == "__main__":
+    main()
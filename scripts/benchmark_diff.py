@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark the library diff engine against difflib.unified_diff.
+
+Generates a large markdown knowledge file, then a personalized copy with
+scattered line edits, inserted notes and a number of sections moved
+around, and diffs the two with difflib and ai_configurator.core.diff.
+"""
+
+import argparse
+import difflib
+import random
+import time
+from typing import Callable, Iterator, List
+
+from ai_configurator.core import diff as diff_engine
+
+
+def build_document(rng: random.Random, target_bytes: int) -> List[str]:
+    """Markdown with numbered sections of bullet points and some repeated boilerplate."""
+    words = ["agent", "library", "rule", "review", "deploy", "security", "test", "config",
+             "policy", "module", "context", "prompt", "server", "tool", "cache", "index"]
+    lines: List[str] = []
+    size = 0
+    section = 0
+    while size < target_bytes:
+        section += 1
+        block = [f"## Section {section}", ""]
+        for item in range(rng.randint(5, 30)):
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(6, 16)))
+            block.append(f"- {section}.{item} {text}")
+        block += ["", "See also: common guidelines.", ""]
+        lines += block
+        size += sum(len(line) + 1 for line in block)
+    return lines
+
+
+def personalize(rng: random.Random, lines: List[str], edits: int, moves: int) -> List[str]:
+    """Edit, insert and reorder sections the way a personal copy drifts from base."""
+    result = list(lines)
+    for _ in range(edits):
+        index = rng.randrange(len(result))
+        if rng.random() < 0.5:
+            result[index] = result[index] + " (personal note)"
+        else:
+            result.insert(index, f"> Reminder {index}")
+
+    section_starts = [i for i, line in enumerate(result) if line.startswith("## ")]
+    sections = [result[start:end] for start, end in zip(section_starts, section_starts[1:] + [len(result)])]
+    for _ in range(moves):
+        moved = sections.pop(rng.randrange(len(sections)))
+        sections.insert(rng.randrange(len(sections) + 1), moved)
+    return result[:section_starts[0]] + [line for section in sections for line in section]
+
+
+def timed(func: Callable[[List[str], List[str]], Iterator[str]], a: List[str], b: List[str]):
+    start = time.perf_counter()
+    output = list(func(a, b))
+    return time.perf_counter() - start, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=1.5, help="Size of the generated base file")
+    parser.add_argument("--edits", type=int, default=200, help="Number of scattered line edits")
+    parser.add_argument("--moves", type=int, default=20, help="Number of sections moved")
+    parser.add_argument("--skip-difflib", action="store_true", help="Only time the new engine")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    base = build_document(rng, int(args.size_mb * 1024 * 1024))
+    personal = personalize(rng, base, args.edits, args.moves)
+    print(f"📄 {len(base)} -> {len(personal)} lines, "
+          f"{sum(len(line) + 1 for line in base) / (1024 * 1024):.2f} MB")
+    print(f"   NumPy prefilter: {'yes' if diff_engine.NUMPY_AVAILABLE else 'no'}\n")
+
+    candidates = [("core.diff", lambda a, b: diff_engine.unified_diff(a, b, lineterm=""))]
+    if not args.skip_difflib:
+        candidates.insert(0, ("difflib", lambda a, b: difflib.unified_diff(a, b, lineterm="")))
+
+    print(f"{'Implementation':<16}{'Time (s)':>12}{'Diff lines':>12}")
+    for name, func in candidates:
+        elapsed, output = timed(func, base, personal)
+        print(f"{name:<16}{elapsed:>12.3f}{len(output):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared batch hasher against the previous serial hashing loop.
+
+Builds a synthetic library of markdown files, then hashes it with the old
+4 KB-chunk serial loop and with ai_configurator.core.hashing.hash_files, on
+both a cold page cache (pages dropped with posix_fadvise) and a warm one.
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from ai_configurator.core.hashing import hash_files
+
+
+def legacy_hash_file(file_path: Path) -> str:
+    """The pre-existing SyncService.calculate_file_hash implementation."""
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(4096), b""):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+def legacy_hash_files(paths: List[Path]) -> Dict[Path, str]:
+    """Serial loop as used by _scan_directory and _index_files."""
+    return {path: legacy_hash_file(path) for path in paths}
+
+
+def build_library(root: Path, file_count: int, large_every: int) -> List[Path]:
+    """Create a tree of small rule files with an occasional large reference doc."""
+    rng = random.Random(42)
+    paths = []
+    for i in range(file_count):
+        role_dir = root / f"role-{i % 50:02d}"
+        role_dir.mkdir(parents=True, exist_ok=True)
+        size = 5 * 1024 * 1024 if large_every and i % large_every == 0 else rng.randint(512, 8192)
+        path = role_dir / f"rule-{i:05d}.md"
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+            f.flush()
+            os.fsync(f.fileno())
+        paths.append(path)
+    return paths
+
+
+def drop_page_cache(paths: List[Path]) -> bool:
+    """Evict the files from the OS page cache where the platform allows it."""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def timed(func: Callable[[List[Path]], Dict[Path, str]], paths: List[Path]) -> float:
+    start = time.perf_counter()
+    func(paths)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000, help="Number of files to generate")
+    parser.add_argument("--large-every", type=int, default=1000,
+                        help="Make every Nth file a 5 MB document (0 disables)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"📁 Generating {args.files} files...")
+        paths = build_library(Path(tmp), args.files, args.large_every)
+        total_mb = sum(p.stat().st_size for p in paths) / (1024 * 1024)
+        print(f"   {total_mb:.1f} MB total\n")
+
+        candidates = [("serial (4 KB chunks)", legacy_hash_files), ("hash_files (pooled)", hash_files)]
+        assert legacy_hash_files(paths) == hash_files(paths), "digests differ"
+
+        print(f"{'Implementation':<24}{'Cold (s)':>12}{'Warm (s)':>12}{'Warm MB/s':>12}")
+        for name, func in candidates:
+            cold = timed(func, paths) if drop_page_cache(paths) else float("nan")
+            warm = timed(func, paths)
+            print(f"{name:<24}{cold:>12.3f}{warm:>12.3f}{total_mb / warm:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
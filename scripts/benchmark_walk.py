@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared library walker against the previous rglob scans.
+
+Builds a synthetic tree of small library files spread over nested role
+directories, then times the old per-extension rglob passes, a cold walk,
+a warm rescan that needs fresh stats (as the library index does) and a
+warm listing-only rescan (as file counts and category listings do).
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from ai_configurator.core import file_walker
+from ai_configurator.core.file_walker import FileWalker
+
+EXTENSIONS = (".md", ".txt", ".json", ".yaml")
+
+
+def build_tree(root: Path, file_count: int, files_per_dir: int) -> None:
+    """Create file_count tiny files in directories of files_per_dir, two levels deep."""
+    for i in range(file_count):
+        directory = root / f"category-{i // (files_per_dir * 20):03d}" / f"role-{i // files_per_dir:05d}"
+        if i % files_per_dir == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        extension = EXTENSIONS[i % len(EXTENSIONS)]
+        (directory / f"file-{i:06d}{extension}").write_bytes(b"# Rule\n")
+
+
+def rglob_scan(root: Path) -> int:
+    """The previous approach: one rglob and stat per extension."""
+    count = 0
+    for extension in EXTENSIONS:
+        for path in root.rglob(f"*{extension}"):
+            if path.is_file():
+                path.stat()
+                count += 1
+    return count
+
+
+def timed(label: str, func: Callable[[], int]) -> None:
+    start = time.perf_counter()
+    count = func()
+    print(f"{label:<32}{time.perf_counter() - start:>10.3f}{count:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=100_000, help="Number of files to generate")
+    parser.add_argument("--files-per-dir", type=int, default=50, help="Files in each leaf directory")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "library"
+        print(f"📁 Generating {args.files} files...")
+        build_tree(root, args.files, args.files_per_dir)
+
+        # Directory listings are only trusted once their mtime is old enough
+        past = time.time() - 60
+        for directory, _, _ in os.walk(root):
+            os.utime(directory, (past, past))
+
+        walker = FileWalker(extensions=EXTENSIONS)
+        print(f"\n{'Scan':<32}{'Time (s)':>10}{'Files':>10}")
+        timed("rglob per extension", lambda: rglob_scan(root))
+        timed("walker, cold", lambda: sum(1 for _ in walker.walk(root)))
+        timed("walker, warm, fresh stats", lambda: sum(1 for _ in walker.walk(root)))
+        timed("walker, warm, listing only", lambda: walker.count(root))
+
+        print(f"\n   Cached directory listings: {len(walker._listings)}"
+              f" (reuse window {file_walker.RACY_WINDOW_NS / 1e9:.0f}s)")
+
+
+if __name__ == "__main__":
+    main()
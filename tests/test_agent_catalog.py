@@ -0,0 +1,101 @@
+"""Tests for the agent summary catalog."""
+
+from ai_configurator.models import HealthStatus, LibrarySource, ResourcePath, ToolType
+from ai_configurator.models.mcp_server import MCPServerConfig
+from ai_configurator.services.agent_catalog import parse_agent
+from ai_configurator.services.agent_service import AgentService
+
+
+def test_catalog_tracks_saves_deletes_and_external_edits(tmp_path):
+    """Test that summaries follow service writes and files changed behind its back."""
+    service = AgentService(tmp_path / "agents")
+    service.create_agent("writer", ToolType.Q_CLI, "Writes docs")
+    service.create_agent("coder", ToolType.CLAUDE)
+
+    summaries = service.list_agent_summaries()
+    assert [s.name for s in summaries] == ["coder", "writer"]
+    assert summaries[1].description == "Writes docs"
+    assert summaries[1].health_status == HealthStatus.HEALTHY
+    assert [s.name for s in service.list_agent_summaries(ToolType.Q_CLI)] == ["writer"]
+
+    agent_file = tmp_path / "agents" / "writer_q-cli.json"
+    agent_file.write_text(agent_file.read_text().replace("Writes docs", "Edits docs"))
+    service.delete_agent("coder", ToolType.CLAUDE)
+    (tmp_path / "agents" / "broken_q-cli.json").write_text("{not json")
+
+    # A fresh service starts from the persisted catalog
+    reopened = AgentService(tmp_path / "agents")
+    summaries = reopened.list_agent_summaries()
+    assert [s.name for s in summaries] == ["writer"]
+    assert summaries[0].description == "Edits docs"
+    assert [a.name for a in reopened.list_agents()] == ["writer"]
+
+
+def test_dependents_follow_resources_and_servers(tmp_path):
+    """Test the reverse index from library paths and MCP servers to agents."""
+    service = AgentService(tmp_path / "agents")
+    for name, paths, servers in [("dev", ["roles/dev.md", "common/style.md"], ["git"]),
+                                 ("ops", ["./roles/ops.md"], ["git", "aws"])]:
+        agent = service.create_agent(name, ToolType.Q_CLI)
+        for path in paths:
+            agent.add_resource(ResourcePath(path=path, source=LibrarySource.BASE))
+        for server in servers:
+            agent.configure_mcp_server(server, MCPServerConfig(command=server))
+        service.update_agent(agent)
+
+    def names(**kwargs):
+        return [s.name for s in service.find_dependent_agents(**kwargs)]
+
+    assert names(paths=["roles/dev.md"]) == ["dev"]
+    assert names(paths=["roles/"]) == ["dev", "ops"]
+    assert names(paths=["role"]) == []
+    assert names(servers=["aws"]) == ["ops"]
+    assert names(paths=["common/style.md"], servers=["aws"]) == ["dev", "ops"]
+
+    agent = service.load_agent("dev", ToolType.Q_CLI)
+    agent.config.resources = []
+    service.update_agent(agent)
+    service.delete_agent("ops", ToolType.Q_CLI)
+    assert names(paths=["roles"]) == []
+    assert names(servers=["git"]) == ["dev"]
+
+
+def test_bulk_export_writes_only_changed_agents(tmp_path):
+    """Test that re-exporting leaves identical Q CLI files untouched."""
+    service = AgentService(tmp_path / "agents")
+    for name in ("alpha", "beta"):
+        service.create_agent(name, ToolType.Q_CLI)
+    target = tmp_path / "cli-agents"
+
+    first = service.export_agents_to_q_cli(target_dir=target)
+    assert sorted(first.written) == ["alpha", "beta"]
+    mtime = (target / "beta.json").stat().st_mtime_ns
+
+    agent = service.load_agent("alpha", ToolType.Q_CLI)
+    agent.config.description = "Changed"
+    service.update_agent(agent)
+    second = service.export_agents_to_q_cli(target_dir=target)
+    assert second.written == ["alpha"] and second.unchanged == ["beta"]
+    assert (target / "beta.json").stat().st_mtime_ns == mtime
+    assert not list(target.glob(".*.tmp"))
+
+    assert service.export_agents_to_q_cli(["gamma"], target_dir=target).missing == ["gamma"]
+
+
+def test_trusted_load_matches_validated_load(tmp_path):
+    """Test that catalogued agents load without validation to the same model."""
+    service = AgentService(tmp_path / "agents")
+    agent = service.create_agent("dev", ToolType.Q_CLI, "Builds things")
+    agent.add_resource(ResourcePath(path="roles/dev.md", source=LibrarySource.PERSONAL))
+    agent.configure_mcp_server("git", MCPServerConfig(command="git", args=["serve"]))
+    service.update_agent(agent)
+    agent_file = tmp_path / "agents" / "dev_q-cli.json"
+
+    trusted = service.load_agent("dev", ToolType.Q_CLI)
+    assert trusted.config == parse_agent(agent_file.read_bytes()).config
+    assert trusted.health_status == HealthStatus.HEALTHY
+    assert trusted.to_q_cli_format() == agent.to_q_cli_format()
+
+    # Content the catalog has not seen takes the validating path
+    agent_file.write_text(agent_file.read_text().replace('"serve"', '42'))
+    assert service.load_agent("dev", ToolType.Q_CLI) is None
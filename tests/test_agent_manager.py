@@ -0,0 +1,37 @@
+"""Tests for incremental agent rebuilds."""
+
+import json
+
+from ai_configurator.core.agent_manager import AgentManager
+
+
+def test_update_all_agents_rebuilds_only_changed_agents(tmp_path, monkeypatch):
+    """Test that unchanged agents are skipped and outputs rewritten only on change."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    manager = AgentManager()
+    library_dir = manager.library_manager.library_dir
+    (library_dir / "roles" / "dev").mkdir(parents=True)
+    (library_dir / "roles" / "dev" / "dev.md").write_text("# Dev\n")
+    (library_dir / "roles" / "dev" / "mcp.json").write_text('{"mcpServers": {"git": {"command": "git"}}}')
+    (library_dir / "common.md").write_text("# Common\n")
+
+    for name, rules in [("dev", ["roles/dev/dev.md"]), ("writer", ["common.md"])]:
+        resources = [f"file://{library_dir / rule}" for rule in rules]
+        (manager.agents_dir / f"{name}.json").write_text(json.dumps({"name": name, "resources": resources}))
+
+    assert manager.update_all_agents()
+    exported = tmp_path / ".aws" / "amazonq" / "cli-agents" / "dev.json"
+    assert json.loads(exported.read_text())["mcpServers"] == {"git": {"command": "git"}}
+
+    plans = []
+    rebuild = manager._rebuild_agent
+    monkeypatch.setattr(manager, "_rebuild_agent", lambda plan, hashes: plans.append(plan["name"]) or rebuild(plan, hashes))
+    assert manager.update_all_agents()
+    assert plans == []
+
+    (library_dir / "roles" / "dev" / "mcp.json").write_text('{"mcpServers": {}}')
+    writer_mtime = (manager.agents_dir / "writer.json").stat().st_mtime_ns
+    assert manager.update_all_agents()
+    assert plans == ["dev"]
+    assert "mcpServers" not in json.loads(exported.read_text())
+    assert (manager.agents_dir / "writer.json").stat().st_mtime_ns == writer_mtime
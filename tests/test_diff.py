@@ -0,0 +1,35 @@
+"""Tests for the line diff engine."""
+
+import difflib
+import random
+
+from ai_configurator.core.diff import diff_opcodes, side_by_side, unified_diff
+
+
+def test_opcodes_rebuild_target():
+    """Test that opcodes always describe a valid edit of a into b."""
+    rng = random.Random(7)
+    for _ in range(500):
+        a = [rng.choice("abcdef") for _ in range(rng.randint(0, 25))]
+        b = [rng.choice("abcdef") for _ in range(rng.randint(0, 25))]
+        rebuilt = []
+        for tag, i1, i2, j1, j2 in diff_opcodes(a, b):
+            if tag == "equal":
+                assert a[i1:i2] == b[j1:j2]
+            rebuilt.extend(b[j1:j2])
+        assert rebuilt == b
+
+
+def test_unified_and_side_by_side_output():
+    """Test that simple edits format exactly like difflib and pair up side by side."""
+    a = [f"line {i}" for i in range(12)]
+    b = list(a)
+    b[2] = "changed"
+    b.insert(9, "added")
+
+    assert list(unified_diff(a, b, "base", "personal", lineterm="")) == \
+        list(difflib.unified_diff(a, b, "base", "personal", lineterm=""))
+
+    rows = [row for hunk in side_by_side(a, b) for row in hunk]
+    changed = [row for row in rows if row.tag != "equal"]
+    assert [(row.left, row.right) for row in changed] == [("line 2", "changed"), ("", "added")]
@@ -0,0 +1,54 @@
+"""Tests for the library file walker."""
+
+from ai_configurator.core.file_walker import FileWalker
+from ai_configurator.core.library_index import LibraryIndex
+
+
+def test_walker_matches_extensions_and_size_limit(tmp_path):
+    """Test that one walk finds every allowed format and skips oversized and hidden files."""
+    root = tmp_path / "library"
+    (root / "roles" / "dev").mkdir(parents=True)
+    (root / ".sync-commit").mkdir()
+    (root / "roles" / "dev" / "rules.md").write_text("# Rules\n")
+    (root / "roles" / "dev" / "mcp.json").write_text('{"name": "Dev servers", "tags": ["mcp"]}')
+    (root / "roles" / "dev" / "notes.TXT").write_text("plain notes\n")
+    (root / "roles" / "dev" / "image.png").write_bytes(b"\x89PNG")
+    (root / "roles" / "dev" / "huge.md").write_text("x" * 2048)
+    (root / ".sync-commit" / "staged.md").write_text("# Staged\n")
+
+    walker = FileWalker(extensions=[".md", ".json", ".txt"], max_file_size=1024)
+    oversized = []
+    found = sorted(walked.path for walked in walker.walk(root, on_oversized=oversized.append))
+    assert found == ["roles/dev/mcp.json", "roles/dev/notes.TXT", "roles/dev/rules.md"]
+    assert oversized == ["roles/dev/huge.md"]
+
+    index = LibraryIndex(tmp_path / "index.db", walker=walker)
+    metadata = index.metadata(index.scan(root))
+    assert metadata["roles/dev/mcp.json"]["title"] == "Dev servers"
+    assert index.query(root, tags=["mcp"]) == {"roles/dev/mcp.json"}
+
+
+def test_walker_reuses_listings_of_unchanged_directories(tmp_path):
+    """Test that rescans skip directories whose mtime is unchanged and honour exclusions."""
+    import os
+    import time
+
+    root = tmp_path / "library"
+    (root / "roles").mkdir(parents=True)
+    (root / "drafts").mkdir()
+    (root / "roles" / "dev.md").write_text("# Dev\n")
+    (root / "drafts" / "idea.md").write_text("# Idea\n")
+    past = time.time() - 60
+    os.utime(root / "roles", (past, past))
+
+    walker = FileWalker(excluded_patterns=["drafts"])
+    assert [walked.path for walked in walker.walk(root)] == ["roles/dev.md"]
+
+    # A file slipped in without moving the directory mtime is not seen...
+    (root / "roles" / "ops.md").write_text("# Ops\n")
+    os.utime(root / "roles", (past, past))
+    assert walker.count(root) == 1
+
+    # ...until the directory changes or the cache is dropped
+    walker.invalidate(root)
+    assert walker.count(root) == 2
@@ -0,0 +1,45 @@
+"""Tests for the stat-validated content hash cache."""
+
+import os
+import time
+
+from ai_configurator.core.hashing import ContentHashCache, hash_file
+
+
+def test_in_place_edit_with_preserved_mtime_is_rehashed(tmp_path):
+    """Test that a same-size edit with the mtime restored is caught through ctime."""
+    path = tmp_path / "rule.md"
+    path.write_text("# Alpha\n")
+    cache = ContentHashCache()
+    original = cache.get(path)
+    assert cache.get(path) == original and cache.hits == 1
+
+    st = path.stat()
+    time.sleep(0.05)  # Let the coarse filesystem clock move on, so ctime changes
+    path.write_text("# Omega\n")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert path.stat().st_mtime_ns == st.st_mtime_ns
+
+    assert cache.get(path) == hash_file(path) != original
+
+
+def test_lru_bound_evicts_least_recently_used(tmp_path):
+    """Test that the cache never holds more than maxsize entries and keeps recently used ones."""
+    paths = []
+    for i in range(4):
+        paths.append(tmp_path / f"file-{i}.md")
+        paths[-1].write_text(f"# File {i}\n")
+
+    cache = ContentHashCache(maxsize=2)
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])  # Now most recently used
+    cache.get(paths[2])
+    assert cache.info()["currsize"] == 2
+
+    misses = cache.misses
+    cache.get(paths[0])
+    assert cache.misses == misses  # Kept
+    cache.get(paths[1])
+    assert cache.misses == misses + 1  # Evicted
+    assert cache.info()["currsize"] == 2
@@ -0,0 +1,40 @@
+"""Tests for memory-mapped lazy file content."""
+
+from ai_configurator.core.hashing import hash_file
+from ai_configurator.core.lazy_content import LazyContent
+from ai_configurator.core import metadata
+from ai_configurator.core.metadata import extract_metadata, extract_metadata_lazy
+
+
+def test_lazy_content_matches_eager_reads(tmp_path):
+    """Test that hashing, line slicing and metadata agree with reading the file."""
+    path = tmp_path / "reference.md"
+    text = "# Reference\n\nSee #security notes.\n" + "detail line\n" * 1000
+    path.write_text(text)
+
+    with LazyContent(path) as content:
+        assert content.hash() == hash_file(path)
+        assert content.lines(0, 2) == ["# Reference", ""]
+        assert content.head(5) == "# Ref"
+        assert content.text() == text
+
+        lazy = extract_metadata_lazy(content)
+        eager = extract_metadata(text)
+        assert sorted(lazy.pop("tags")) == sorted(eager.pop("tags"))
+        assert lazy == eager
+
+
+def test_metadata_handles_non_ascii_tags_and_spaces(tmp_path, monkeypatch):
+    """Test that Unicode tags and spaces count as on decoded text, across chunk cuts."""
+    monkeypatch.setattr(metadata, "SCAN_CHUNK_BYTES", 16)
+    text = "#über #naïve #ok\nweiß\u00a0grün und noch ein paar wörter\n"
+    path = tmp_path / "unicode.md"
+    path.write_text(text, encoding="utf-8")
+
+    eager = extract_metadata(text)
+    assert sorted(eager["tags"]) == ["naïve", "ok", "über"]
+    assert eager["word_count"] == len(text.split())
+    with LazyContent(path) as content:
+        lazy = extract_metadata_lazy(content)
+    assert sorted(lazy["tags"]) == sorted(eager["tags"])
+    assert lazy["word_count"] == eager["word_count"]
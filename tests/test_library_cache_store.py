@@ -0,0 +1,112 @@
+"""Tests for the persistent library cache store."""
+
+import os
+from datetime import datetime, timedelta
+
+from rich.console import Console
+
+from ai_configurator.core.hashing import ContentHashCache
+from ai_configurator.core.production_config import CacheConfig
+from ai_configurator.services.cached_library_service import CacheEntry, CachedLibraryService, MemoryCache
+from ai_configurator.services.library_cache_store import LibraryCacheStore
+
+
+def test_flush_round_trip_and_prune(tmp_path):
+    """Test that staged rows read back before and after a flush, and prune keeps recent ones."""
+    store = LibraryCacheStore(tmp_path / "cache.db")
+    now = datetime.now()
+    store.stage_file("hot.md", "abc", {"title": "Hot"}, 10, now, now, (1, 10, 2, 3))
+    store.stage_file("cold.md", "def", {}, 5, now - timedelta(days=3), now)
+    assert store.get_file("hot.md").metadata == {"title": "Hot"}
+
+    assert store.flush() == 2
+    reopened = LibraryCacheStore(tmp_path / "cache.db")
+    hot = reopened.get_file("hot.md")
+    assert (hot.content_hash, hot.size_bytes, hot.stat_key) == ("abc", 10, (1, 10, 2, 3))
+    assert reopened.get_file("cold.md").stat_key is None
+
+    assert reopened.prune(now - timedelta(days=1)) == (1, 0)
+    assert reopened.get_file("hot.md") is not None
+    assert reopened.get_file("cold.md") is None
+
+
+def test_cache_hit_restages_touched_file(tmp_path):
+    """Test that a touched but unchanged file gets its new stat key and access time stored."""
+    library = tmp_path / "library" / "roles"
+    library.mkdir(parents=True)
+    rule = library / "dev.md"
+    rule.write_text("# Dev\n")
+
+    def load():
+        service = CachedLibraryService(tmp_path / "cache", console=Console(quiet=True), cache_config=CacheConfig())
+        service.get_library_files([library.parent])
+        return service._store.get_file(str(rule))
+
+    first = load()
+    old_access = datetime.now() - timedelta(days=30)
+    os.utime(rule, ns=(rule.stat().st_atime_ns, rule.stat().st_mtime_ns - 10**9))
+    second = load()
+    assert second.stat_key != first.stat_key
+    assert second.content_hash == first.content_hash
+
+    # A hit on a row whose stored access time is stale refreshes it, so prune keeps it
+    store = LibraryCacheStore(tmp_path / "cache" / "library_cache.db")
+    store.stage_file(str(rule), second.content_hash, second.metadata, second.size_bytes,
+                     old_access, second.last_modified, second.stat_key)
+    store.flush()
+    assert load().last_accessed > old_access + timedelta(days=29)
+
+
+def test_memory_cache_evicts_by_bytes_and_reweighs():
+    """Test that the memory LRU stays within its byte budget, re-weighing entries that gain content."""
+    overhead = MemoryCache.ENTRY_OVERHEAD_BYTES
+    cache = MemoryCache(max_bytes=3 * overhead + 500)
+
+    def entry(name, content=None, size=1000):
+        return CacheEntry(file_path=name, content_hash=name, metadata={}, content=content, size_bytes=size)
+
+    cache.put("a", entry("a"))
+    cache.put("b", entry("b"))
+    cache.put("c", entry("c"))
+    assert cache.current_bytes == 3 * overhead and cache.evictions == 0
+
+    # Attaching content to "a" re-weighs it; the least recently used entry ("b") goes
+    lazy = cache.get("a")
+    lazy.content = "x" * 1000
+    cache.put("a", lazy)
+    assert "b" not in cache and cache.evictions == 1
+    assert cache.current_bytes == 2 * overhead + 1000
+
+    # One document larger than the whole budget is kept as metadata only
+    cache.put("huge", entry("huge", content="y", size=10 ** 6))
+    assert cache.get("huge").content is None
+    assert cache.current_bytes <= cache.max_bytes
+
+    # Shrinking the budget evicts down to it right away, not on the next put
+    cache.resize(overhead)
+    assert [key for key, _ in cache.items()] == ["huge"]
+    assert cache.current_bytes == overhead
+
+
+def test_warm_pass_does_not_rehash_beyond_hash_memo(tmp_path):
+    """Test that memory cache hits are validated by stat, even with more files than the digest memo holds."""
+    library = tmp_path / "library" / "roles"
+    library.mkdir(parents=True)
+    for i in range(20):
+        (library / f"rule{i}.md").write_text(f"# Rule {i}\n")
+
+    service = CachedLibraryService(tmp_path / "cache", console=Console(quiet=True),
+                                   cache_config=CacheConfig(persistent_cache=False))
+    service._hash_cache = ContentHashCache(maxsize=8)
+    assert len(service.get_library_files([library.parent])) == 20
+
+    service._hash_cache.clear()
+    assert len(service.get_library_files([library.parent])) == 20
+    assert service._hash_cache.misses == 0
+
+    # A touched but unchanged file is hashed once, then trusted by its new stat
+    touched = library / "rule0.md"
+    os.utime(touched, ns=(touched.stat().st_atime_ns, touched.stat().st_mtime_ns - 10**9))
+    service.get_library_files([library.parent])
+    service.get_library_files([library.parent])
+    assert service._hash_cache.misses == 1
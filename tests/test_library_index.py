@@ -0,0 +1,106 @@
+"""Tests for the persistent library index."""
+
+from ai_configurator.core.metadata import MetadataExtractor
+from ai_configurator.core.library_index import LibraryIndex, diff_trees
+
+
+def test_scan_only_rehashes_changed_files(tmp_path):
+    """Test that a warm scan reuses stored hashes and picks up edits."""
+    root = tmp_path / "library"
+    (root / "roles").mkdir(parents=True)
+    (root / "common.md").write_text("# Common\n")
+    (root / "roles" / "dev.md").write_text("# Dev\n")
+
+    index = LibraryIndex(tmp_path / "index.db")
+    first = index.scan(root)
+    assert sorted(first.changed) == ["common.md", "roles/dev.md"]
+
+    warm = index.scan(root)
+    assert warm.changed == []
+    assert warm.files["common.md"].content_hash == first.files["common.md"].content_hash
+
+    (root / "roles" / "dev.md").write_text("# Dev\n\nUpdated rules\n")
+    (root / "common.md").unlink()
+    rescan = index.scan(root)
+    assert rescan.changed == ["roles/dev.md"]
+    assert rescan.removed == ["common.md"]
+
+
+def test_index_persists_across_instances(tmp_path):
+    """Test that a new index instance starts warm from the database."""
+    root = tmp_path / "library"
+    root.mkdir()
+    (root / "notes.md").write_text("# Notes\n")
+
+    LibraryIndex(tmp_path / "index.db").scan(root)
+    assert LibraryIndex(tmp_path / "index.db").scan(root).changed == []
+
+
+def test_merkle_diff_skips_identical_directories(tmp_path):
+    """Test that tree comparison reports only differing files, incrementally."""
+    index = LibraryIndex(tmp_path / "index.db")
+    base, personal = tmp_path / "base", tmp_path / "personal"
+    for root in (base, personal):
+        for role in ("architect", "developer"):
+            (root / "roles" / role).mkdir(parents=True)
+            (root / "roles" / role / "rules.md").write_text(f"# {role}\n")
+    (personal / "roles" / "developer" / "rules.md").write_text("# developer\n\nMy rules\n")
+    (personal / "notes.md").write_text("# Notes\n")
+
+    base_scan, personal_scan = index.scan(base), index.scan(personal)
+    assert base_scan.dirs["roles/architect"].node_hash == personal_scan.dirs["roles/architect"].node_hash
+    assert base_scan.root_hash != personal_scan.root_hash
+
+    diff = diff_trees(base_scan, personal_scan)
+    assert diff.modified == ["roles/developer/rules.md"]
+    assert diff.only_right == ["notes.md"]
+    assert diff.only_left == []
+
+    # Incrementally maintained hashes match a scan from scratch
+    (base / "roles" / "architect" / "rules.md").write_text("# architect v2\n")
+    assert index.scan(base).root_hash == LibraryIndex(tmp_path / "fresh.db").scan(base).root_hash
+
+
+def test_metadata_is_stored_until_content_changes(tmp_path):
+    """Test that metadata is extracted once per content hash and kept in the index."""
+    root = tmp_path / "library"
+    root.mkdir()
+    (root / "dev.md").write_text("---\ntitle: Developer\ntags: [python]\n---\n# Ignored\n\nUse #testing daily\n")
+
+    index = LibraryIndex(tmp_path / "index.db", extractor=MetadataExtractor())
+    metadata = index.metadata(index.scan(root))["dev.md"]
+    assert metadata["title"] == "Developer"
+    assert sorted(metadata["tags"]) == ["python", "testing"]
+    assert metadata["front_matter"] == {"title": "Developer", "tags": ["python"]}
+
+    calls = []
+    index.extractor.add_stage(lambda buffer, prefix, data: calls.append(data))
+    assert index.metadata(index.scan(root))["dev.md"] == metadata
+    assert calls == []
+
+    (root / "dev.md").write_text("# Renamed\n")
+    assert index.metadata(index.scan(root))["dev.md"]["title"] == "Renamed"
+    assert len(calls) == 1
+
+
+def test_query_filters_by_tag_category_and_title(tmp_path):
+    """Test that tag, category and title filters resolve from the index alone."""
+    root = tmp_path / "library"
+    (root / "roles").mkdir(parents=True)
+    (root / "roles" / "secops.md").write_text("# Security Reviewer\n\nFollow #security rules\n")
+    (root / "roles" / "dev.md").write_text("---\ntitle: Developer\ntags: [Security]\n---\nCode\n")
+    (root / "common.md").write_text("# Security basics\n\n#security\n")
+
+    index = LibraryIndex(tmp_path / "index.db")
+    index.scan(root)
+
+    assert index.query(root, tags=["#security"]) == {"roles/secops.md", "roles/dev.md", "common.md"}
+    assert index.query(root, tags=["security"], category="roles/") == {"roles/secops.md", "roles/dev.md"}
+    assert index.query(root, title="reviewer") == {"roles/secops.md"}
+    assert index.query(root, title="security", category="") == {"common.md"}
+    assert index.categories(root) == {"roles": 2, "": 1}
+
+    (root / "roles" / "secops.md").write_text("# Ops\n")
+    index.scan(root)
+    assert index.query(root, title="reviewer") == set()
+    assert index.query(root, tags=["security"], category="roles") == {"roles/dev.md"}
@@ -0,0 +1,69 @@
+"""Tests for the incremental library installer."""
+
+import os
+
+from ai_configurator.core.library_installer import LibraryInstaller
+
+
+def _make_source(root):
+    (root / "roles" / "dev").mkdir(parents=True)
+    (root / "README.md").write_text("# Library\n")
+    (root / "roles" / "dev" / "dev.md").write_text("# Dev\n")
+    (root / "roles" / "dev" / "mcp.json").write_text("{}\n")
+
+
+def test_install_only_touches_changed_files(tmp_path):
+    """Test that a re-install copies, updates and deletes only what differs."""
+    source, destination = tmp_path / "source", tmp_path / "config" / "library"
+    _make_source(source)
+
+    first = LibraryInstaller(source, destination).install()
+    assert sorted(first.add) == ["README.md", "roles/dev/dev.md", "roles/dev/mcp.json"]
+    assert LibraryInstaller(source, destination).plan().is_empty
+
+    unchanged_inode = (destination / "roles" / "dev" / "dev.md").stat().st_ino
+    (source / "README.md").write_text("# Library v2\n")
+    (source / "roles" / "dev" / "mcp.json").unlink()
+    (destination / "stray.md").write_text("left over\n")
+
+    plan = LibraryInstaller(source, destination).install()
+    assert plan.update == ["README.md"]
+    assert plan.remove == ["roles/dev/mcp.json"]
+    assert (destination / "README.md").read_text() == "# Library v2\n"
+    assert not (destination / "roles" / "dev" / "mcp.json").exists()
+    assert (destination / "stray.md").read_text() == "left over\n"
+    assert (destination / "roles" / "dev" / "dev.md").stat().st_ino == unchanged_inode
+
+
+def test_interrupted_swap_is_recovered(tmp_path):
+    """Test that a crash between the two swap renames keeps the old install."""
+    source, destination = tmp_path / "source", tmp_path / "library"
+    _make_source(source)
+    installer = LibraryInstaller(source, destination)
+    installer.install()
+
+    os.rename(destination, installer.previous)
+    assert LibraryInstaller(source, destination).plan().is_empty
+    assert (destination / "README.md").exists()
+    assert not installer.previous.exists()
+
+
+def test_install_keeps_untracked_user_files(tmp_path):
+    """Test that files the installer never wrote survive an install that swaps the tree."""
+    source, destination = tmp_path / "source", tmp_path / "library"
+    _make_source(source)
+    (destination / "personal" / "empty").mkdir(parents=True)
+    (destination / "personal" / "my-notes.md").write_text("# Mine\n")
+    (destination / "roles" / "dev").mkdir(parents=True)
+    (destination / "roles" / "dev" / "extra.md").write_text("# Extra\n")
+    os.symlink("personal/my-notes.md", destination / "notes-link.md")
+
+    LibraryInstaller(source, destination).install()
+    (source / "README.md").write_text("# Library v2\n")
+    LibraryInstaller(source, destination).install()
+
+    assert (destination / "README.md").read_text() == "# Library v2\n"
+    assert (destination / "personal" / "my-notes.md").read_text() == "# Mine\n"
+    assert (destination / "personal" / "empty").is_dir()
+    assert (destination / "roles" / "dev" / "extra.md").read_text() == "# Extra\n"
+    assert os.readlink(destination / "notes-link.md") == "personal/my-notes.md"
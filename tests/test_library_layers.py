@@ -0,0 +1,35 @@
+"""Tests for layered library resolution."""
+
+from ai_configurator.models import LibraryConfig, LibrarySource
+from ai_configurator.core.library_index import LibraryIndex
+from ai_configurator.services.library_service import LibraryService, build_layers
+
+
+def test_effective_view_follows_layer_precedence(tmp_path):
+    """Test that base, remote and personal layers resolve highest first and stay current."""
+    base, team, personal = tmp_path / "base", tmp_path / "team", tmp_path / "personal"
+    for root in (base, team, personal):
+        (root / "roles").mkdir(parents=True)
+    (base / "roles" / "dev.md").write_text("# Base dev\n")
+    (base / "roles" / "ops.md").write_text("# Base ops\n")
+    (team / "roles" / "dev.md").write_text("# Team dev\n")
+    (personal / "roles" / "ops.md").write_text("# My ops\n")
+
+    config = LibraryConfig(remote_layers={"team": str(team)})
+    layers = build_layers(base, personal, config)
+    assert [layer.name for layer in layers] == ["base", "team", "personal"]
+
+    service = LibraryService(base, personal, index=LibraryIndex(tmp_path / "index.db"), layers=layers)
+    library = service.create_library()
+    assert library.get_effective_file("roles/dev.md").source == LibrarySource.REMOTE
+    assert library.get_effective_layer("roles/ops.md").name == "personal"
+    assert service.get_file_content(library, "roles/dev.md") == "# Team dev\n"
+
+    # Removing the team copy uncovers the base file after a sync
+    (team / "roles" / "dev.md").unlink()
+    service.sync_library(library)
+    assert library.get_effective_layer("roles/dev.md").name == "base"
+
+    reordered = build_layers(base, personal, LibraryConfig(remote_layers={"team": str(team)},
+                                                           layer_precedence=["personal", "base"]))
+    assert [layer.name for layer in reordered] == ["team", "personal", "base"]
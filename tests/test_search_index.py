@@ -0,0 +1,56 @@
+"""Tests for the full-text library search index."""
+
+from ai_configurator.core.library_index import LibraryIndex
+from ai_configurator.core.search_index import SearchIndex
+
+
+def _make_index(tmp_path):
+    return SearchIndex(tmp_path / "search.db", LibraryIndex(tmp_path / "index.db"))
+
+
+def test_term_phrase_and_prefix_queries(tmp_path):
+    """Test that terms are AND-ed and phrases require adjacent words."""
+    root = tmp_path / "library"
+    (root / "roles").mkdir(parents=True)
+    (root / "roles" / "aws-architect.md").write_text("# AWS Architect\n\nDesign serverless APIs on Lambda.\n")
+    (root / "roles" / "developer.md").write_text("Write serverless code, then design APIs.\n")
+
+    index = _make_index(tmp_path)
+    assert index.search(root, "serverless design") == ["roles/aws-architect.md", "roles/developer.md"]
+    assert index.search(root, '"design serverless"') == ["roles/aws-architect.md"]
+    assert index.search(root, "lamb*") == ["roles/aws-architect.md"]
+    assert index.search(root, "architect") == ["roles/aws-architect.md"]
+    assert index.search(root, "kubernetes") == []
+
+
+def test_search_reindexes_only_changed_files(tmp_path):
+    """Test that edits and deletions are picked up incrementally."""
+    root = tmp_path / "library"
+    root.mkdir()
+    (root / "a.md").write_text("alpha\n")
+    (root / "b.md").write_text("beta\n")
+
+    index = _make_index(tmp_path)
+    assert index.refresh(root) == (2, 0)
+    assert index.refresh(root) == (0, 0)
+
+    (root / "a.md").write_text("gamma\n")
+    (root / "b.md").unlink()
+    assert index.refresh(root) == (1, 1)
+    assert index.search(root, "alpha", refresh=False) == []
+    assert index.search(root, "gamma", refresh=False) == ["a.md"]
+
+
+def test_rank_prefers_title_matches_and_builds_snippets(tmp_path):
+    """Test that field boosts order results and snippets highlight matches."""
+    root = tmp_path / "library"
+    root.mkdir()
+    (root / "security.md").write_text("# Security Reviewer\n\nReview pull requests.\n")
+    (root / "notes.md").write_text("# Notes\n\nRun the security scanner before every release.\n")
+
+    results = _make_index(tmp_path).rank([root], "security")
+    assert [result.path for result in results] == ["security.md", "notes.md"]
+    assert results[0].title == "Security Reviewer"
+
+    snippet = results[1].snippet
+    assert [snippet[start:end] for start, end in results[1].highlights] == ["security"]
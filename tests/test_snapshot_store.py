@@ -0,0 +1,46 @@
+"""Tests for the content-addressed snapshot store."""
+
+from ai_configurator.services.snapshot_store import SnapshotStore
+
+
+def test_snapshots_share_blobs_and_gc_keeps_latest(tmp_path):
+    """Test that unchanged files are stored once and GC drops unreferenced blobs."""
+    personal = tmp_path / "personal"
+    personal.mkdir()
+    (personal / "rules.md").write_text("# Rules\n")
+    (personal / "notes.md").write_text("draft\n")
+
+    store = SnapshotStore(tmp_path / "snapshots")
+    store.create(personal, "first")
+    (personal / "notes.md").write_text("final\n")
+    store.create(personal, "second")
+
+    assert len(list(store.blobs_dir.glob("*/*"))) == 3
+    assert store.diff("first", "second").modified == ["notes.md"]
+
+    result = store.gc(retention_days=0)
+    assert result.snapshots_removed == 1
+    assert result.blobs_removed == 1
+    assert [info.snapshot_id for info in store.list()] == ["second"]
+
+    (personal / "rules.md").unlink()
+    restored = store.restore("second")
+    assert restored.added == ["rules.md"]
+    assert (personal / "rules.md").read_text() == "# Rules\n"
+
+
+def test_create_reads_only_the_newest_manifest(tmp_path, monkeypatch):
+    """Test that a new snapshot reuses the newest one's records without parsing older manifests."""
+    personal = tmp_path / "personal"
+    personal.mkdir()
+    (personal / "rules.md").write_text("# Rules\n")
+
+    store = SnapshotStore(tmp_path / "snapshots")
+    for snapshot_id in ("first", "second", "third"):
+        store.create(personal, snapshot_id)
+
+    read = []
+    original = store._read_manifest
+    monkeypatch.setattr(store, "_read_manifest", lambda path: read.append(path.stem) or original(path))
+    store.create(personal, "fourth")
+    assert read == ["third"]
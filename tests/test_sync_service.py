@@ -0,0 +1,102 @@
+"""Tests for library conflict detection and resolution."""
+
+from rich.console import Console
+
+from ai_configurator.models.sync_models import LibrarySync
+from ai_configurator.core.library_index import LibraryIndex
+from ai_configurator.services.merge_base_store import MERGE_BASE_DIR
+from ai_configurator.services.sync_service import SyncService
+
+
+def make_sync(tmp_path):
+    base = tmp_path / "base"
+    personal = tmp_path / "personal"
+    base.mkdir()
+    personal.mkdir()
+    return LibrarySync(base_path=base, personal_path=personal, backup_path=tmp_path / "backups")
+
+
+def test_conflict_diffs_are_computed_on_demand(tmp_path):
+    """Test that detection only records sizes and diffs are streamed and cached."""
+    library_sync = make_sync(tmp_path)
+    (library_sync.base_path / "rules.md").write_text("# Rules\nbase\n")
+    (library_sync.personal_path / "rules.md").write_text("# Rules\nmine\n")
+
+    service = SyncService(console=Console(file=None, quiet=True), index=LibraryIndex(tmp_path / "index.db"))
+    [conflict] = service.detect_conflicts(library_sync)
+    assert conflict.diff is None
+    assert conflict.base_size == conflict.personal_size == 13
+
+    lines = list(service.iter_diff(conflict))
+    assert "-base" in lines and "+mine" in lines
+
+    # A second request is served from the cache, even once the files change
+    (library_sync.personal_path / "rules.md").unlink()
+    assert list(service.iter_diff(conflict)) == lines
+
+
+def test_batch_sync_merges_non_overlapping_changes(tmp_path):
+    """Test that base updates are merged into personalized files using the recorded ancestor."""
+    library_sync = make_sync(tmp_path)
+    base_file = library_sync.base_path / "rules.md"
+    personal_file = library_sync.personal_path / "rules.md"
+    base_file.write_text("# Rules\none\ntwo\nthree\n")
+    personal_file.write_text("# Rules\none\ntwo\nthree\n")
+
+    service = SyncService(console=Console(file=None, quiet=True), index=LibraryIndex(tmp_path / "index.db"))
+    assert service.detect_conflicts(library_sync) == []
+    assert not (library_sync.personal_path / MERGE_BASE_DIR).exists()  # Inspecting is read-only
+    assert service.sync_library(library_sync, interactive=False).success  # Records the merge base
+    assert (library_sync.personal_path / MERGE_BASE_DIR).exists()
+    assert list(service.index.scan(library_sync.personal_path).files) == ["rules.md"]
+
+    base_file.write_text("# Rules\none\ntwo\nthree\nfour\n")
+    personal_file.write_text("# My Rules\none\ntwo\nthree\n")
+    history = service.sync_library(library_sync, interactive=False)
+    assert (history.merges_automatic, history.merges_manual) == (1, 0)
+    assert personal_file.read_text() == "# My Rules\none\ntwo\nthree\nfour\n"
+
+    # Overlapping edits are left alone for a human
+    base_file.write_text("# Base Rules\none\ntwo\nthree\nfour\n")
+    personal_file.write_text("# Our Rules\none\ntwo\nthree\nfour\n")
+    history = service.sync_library(library_sync, interactive=False)
+    assert (history.merges_automatic, history.merges_manual) == (0, 1)
+    assert not history.success
+    assert personal_file.read_text() == "# Our Rules\none\ntwo\nthree\nfour\n"
+
+
+def test_policies_resolve_conflicts_in_one_commit(tmp_path):
+    """Test that per-glob policies resolve conflicts without prompting and leave no journal."""
+    from ai_configurator.services.resolution_planner import ResolutionPlanner
+    from ai_configurator.services.sync_service import COMMIT_DIR
+
+    library_sync = make_sync(tmp_path)
+    for relative_path in ("roles/dev.md", "common/rules.md", "notes.md"):
+        (library_sync.base_path / relative_path).parent.mkdir(parents=True, exist_ok=True)
+        (library_sync.personal_path / relative_path).parent.mkdir(parents=True, exist_ok=True)
+        (library_sync.base_path / relative_path).write_text("base\n")
+        (library_sync.personal_path / relative_path).write_text("mine\n")
+
+    planner = ResolutionPlanner("prompt", {"roles/**": "keep_local", "common/**": "accept_remote"})
+    service = SyncService(
+        console=Console(file=None, quiet=True),
+        index=LibraryIndex(tmp_path / "index.db"),
+        planner=planner
+    )
+    history = service.sync_library(library_sync, interactive=False)
+
+    assert (history.conflicts_detected, history.conflicts_resolved) == (3, 2)
+    assert history.merges_manual == 1  # notes.md has no merge base and no policy
+    assert (history.merges_automatic, history.resolved_by_policy) == (0, 2)
+    assert (library_sync.personal_path / "roles/dev.md").read_text() == "mine\n"
+    assert (library_sync.personal_path / "common/rules.md").read_text() == "base\n"
+    assert not (library_sync.personal_path / COMMIT_DIR).exists()
+
+
+def test_create_backup_without_personal_library(tmp_path):
+    """Test that there is no snapshot path when the personal library does not exist."""
+    library_sync = make_sync(tmp_path)
+    library_sync.personal_path.rmdir()
+
+    service = SyncService(console=Console(file=None, quiet=True), index=LibraryIndex(tmp_path / "index.db"))
+    assert service.create_backup(library_sync) is None